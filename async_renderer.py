@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Concurrent HTML to PDF Renderer for Business Cards
+Renders many layout/side jobs at once on a single Chromium using
+playwright.async_api, with a cap on how many pages work in parallel
+"""
+
+import asyncio
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from tracing import span
+
+DEFAULT_CONCURRENCY = int(os.environ.get("BUSINESS_CARD_CONCURRENCY", "4"))
+
+
+@dataclass
+class RenderJob:
+    """One HTML document to print to one PDF file
+
+    With html_path the page loads that file (html_content may be None),
+    so large streamed documents are never held in memory.
+    """
+    html_content: str
+    output_pdf_path: str
+    margin_mm: float = 6
+    page_format: str = 'A4'
+    label: str = ""
+    cache_key: str = ""
+    html_path: str = ""
+
+
+@dataclass
+class RenderResult:
+    """Outcome of a RenderJob; failures are reported here instead of raised"""
+    job: RenderJob
+    ok: bool
+    seconds: float = 0.0
+    error: str = ""
+
+
+async def _replace_page(browser, pages, page):
+    """Swap a page that failed a render for a fresh one, also in `pages`
+
+    A failed goto/pdf can leave the page mid-navigation or crashed, so it
+    is not reused. If no new page can be opened (e.g. the browser died)
+    the old one is returned, so the remaining jobs fail instead of waiting
+    forever for a free page.
+    """
+    try:
+        await page.close()
+    except Exception:
+        pass
+    try:
+        replacement = await browser.new_page()
+    except Exception:
+        return page
+    pages[pages.index(page)] = replacement
+    return replacement
+
+
+async def _render_one(browser, pages, page_queue, job):
+    page = await page_queue.get()
+    started = time.perf_counter()
+    failed = False
+    try:
+        margin = f"{job.margin_mm}mm"
+        # Jobs overlap on one thread, so each gets its own track in the trace
+        track = job.label or Path(job.output_pdf_path).name
+        if job.html_path:
+            with span("page.goto", track=track):
+                await page.goto(Path(job.html_path).resolve().as_uri())
+        else:
+            with span("page.set_content", track=track, html_bytes=len(job.html_content)):
+                await page.set_content(job.html_content)
+        with span("page.pdf", track=track):
+            await page.pdf(
+                path=str(job.output_pdf_path),
+                format=job.page_format,
+                margin={
+                    'top': margin,
+                    'bottom': margin,
+                    'left': margin,
+                    'right': margin
+                },
+                print_background=True
+            )
+        return RenderResult(job, True, time.perf_counter() - started)
+    except Exception as e:
+        failed = True
+        return RenderResult(job, False, time.perf_counter() - started, str(e))
+    finally:
+        if failed:
+            page = await _replace_page(browser, pages, page)
+        page_queue.put_nowait(page)
+
+
+async def render_jobs_async(jobs, concurrency=DEFAULT_CONCURRENCY, browser=None):
+    """Render every job concurrently; returns RenderResults in job order
+
+    At most `concurrency` pages render at the same time. Pass an already
+    launched async Browser to reuse it, otherwise one is launched and
+    closed around the batch.
+    """
+    jobs = list(jobs)
+    if not jobs:
+        return []
+    concurrency = max(1, min(concurrency, len(jobs)))
+
+    if browser is None:
+        from playwright.async_api import async_playwright
+
+        async with async_playwright() as p:
+            with span("browser.launch"):
+                browser = await p.chromium.launch()
+            try:
+                return await render_jobs_async(jobs, concurrency, browser)
+            finally:
+                await browser.close()
+
+    # The queue holds the idle pages, so it doubles as the concurrency cap
+    page_queue = asyncio.Queue()
+    pages = [await browser.new_page() for _ in range(concurrency)]
+    for page in pages:
+        page_queue.put_nowait(page)
+
+    try:
+        return await asyncio.gather(*(_render_one(browser, pages, page_queue, job) for job in jobs))
+    finally:
+        # pages includes any replacements made after failed renders
+        for page in pages:
+            try:
+                await page.close()
+            except Exception:
+                pass
+
+
+def render_jobs(jobs, concurrency=DEFAULT_CONCURRENCY):
+    """Blocking wrapper around render_jobs_async for the command-line scripts"""
+    return asyncio.run(render_jobs_async(jobs, concurrency))
+
+
+def print_render_summary(results, started):
+    """Print one line per job plus the batch wall time"""
+    for result in results:
+        name = os.path.basename(str(result.job.output_pdf_path))
+        if result.ok:
+            print(f"✓ {name} ({result.seconds:.2f}s)")
+        else:
+            print(f"✗ {name} failed: {result.error}")
+
+    failed = sum(1 for result in results if not result.ok)
+    total = time.perf_counter() - started
+    print(f"Rendered {len(results) - failed}/{len(results)} PDFs in {total:.2f}s")
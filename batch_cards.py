@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+Bulk Personalized Business Card Generator
+Fills the front/back SVG templates from a CSV or JSONL roster and
+builds each person's multi-up sheets with the square card layout code
+
+Usage:
+    python batch_cards.py roster.csv --out personalized_cards --layout 2x3
+    python batch_cards.py roster.jsonl --roster-sheets     # plus every card on shared sheets
+
+Template fields are filled two ways:
+  - by element id: <text id="phone">"+91 9429806587"</text> gets the
+    roster's "phone" value (surrounding quotes are kept)
+  - by placeholder: {{phone}} anywhere in the SVG text
+
+A "qr" column re-encodes the QR code group (<g id="qr" data-size="...">):
+any text or URL is encoded as is, and the values "vcard" or "mecard"
+build a contact from the row's name/phone/email/website.
+"""
+
+import argparse
+import csv
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from html import escape
+from pathlib import Path
+
+from create_square_card_pdfs import iter_square_card_html
+from html_stream import write_html
+from tracing import add_trace_argument, configure, span
+
+_ID_ELEMENT_RE = re.compile(r'(<(\w+)\b[^>]*\bid="([\w-]+)"[^>]*>)([^<]*)(</\2>)')
+_PLACEHOLDER_RE = re.compile(r'\{\{\s*([\w-]+)\s*\}\}')
+_QR_GROUP_RE = re.compile(r'<g\b[^>]*\bid="qr"[^>]*>.*?</g>', re.DOTALL)
+_TRANSLATE_RE = re.compile(r'translate\(\s*([-\d.]+)[\s,]+([-\d.]+)\s*\)')
+_DATA_SIZE_RE = re.compile(r'\bdata-size="([\d.]+)"')
+
+
+@dataclass(frozen=True)
+class QRSlot:
+    """The template's QR group: original markup plus where a new code goes"""
+    default: str
+    x: float
+    y: float
+    size: float
+
+
+def load_roster(roster_path):
+    """Read roster records (dicts) from a .csv or .jsonl file"""
+    roster_path = Path(roster_path)
+    with open(roster_path, 'r', encoding='utf-8', newline='') as f:
+        if roster_path.suffix.lower() in ('.jsonl', '.ndjson'):
+            return [json.loads(line) for line in f if line.strip()]
+        return [dict(row) for row in csv.DictReader(f)]
+
+
+def compile_template(svg_content):
+    """
+    Split an SVG template into literal text and field slots once
+
+    Returns a list whose items are literal strings, (field, default,
+    quoted) tuples or a QRSlot; fill_template() just joins them.
+    """
+    parts = []
+    position = 0
+    for match in _QR_GROUP_RE.finditer(svg_content):
+        parts.extend(_split_fields(svg_content[position:match.start()]))
+        group = match.group(0)
+        translate = _TRANSLATE_RE.search(group)
+        size = _DATA_SIZE_RE.search(group)
+        if translate and size:
+            parts.append(QRSlot(group, float(translate.group(1)), float(translate.group(2)),
+                                float(size.group(1))))
+        else:
+            parts.append(group)
+        position = match.end()
+    parts.extend(_split_fields(svg_content[position:]))
+    return parts
+
+
+def _split_fields(svg_content):
+    parts = []
+    position = 0
+    for match in _ID_ELEMENT_RE.finditer(svg_content):
+        open_tag, _, field, text, close_tag = match.groups()
+        parts.extend(_split_placeholders(svg_content[position:match.start()]))
+        parts.append(open_tag)
+        quoted = len(text) >= 2 and text[0] == text[-1] == '"'
+        default = text[1:-1] if quoted else text
+        parts.append((field, default, quoted))
+        parts.append(close_tag)
+        position = match.end()
+    parts.extend(_split_placeholders(svg_content[position:]))
+    return parts
+
+
+def _split_placeholders(text):
+    parts = []
+    position = 0
+    for match in _PLACEHOLDER_RE.finditer(text):
+        parts.append(text[position:match.start()])
+        parts.append((match.group(1), "", False))
+        position = match.end()
+    parts.append(text[position:])
+    return parts
+
+
+def fill_template(compiled, record):
+    """Render a compiled template for one roster record"""
+    out = []
+    for part in compiled:
+        if isinstance(part, str):
+            out.append(part)
+            continue
+        if isinstance(part, QRSlot):
+            out.append(_fill_qr(part, record))
+            continue
+        field, default, quoted = part
+        value = record.get(field)
+        if value is None or value == "":
+            # Keep the template text; it is already escaped SVG
+            out.append(f'"{default}"' if quoted else default)
+            continue
+        # Placeholders may sit inside attribute values, so quotes are escaped too
+        value = escape(str(value), quote=True)
+        out.append(f'"{value}"' if quoted else value)
+    return "".join(out)
+
+
+def _fill_qr(slot, record):
+    payload = record.get("qr")
+    if payload is None or payload == "":
+        return slot.default
+    # JSONL rosters may hold numbers or other non-string values
+    payload = str(payload)
+
+    from qr_service import contact_payload, encode
+
+    if payload.lower() in ("vcard", "mecard"):
+        payload = contact_payload(record, payload.lower())
+    return encode(payload).svg_group(slot.x, slot.y, slot.size)
+
+
+def person_slug(record, index):
+    """Stable, filesystem-safe output folder name for a record"""
+    base = record.get("id") or record.get("name") or f"card_{index}"
+    slug = re.sub(r'[^A-Za-z0-9]+', '_', str(base)).strip('_').lower()
+    return f"{index:05d}_{slug or 'card'}"
+
+
+# Per-process template cache, filled by the pool initializer
+_worker_templates = {}
+
+
+def _init_worker(templates):
+    _worker_templates.clear()
+    _worker_templates.update({side: compile_template(svg) for side, svg in templates.items()})
+
+
+def _build_person(task):
+    """Write one person's SVGs and layout HTML; returns (html, pdf) paths to render"""
+    index, record, out_dir, h, v = task
+    person_dir = Path(out_dir) / person_slug(record, index)
+    person_dir.mkdir(parents=True, exist_ok=True)
+
+    jobs = []
+    for side, compiled in _worker_templates.items():
+        svg_path = person_dir / f"business_card_{side}.svg"
+        with span("template.fill", side=side):
+            svg_content = fill_template(compiled, record)
+        with span("file.write"), open(svg_path, 'w', encoding='utf-8') as f:
+            f.write(svg_content)
+
+        # Only paths go back to the parent; the HTML is streamed to disk and printed from there
+        filename = f"square_cards_{side}_{h}x{v}_A4"
+        html_path = person_dir / f"{filename}.html"
+        write_html(iter_square_card_html(str(svg_path), h, v, side), html_path)
+        jobs.append((str(html_path), str(person_dir / f"{filename}.pdf")))
+    return jobs
+
+
+def write_roster_sheet(records, template_path, side, output_html_path, h=2, v=3):
+    """
+    Every record's card on shared multi-page sheets, one card per cell
+
+    Cards are filled lazily as the document is streamed to disk, so
+    memory stays at one page of cards however long the roster is.
+    Returns the number of cards written.
+    """
+    with open(template_path, 'r', encoding='utf-8') as f:
+        compiled = compile_template(f.read())
+    count = 0
+
+    def cards():
+        nonlocal count
+        for record in records:
+            with span("template.fill", side=side):
+                yield fill_template(compiled, record)
+            count += 1
+
+    write_html(iter_square_card_html(str(template_path), h, v, side, cards=cards()), output_html_path)
+    return count
+
+
+def generate_roster_sheets(records, template_paths, out_dir, h=2, v=3, workers=None, render_pdfs=True):
+    """
+    write_roster_sheet() for each side, then print the sheets from their files
+
+    template_paths maps side name to the SVG template file. Returns the
+    RenderResults of the PDFs (empty with render_pdfs=False).
+    """
+    Path(out_dir).mkdir(parents=True, exist_ok=True)
+    jobs = []
+    for side, template_path in template_paths.items():
+        html_path = Path(out_dir) / f"roster_{side}_{h}x{v}_A4.html"
+        count = write_roster_sheet(records, template_path, side, html_path, h, v)
+        print(f"✓ {html_path.name}: {count} cards on {-(-count // (h * v))} sheets")
+        jobs.append((str(html_path), str(html_path.with_suffix(".pdf"))))
+
+    if not render_pdfs:
+        return []
+
+    from async_renderer import RenderJob, render_jobs
+
+    render_queue = [RenderJob(None, pdf, margin_mm=6, html_path=html) for html, pdf in jobs]
+    return render_jobs(render_queue, concurrency=workers or os.cpu_count() or 1)
+
+
+def generate_batch(records, templates, out_dir, h=2, v=3, workers=None, render_pdfs=True):
+    """
+    Personalize every record and build its sheets
+
+    templates maps side name ("front"/"back") to SVG template text.
+    Templating and HTML building run across a process pool; PDFs are
+    then printed concurrently on one Chromium (one page per core).
+    Returns (cards_built, pdf_results).
+    """
+    workers = workers or os.cpu_count() or 1
+    tasks = [(index, record, str(out_dir), h, v) for index, record in enumerate(records, 1)]
+    Path(out_dir).mkdir(parents=True, exist_ok=True)
+
+    jobs = []
+    chunksize = max(1, len(tasks) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(templates,)) as executor:
+        for person_jobs in executor.map(_build_person, tasks, chunksize=chunksize):
+            jobs.extend(person_jobs)
+
+    if not render_pdfs:
+        return len(tasks), []
+
+    from async_renderer import RenderJob, render_jobs
+
+    render_queue = [RenderJob(None, pdf, margin_mm=6, html_path=html) for html, pdf in jobs]
+    return len(tasks), render_jobs(render_queue, concurrency=workers)
+
+
+def main():
+    script_dir = Path(__file__).parent
+
+    parser = argparse.ArgumentParser(description="Generate personalized business cards from a roster")
+    parser.add_argument("roster", help="CSV or JSONL file, one person per row")
+    parser.add_argument("--out", default="personalized_cards", help="output directory")
+    parser.add_argument("--front", default=str(script_dir / "business_card_front.svg"))
+    parser.add_argument("--back", default=str(script_dir / "business_card_back.svg"))
+    parser.add_argument("--layout", default="2x3", help="cards per sheet as COLSxROWS")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument("--html-only", action="store_true", help="skip PDF rendering")
+    parser.add_argument("--roster-sheets", action="store_true",
+                        help="also put every person's card on shared sheets (roster_<side>_HxV_A4.html/.pdf)")
+    add_trace_argument(parser)
+    args = parser.parse_args()
+    configure(args.trace)
+
+    try:
+        h, v = (int(n) for n in args.layout.lower().split("x"))
+    except ValueError:
+        print(f"Invalid layout '{args.layout}', expected e.g. 2x3")
+        return 2
+
+    templates = {}
+    for side, path in (("front", args.front), ("back", args.back)):
+        with open(path, 'r', encoding='utf-8') as f:
+            templates[side] = f.read()
+
+    records = load_roster(args.roster)
+    print(f"Generating cards for {len(records)} people ({h}×{v} sheets)...")
+
+    started = time.perf_counter()
+    try:
+        count, results = generate_batch(records, templates, args.out, h, v,
+                                        workers=args.workers, render_pdfs=not args.html_only)
+        if args.roster_sheets:
+            results += generate_roster_sheets(records, {"front": args.front, "back": args.back}, args.out, h, v,
+                                              workers=args.workers, render_pdfs=not args.html_only)
+    except ImportError:
+        print("Playwright not installed. Install with: pip install playwright")
+        print("Then run: playwright install chromium")
+        print("Re-run with --html-only to build the HTML sheets without PDFs")
+        return 1
+    elapsed = time.perf_counter() - started
+
+    failed = [result for result in results if not result.ok]
+    for result in failed:
+        print(f"✗ {result.job.output_pdf_path}: {result.error}")
+
+    rate = count / elapsed * 60 if elapsed else 0
+    print(f"✓ {count} people in {elapsed:.1f}s ({rate:.0f} cards/minute)")
+    if results:
+        print(f"  PDFs: {len(results) - len(failed)}/{len(results)} rendered")
+    print(f"  Output: {args.out}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+Cross-Backend Benchmark for the SVG to PDF Converters
+Runs each converter on the bundled card SVGs across cards-per-page and
+page counts and records wall time, peak RSS and output size. Every case
+runs in a fresh Python process so memory numbers do not leak between
+backends
+
+Usage:
+    python benchmark.py                                   # full matrix, all backends
+    python benchmark.py --backends raster vector --pages 1 10
+    python benchmark.py --baseline bench_old.json         # exit 1 on a >20% slowdown
+
+Backends:
+    raster      svg_to_pdf_converter (cairosvg bitmap per card)
+    vector      svg_to_pdf_converter_v2 (svglib form XObjects)
+    weasyprint  svg_to_pdf_simple.convert_with_weasyprint
+    playwright  browser_pool (headless Chromium)
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+BACKENDS = ("raster", "vector", "weasyprint", "playwright")
+CARDS_PER_PAGE = (1, 4, 6, 10, 50)
+PAGE_COUNTS = (1, 10, 100)
+BUNDLED_SVGS = ("business_card_print_ready.svg", "business_card_front.svg", "business_card_back.svg")
+
+CARD_WIDTH_MM = 85
+CARD_HEIGHT_MM = 55
+MARGIN_MM = 10
+REGRESSION_THRESHOLD = 0.20
+
+
+def peak_rss_mb(children=False):
+    """
+    Peak resident set size in MB, or None where unsupported
+
+    With children=True this is the largest terminated, waited-for
+    descendant (Chromium and the Playwright driver) instead of this process.
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def benchmark_html(svg_file_path, cards_per_page, pages, sheet="A4"):
+    """
+    HTML for the browser engines with the same slots as the ReportLab paths
+
+    Cards are absolutely placed in mm from the imposition solver and
+    built with card_markup(), like the layout builders, so output sizes
+    are comparable across engines.
+    """
+    from imposition import impose
+    from svg_symbols import card_markup
+
+    svg_content = Path(svg_file_path).read_text(encoding='utf-8')
+    defs, cell = card_markup(svg_content)
+    imposition = impose(CARD_WIDTH_MM, CARD_HEIGHT_MM, sheet, margin=MARGIN_MM)
+    slots = imposition.placements[:cards_per_page]
+
+    cells = []
+    for slot in slots:
+        # A rotated slot holds the card turned a quarter counter-clockwise, as in the ReportLab paths
+        width, height = (slot.height, slot.width) if slot.rotated else (slot.width, slot.height)
+        turn = f"transform:translateY({slot.height:g}mm) rotate(-90deg);transform-origin:0 0;" if slot.rotated else ""
+        bottom = slot.y + slot.height - height
+        cells.append(f'<div class="slot" style="left:{slot.x:g}mm;bottom:{bottom:g}mm;'
+                     f'width:{width:g}mm;height:{height:g}mm;{turn}">{cell}</div>')
+    page = f'<div class="sheet">{"".join(cells)}</div>'
+
+    return f"""<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="UTF-8">
+    <title>Business Cards - Benchmark</title>
+    <style>
+        @page {{ size: {imposition.sheet_width:g}mm {imposition.sheet_height:g}mm; margin: 0; }}
+        body {{ margin: 0; }}
+        .sheet {{ position: relative; width: {imposition.sheet_width:g}mm; height: {imposition.sheet_height:g}mm; overflow: hidden; page-break-after: always; }}
+        .sheet:last-child {{ page-break-after: auto; }}
+        .slot {{ position: absolute; box-sizing: border-box; border: 0.5pt dashed #ccc; }}
+        .slot svg {{ display: block; width: 100%; height: 100%; }}
+    </style>
+</head>
+<body>
+{defs}
+{page * pages}
+</body>
+</html>
+"""
+
+
+def cards_that_fit(cards_per_page, sheet="A4"):
+    from imposition import impose
+
+    return min(cards_per_page, impose(CARD_WIDTH_MM, CARD_HEIGHT_MM, sheet, margin=MARGIN_MM).count)
+
+
+def render_case(backend, svg_file_path, cards_per_page, pages, output_pdf_path, sheet="A4"):
+    """Render one case in this process; returns the render time in seconds"""
+    if backend == "raster":
+        from svg_to_pdf_converter import svg_to_pdf_a4
+
+        started = time.perf_counter()
+        svg_to_pdf_a4(str(svg_file_path), str(output_pdf_path), cards_per_page, pages=pages)
+    elif backend == "vector":
+        from svg_to_pdf_converter_v2 import create_card_job_pdf
+
+        placed = cards_that_fit(cards_per_page, sheet)
+        started = time.perf_counter()
+        create_card_job_pdf(str(svg_file_path), output_pdf_path, placed * pages, placed, sheet=sheet)
+    elif backend == "weasyprint":
+        import weasyprint  # noqa: F401  fail early instead of inside convert_with_weasyprint
+        from svg_to_pdf_simple import convert_with_weasyprint
+
+        # One sheet is laid out and its page repeated, as svg_to_pdf_simple does
+        started = time.perf_counter()
+        html_content = benchmark_html(svg_file_path, cards_per_page, 1, sheet)
+        if not convert_with_weasyprint(html_content, str(output_pdf_path), copies=pages):
+            raise RuntimeError("WeasyPrint conversion failed")
+    elif backend == "playwright":
+        from browser_pool import BrowserPool
+
+        # Browser start-up is part of what a one-off CLI run pays for
+        started = time.perf_counter()
+        html_content = benchmark_html(svg_file_path, cards_per_page, pages, sheet)
+        with BrowserPool(pool_size=1) as pool:
+            pool.render_pdf(html_content, output_pdf_path, margin_mm=0, page_format=None)
+    else:
+        raise ValueError(f"Unknown backend: {backend}")
+    return time.perf_counter() - started
+
+
+def _describe(error):
+    """One-line error text; library loaders and Playwright produce multi-line banners"""
+    lines = str(error).strip().splitlines()
+    first = lines[0] if lines else ""
+    return f"{type(error).__name__}: {first.split('.  ')[0]}"
+
+
+def _run_case_child(case_json, result_path):
+    """Entry point of the per-case subprocess; writes its measurements as JSON"""
+    case = json.loads(case_json)
+    result = {"status": "ok"}
+    try:
+        result["seconds"] = render_case(case["backend"], case["svg"], case["cards_per_page"], case["pages"],
+                                        case["output"], case["sheet"])
+        result["output_bytes"] = os.path.getsize(case["output"])
+    except (ImportError, OSError) as e:
+        result.update(status="unavailable", error=_describe(e))
+    except SystemExit:
+        # svg_to_pdf_converter exits at import time when reportlab is missing
+        result.update(status="unavailable", error="required library missing")
+    except Exception as e:
+        result.update(status="error", error=_describe(e))
+    result["peak_rss_mb"] = peak_rss_mb()
+    # The browser has been closed and reaped by now, so its memory is counted here
+    result["children_peak_rss_mb"] = peak_rss_mb(children=True)
+    Path(result_path).write_text(json.dumps(result), encoding='utf-8')
+
+
+def _case_record(backend, svg_file_path, cards_per_page, pages, sheet):
+    """The fields that identify a case in the results"""
+    return {"backend": backend, "cards_per_page": cards_per_page, "pages": pages, "sheet": sheet,
+            "svg": Path(svg_file_path).name, "cards_placed": cards_that_fit(cards_per_page, sheet)}
+
+
+def run_case(backend, svg_file_path, cards_per_page, pages, work_dir, sheet="A4", cold=True):
+    """Run one case in a fresh interpreter and return its result record"""
+    work_dir = Path(work_dir)
+    name = f"{backend}_{Path(svg_file_path).stem}_{cards_per_page}x{pages}"
+    output = work_dir / f"{name}.pdf"
+    result_path = work_dir / f"{name}.json"
+    case = {"backend": backend, "svg": str(svg_file_path), "cards_per_page": cards_per_page,
+            "pages": pages, "output": str(output), "sheet": sheet}
+
+    env = dict(os.environ)
+    if cold:
+        # Measure the converters, not the content-addressed caches
+        env["BUSINESS_CARD_CACHE"] = "0"
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, str(Path(__file__).resolve()), "--run-case", json.dumps(case), str(result_path)],
+        cwd=Path(__file__).parent, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+    )
+    process_seconds = time.perf_counter() - started
+
+    record = _case_record(backend, svg_file_path, cards_per_page, pages, sheet)
+    record["process_seconds"] = round(process_seconds, 4)
+    if result_path.exists():
+        record.update(json.loads(result_path.read_text(encoding='utf-8')))
+        result_path.unlink()
+    else:
+        lines = (completed.stderr or "").strip().splitlines()
+        record.update(status="error", error=lines[-1] if lines else "no result")
+    if "seconds" in record:
+        record["seconds"] = round(record["seconds"], 4)
+    if output.exists():
+        output.unlink()
+    return record
+
+
+def compare_to_baseline(results, baseline, threshold=REGRESSION_THRESHOLD):
+    """[(case label, old seconds, new seconds)] for cases slower than the baseline by more than threshold"""
+    def label(record):
+        return f"{record['backend']} {record['svg']} {record['cards_per_page']}/page x{record['pages']}"
+
+    old = {label(r): r["seconds"] for r in baseline.get("results", []) if r.get("status") == "ok"}
+    regressions = []
+    for record in results:
+        key = label(record)
+        if record.get("status") == "ok" and key in old and old[key] > 0:
+            if record["seconds"] > old[key] * (1 + threshold):
+                regressions.append((key, old[key], record["seconds"]))
+    return regressions
+
+
+def print_summary(results):
+    """Per-case table, then the median render time of each backend"""
+    print()
+    print(f"{'Backend':<11} {'SVG':<28} {'Cards':>5} {'Pages':>5} {'Time s':>8} {'RSS MB':>7} "
+          f"{'Child MB':>8} {'Size KB':>9}")
+    print("-" * 88)
+    for r in results:
+        cards = f"{r['cards_placed']}" if r['cards_placed'] == r['cards_per_page'] else f"{r['cards_placed']}*"
+        if r["status"] == "ok":
+            rss = f"{r['peak_rss_mb']:.0f}" if r.get("peak_rss_mb") is not None else "-"
+            child_rss = f"{r['children_peak_rss_mb']:.0f}" if r.get("children_peak_rss_mb") else "-"
+            print(f"{r['backend']:<11} {r['svg']:<28} {cards:>5} {r['pages']:>5} {r['seconds']:>8.3f} "
+                  f"{rss:>7} {child_rss:>8} {r['output_bytes'] / 1024:>9.1f}")
+        else:
+            print(f"{r['backend']:<11} {r['svg']:<28} {cards:>5} {r['pages']:>5}   {r['status']}: {r.get('error', '')}")
+    if any(r["cards_placed"] < r["cards_per_page"] for r in results):
+        print("* capped at what fits on the sheet")
+
+    print()
+    for backend in dict.fromkeys(r["backend"] for r in results):
+        times = [r["seconds"] for r in results if r["backend"] == backend and r["status"] == "ok"]
+        if times:
+            print(f"  {backend:<11} median {statistics.median(times):.3f}s over {len(times)} cases")
+        else:
+            print(f"  {backend:<11} no successful runs")
+
+
+def main():
+    if len(sys.argv) == 4 and sys.argv[1] == "--run-case":
+        _run_case_child(sys.argv[2], sys.argv[3])
+        return 0
+
+    script_dir = Path(__file__).parent
+
+    parser = argparse.ArgumentParser(description="Benchmark the SVG to PDF backends")
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS))
+    parser.add_argument("--cards", nargs="+", type=int, default=list(CARDS_PER_PAGE), help="cards per page")
+    parser.add_argument("--pages", nargs="+", type=int, default=list(PAGE_COUNTS), help="page counts")
+    parser.add_argument("--svg", nargs="+", default=list(BUNDLED_SVGS), help="card SVGs to render")
+    parser.add_argument("--sheet", default="A4", help="paper size: A4, Letter, A3 or SRA3")
+    parser.add_argument("--warm-cache", action="store_true", help="let the render caches serve repeat work")
+    parser.add_argument("--output", default=None, help="JSON results file")
+    parser.add_argument("--baseline", default=None, help="earlier JSON results to check for regressions")
+    args = parser.parse_args()
+
+    output = Path(args.output) if args.output else (
+        script_dir / f"benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    svg_files = [Path(s) if Path(s).is_absolute() else script_dir / s for s in args.svg]
+    missing = [str(s) for s in svg_files if not s.exists()]
+    if missing:
+        print(f"Error: SVG not found: {', '.join(missing)}")
+        return 1
+
+    total = len(args.backends) * len(svg_files) * len(args.cards) * len(args.pages)
+    print(f"Benchmarking {total} cases ({'warm' if args.warm_cache else 'cold'} caches, {args.sheet})")
+
+    results = []
+    unavailable = set()
+    with tempfile.TemporaryDirectory(prefix="card_bench_") as work_dir:
+        for backend in args.backends:
+            for svg_file in svg_files:
+                for pages in args.pages:
+                    for cards_per_page in args.cards:
+                        if backend in unavailable:
+                            record = _case_record(backend, svg_file, cards_per_page, pages, args.sheet)
+                            record.update(status="skipped", error=f"{backend} unavailable")
+                            results.append(record)
+                            continue
+                        record = run_case(backend, svg_file, cards_per_page, pages, work_dir,
+                                          args.sheet, cold=not args.warm_cache)
+                        results.append(record)
+                        if record["status"] == "ok":
+                            print(f"  ✓ {backend} {svg_file.name} {record['cards_placed']}/page x{pages}: "
+                                  f"{record['seconds']:.3f}s")
+                        else:
+                            print(f"  ✗ {backend} {svg_file.name}: {record.get('error', record['status'])}")
+                        if record["status"] == "unavailable":
+                            # A missing library or browser fails every case the same way
+                            unavailable.add(backend)
+
+    report = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "sheet": args.sheet,
+        "cold_cache": not args.warm_cache,
+        "results": results,
+    }
+    output.write_text(json.dumps(report, indent=2), encoding='utf-8')
+    print_summary(results)
+    print(f"\n✓ Results: {output}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding='utf-8'))
+        regressions = compare_to_baseline(results, baseline)
+        if regressions:
+            print(f"\n✗ {len(regressions)} case(s) more than {REGRESSION_THRESHOLD:.0%} slower than the baseline:")
+            for label, old, new in regressions:
+                print(f"  {label}: {old:.3f}s → {new:.3f}s")
+            return 1
+        print("✓ No regressions against the baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
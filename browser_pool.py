@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Warm Chromium Pool for Business Card PDFs
+Keeps one Chromium process and a pool of pages alive for a whole run
+so every layout and card side reuses the same browser
+"""
+
+import os
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+
+from tracing import span
+
+DEFAULT_POOL_SIZE = int(os.environ.get("BUSINESS_CARD_POOL_SIZE", "2"))
+
+
+class BrowserPool:
+    """One Chromium process shared by every Playwright PDF render
+
+    Usage:
+        with BrowserPool(pool_size=2) as pool:
+            pool.render_pdf(html_content, "cards.pdf", margin_mm=6)
+
+    or call start() / close() explicitly for a longer-lived pool.
+    """
+
+    def __init__(self, pool_size=DEFAULT_POOL_SIZE, launch_options=None):
+        if pool_size < 1:
+            raise ValueError("pool_size must be at least 1")
+        self.pool_size = pool_size
+        self.launch_options = launch_options or {}
+        self._playwright = None
+        self._browser = None
+        self._idle_pages = deque()
+        self._pages_created = 0
+        self.renders = 0
+
+    @property
+    def is_running(self):
+        return self._browser is not None
+
+    def start(self):
+        """Launch Chromium once; calling start() on a running pool is a no-op"""
+        if self.is_running:
+            return self
+
+        from playwright.sync_api import sync_playwright
+
+        with span("browser.launch", pool_size=self.pool_size):
+            self._playwright = sync_playwright().start()
+            try:
+                self._browser = self._playwright.chromium.launch(**self.launch_options)
+            except Exception:
+                self._playwright.stop()
+                self._playwright = None
+                raise
+        return self
+
+    def close(self):
+        """Close every pooled page, the browser and the Playwright driver"""
+        while self._idle_pages:
+            page = self._idle_pages.popleft()
+            try:
+                page.close()
+            except Exception:
+                pass
+        if self._browser is not None:
+            self._browser.close()
+            self._browser = None
+        if self._playwright is not None:
+            self._playwright.stop()
+            self._playwright = None
+        self._pages_created = 0
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def _acquire(self):
+        if not self.is_running:
+            self.start()
+        if self._idle_pages:
+            return self._idle_pages.popleft()
+        self._pages_created += 1
+        return self._browser.new_page()
+
+    def _release(self, page):
+        if page.is_closed():
+            self._pages_created -= 1
+        elif len(self._idle_pages) < self.pool_size:
+            self._idle_pages.append(page)
+        else:
+            page.close()
+            self._pages_created -= 1
+
+    @contextmanager
+    def page(self):
+        """Borrow a page from the pool and hand it back afterwards"""
+        page = self._acquire()
+        try:
+            yield page
+        except Exception:
+            # A page that failed mid-render may be in a bad state; drop it
+            page.close()
+            raise
+        finally:
+            self._release(page)
+
+    def render_pdf(self, html_content, output_pdf_path, margin_mm=6, page_format='A4'):
+        """Render an HTML string to a PDF file on a pooled page
+
+        page_format=None takes the paper size from the document's @page rule.
+        """
+        with self.page() as page:
+            with span("page.set_content", html_bytes=len(html_content)):
+                page.set_content(html_content)
+            self._print(page, output_pdf_path, margin_mm, page_format)
+
+    def render_pdf_file(self, html_path, output_pdf_path, margin_mm=6, page_format='A4'):
+        """Render an HTML file to PDF; the browser reads the file, so Python never holds the document"""
+        html_path = Path(html_path).resolve()
+        with self.page() as page:
+            with span("page.goto", html_bytes=html_path.stat().st_size):
+                page.goto(html_path.as_uri())
+            self._print(page, output_pdf_path, margin_mm, page_format)
+
+    def _print(self, page, output_pdf_path, margin_mm, page_format):
+        margin = f"{margin_mm}mm"
+        paper = {'format': page_format} if page_format else {'prefer_css_page_size': True}
+        with span("page.pdf", output=Path(output_pdf_path).name):
+            page.pdf(
+                path=str(output_pdf_path),
+                **paper,
+                margin={
+                    'top': margin,
+                    'bottom': margin,
+                    'left': margin,
+                    'right': margin
+                },
+                print_background=True
+            )
+        self.renders += 1
+
+def open_browser_pool(pool_size=DEFAULT_POOL_SIZE):
+    """Start a pool, or return None (with install hints) if Playwright is unavailable"""
+    try:
+        return BrowserPool(pool_size=pool_size).start()
+    except ImportError:
+        print("Playwright not installed. Install with: pip install playwright")
+        print("Then run: playwright install chromium")
+        return None
+    except Exception as e:
+        print(f"Could not start Chromium: {e}")
+        return None
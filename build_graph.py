@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+"""
+Artifact Build Graph for Business Card Outputs
+QR generation, SVG templating, print optimization, HTML wrapping and
+PDF rendering are nodes with declared input and output files. Nodes
+whose inputs are ready run in parallel worker processes, and a node is
+skipped when the content hashes of its inputs and outputs match the last
+successful build
+
+Usage:
+    python build_graph.py                          # everything into build/
+    python build_graph.py pdf:square-front --backend playwright
+    python build_graph.py --list
+    python build_graph.py --url https://example.com --field name="Ada Lovelace"
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from tracing import add_trace_argument, configure, span
+
+GRAPH_VERSION = 1
+STATE_FILE = ".build_state.json"
+DEFAULT_URL = "https://soul059.github.io/Business-card/"
+
+
+@dataclass
+class Node:
+    """One build step: action(inputs, outputs, **params) must write every output"""
+    name: str
+    action: object
+    inputs: tuple = ()
+    outputs: tuple = ()
+    params: dict = field(default_factory=dict)
+
+
+def _file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 16), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def node_key(node):
+    """Hash of the node's action, parameters, output paths and input contents"""
+    digest = hashlib.sha256()
+    meta = [GRAPH_VERSION, node.name, node.action.__qualname__, node.params,
+            [str(path) for path in node.outputs]]
+    digest.update(json.dumps(meta, sort_keys=True, default=str).encode('utf-8'))
+    for path in node.inputs:
+        digest.update(_file_hash(path).encode('ascii'))
+    return digest.hexdigest()
+
+
+def _run_node(node):
+    """Worker entry point: run one action and hash what it wrote"""
+    started = time.perf_counter()
+    with span(node.name, cat="build"):
+        for output in node.outputs:
+            Path(output).parent.mkdir(parents=True, exist_ok=True)
+        node.action(node.inputs, node.outputs, **node.params)
+    missing = [str(output) for output in node.outputs if not Path(output).exists()]
+    if missing:
+        raise RuntimeError(f"{node.name} did not write {', '.join(missing)}")
+    return {str(output): _file_hash(output) for output in node.outputs}, time.perf_counter() - started
+
+
+def _load_state(state_path):
+    try:
+        return json.loads(Path(state_path).read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_state(state_path, state):
+    state_path = Path(state_path)
+    state_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = state_path.with_name(f".{state_path.name}.{os.getpid()}.tmp")
+    tmp_path.write_text(json.dumps(state, indent=1, sort_keys=True), encoding='utf-8')
+    os.replace(tmp_path, state_path)
+
+
+def _up_to_date(entry, key):
+    if not entry or entry.get("key") != key:
+        return False
+    for output, digest in entry.get("outputs", {}).items():
+        if not Path(output).exists() or _file_hash(output) != digest:
+            return False
+    return True
+
+
+def select_nodes(nodes, targets=None):
+    """The target nodes plus everything they depend on, in declaration order"""
+    by_name = {node.name: node for node in nodes}
+    producer = {str(output): node.name for node in nodes for output in node.outputs}
+    if not targets:
+        return list(nodes)
+    unknown = [target for target in targets if target not in by_name]
+    if unknown:
+        raise ValueError(f"Unknown target(s): {', '.join(unknown)}")
+
+    needed = set()
+    stack = list(targets)
+    while stack:
+        name = stack.pop()
+        if name in needed:
+            continue
+        needed.add(name)
+        stack.extend(producer[str(path)] for path in by_name[name].inputs if str(path) in producer)
+    return [node for node in nodes if node.name in needed]
+
+
+def build(nodes, state_path, targets=None, workers=None, force=False):
+    """
+    Run the graph and return {node name: (status, seconds)}
+
+    Status is "built", "up-to-date", "failed: ..." or "blocked" (an
+    input's producer failed). Independent nodes run concurrently on
+    `workers` processes; workers=1 runs everything in this process.
+    """
+    nodes = select_nodes(nodes, targets)
+    producer = {str(output): node.name for node in nodes for output in node.outputs}
+    deps = {node.name: {producer[str(path)] for path in node.inputs if str(path) in producer} for node in nodes}
+    workers = workers or os.cpu_count() or 1
+
+    state = _load_state(state_path)
+    results = {}
+    pending = list(nodes)
+    running = {}
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        while pending or running:
+            for node in list(pending):
+                if any(dep not in results for dep in deps[node.name]):
+                    continue
+                pending.remove(node)
+                if any(results[dep][0] not in ("built", "up-to-date") for dep in deps[node.name]):
+                    results[node.name] = ("blocked", 0.0)
+                    continue
+                try:
+                    key = node_key(node)
+                except OSError as e:
+                    # A source file (not produced by the graph) is missing or unreadable
+                    results[node.name] = (f"failed: {e}", 0.0)
+                    print(f"  ✗ {node.name}: {e}")
+                    continue
+                if not force and _up_to_date(state.get(node.name), key):
+                    results[node.name] = ("up-to-date", 0.0)
+                    print(f"  = {node.name}")
+                    continue
+                if executor is None:
+                    running[_completed(node)] = (node, key)
+                else:
+                    running[executor.submit(_run_node, node)] = (node, key)
+
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                node, key = running.pop(future)
+                try:
+                    outputs, seconds = future.result()
+                except Exception as e:
+                    results[node.name] = (f"failed: {e}", 0.0)
+                    state.pop(node.name, None)
+                    print(f"  ✗ {node.name}: {e}")
+                    continue
+                results[node.name] = ("built", seconds)
+                state[node.name] = {"key": key, "outputs": outputs}
+                print(f"  ✓ {node.name} ({seconds:.2f}s)")
+    finally:
+        if executor is not None:
+            executor.shutdown()
+        _save_state(state_path, state)
+    return results
+
+
+def _completed(node):
+    """Run a node inline and wrap the outcome like an executor future"""
+    from concurrent.futures import Future
+
+    future = Future()
+    try:
+        future.set_result(_run_node(node))
+    except Exception as e:
+        future.set_exception(e)
+    return future
+
+
+# --- Actions (module level so worker processes can unpickle them) ---
+
+def make_qr(inputs, outputs, url):
+    """QR symbol as a standalone SVG plus its path data as JSON"""
+    from dataclasses import asdict
+
+    from qr_service import encode
+
+    result = encode(url)
+    svg_path, json_path = outputs
+    Path(svg_path).write_text(result.svg(), encoding='utf-8')
+    Path(json_path).write_text(json.dumps(asdict(result)), encoding='utf-8')
+
+
+def fill_svg_template(inputs, outputs, fields):
+    """Fill id/placeholder fields and drop the generated QR into the template's QR slot"""
+    from batch_cards import QRSlot, compile_template, fill_template
+    from qr_service import QRResult
+
+    template_path, qr_json = (inputs + (None,))[:2]
+    compiled = compile_template(Path(template_path).read_text(encoding='utf-8'))
+    if qr_json:
+        qr = QRResult(**json.loads(Path(qr_json).read_text(encoding='utf-8')))
+        compiled = [qr.svg_group(part.x, part.y, part.size) if isinstance(part, QRSlot) else part
+                    for part in compiled]
+    Path(outputs[0]).write_text(fill_template(compiled, fields), encoding='utf-8')
+
+
+def optimize_svg_file(inputs, outputs, profile):
+    from svg_optimizer import optimize_svg
+
+    svg_content = Path(inputs[0]).read_text(encoding='utf-8')
+    text = optimize_svg(svg_content, **profile).text if profile is not None else svg_content
+    Path(outputs[0]).write_text(text, encoding='utf-8')
+
+
+def square_layout_html(inputs, outputs, h, v, side):
+    from create_square_card_pdfs import create_square_card_pdf
+
+    html_content, _ = create_square_card_pdf(str(inputs[0]), h, v, side)
+    Path(outputs[0]).write_text(html_content, encoding='utf-8')
+
+
+def sheet_html(inputs, outputs, single):
+    from svg_to_pdf_simple import create_html_wrapper, create_single_card_html
+
+    builder = create_single_card_html if single else create_html_wrapper
+    Path(outputs[0]).write_text(builder(str(inputs[0])), encoding='utf-8')
+
+
+def square_layout_pdf(inputs, outputs, h, v, side, backend):
+    if backend == "playwright":
+        from browser_pool import BrowserPool
+
+        html_content = Path(inputs[0]).read_text(encoding='utf-8')
+        with BrowserPool(pool_size=1) as pool:
+            pool.render_pdf(html_content, outputs[0], margin_mm=6)
+        return
+    from native_layout import create_native_layout_pdf, square_card_footer
+
+    title = f"Square Business Cards - {side.title()} Side ({h}×{v} = {h * v} cards)"
+    create_native_layout_pdf(inputs[0], outputs[0], h, v, title=title,
+                             footer_lines=square_card_footer(h, v, side), margin_mm=6, gap_mm=2)
+
+
+def sheet_pdf(inputs, outputs, backend):
+    if backend == "playwright":
+        from browser_pool import BrowserPool
+
+        html_content = Path(inputs[0]).read_text(encoding='utf-8')
+        with BrowserPool(pool_size=1) as pool:
+            pool.render_pdf(html_content, outputs[0], margin_mm=10)
+        return
+    from svg_to_pdf_converter_v2 import card_grid, create_card_job_pdf
+
+    create_card_job_pdf(str(inputs[0]), outputs[0], total_cards=len(card_grid()))
+
+
+def default_graph(script_dir, out_dir, url=DEFAULT_URL, fields=None, backend="native", layout=None,
+                  html_dir=None):
+    """
+    The standard pipeline for the bundled SVGs
+
+    qr -> template:* -> optimize:* -> html:* and pdf:*. Native PDFs are
+    drawn from the optimized SVG; playwright PDFs print the HTML node.
+    html_dir places the two print-ready sheets somewhere other than out_dir.
+    """
+    from create_square_card_pdfs import best_fit_layout
+    from svg_optimizer import print_profile
+
+    script_dir, out_dir = Path(script_dir).resolve(), Path(out_dir).resolve()
+    html_dir = Path(html_dir).resolve() if html_dir else out_dir
+    h, v = layout or best_fit_layout()
+    fields = dict(fields or {})
+    profile = print_profile()
+    qr_svg, qr_json = out_dir / "qr_code_website.svg", out_dir / "qr_code_website.json"
+
+    nodes = [Node("qr", make_qr, outputs=(qr_svg, qr_json), params={"url": url})]
+    for source, name, has_qr in (("business_card_front.svg", "front", False),
+                                 ("business_card_back.svg", "back", True),
+                                 ("business_card_print_ready.svg", "print-ready", True)):
+        templated = out_dir / f"{Path(source).stem}.filled.svg"
+        optimized = out_dir / f"{Path(source).stem}.opt.svg"
+        nodes.append(Node(f"template:{name}", fill_svg_template,
+                          inputs=(script_dir / source, qr_json) if has_qr else (script_dir / source,),
+                          outputs=(templated,), params={"fields": fields}))
+        nodes.append(Node(f"optimize:{name}", optimize_svg_file, inputs=(templated,), outputs=(optimized,),
+                          params={"profile": profile}))
+
+    for side in ("front", "back"):
+        optimized = out_dir / f"business_card_{side}.opt.svg"
+        html_path = out_dir / f"square_cards_{side}_{h}x{v}_A4.html"
+        nodes.append(Node(f"html:square-{side}", square_layout_html, inputs=(optimized,), outputs=(html_path,),
+                          params={"h": h, "v": v, "side": side}))
+        nodes.append(Node(f"pdf:square-{side}", square_layout_pdf,
+                          inputs=(html_path,) if backend == "playwright" else (optimized,),
+                          outputs=(out_dir / f"square_cards_{side}_{h}x{v}_A4.pdf",),
+                          params={"h": h, "v": v, "side": side, "backend": backend}))
+
+    print_ready = out_dir / "business_card_print_ready.opt.svg"
+    multiple_html = html_dir / "business_cards_multiple_A4.html"
+    nodes.append(Node("html:multiple", sheet_html, inputs=(print_ready,), outputs=(multiple_html,),
+                      params={"single": False}))
+    nodes.append(Node("html:single", sheet_html, inputs=(print_ready,),
+                      outputs=(html_dir / "business_cards_single_A4.html",), params={"single": True}))
+    nodes.append(Node("pdf:multiple", sheet_pdf,
+                      inputs=(multiple_html,) if backend == "playwright" else (print_ready,),
+                      outputs=(out_dir / "business_cards_multiple_A4.pdf",), params={"backend": backend}))
+    return nodes
+
+
+def unfinished_nodes(results):
+    """Names of the nodes in build() results that failed or were blocked by a failure"""
+    return [name for name, (status, _) in results.items() if status not in ("built", "up-to-date")]
+
+
+def build_sheet_html(script_dir):
+    """
+    Make business_cards_multiple_A4.html and business_cards_single_A4.html
+    next to the SVGs, rebuilding only what changed
+
+    Returns the names of the nodes that failed or were blocked (empty on success).
+    """
+    script_dir = Path(script_dir)
+    out_dir = script_dir / "build"
+    nodes = default_graph(script_dir, out_dir, html_dir=script_dir)
+    results = build(nodes, out_dir / STATE_FILE, ["html:multiple", "html:single"], workers=1)
+    return unfinished_nodes(results)
+
+
+def main():
+    script_dir = Path(__file__).parent
+
+    parser = argparse.ArgumentParser(description="Build card artifacts from a dependency graph")
+    parser.add_argument("targets", nargs="*", help="node names to build (default: all)")
+    parser.add_argument("--out", default=str(script_dir / "build"), help="output folder")
+    parser.add_argument("--url", default=DEFAULT_URL, help="QR code payload")
+    parser.add_argument("--field", action="append", default=[], metavar="ID=TEXT",
+                        help="replace the text of the SVG element with this id (repeatable)")
+    parser.add_argument("--backend", choices=["native", "playwright"], default="native")
+    parser.add_argument("--layout", default=None, help="square card grid as COLSxROWS (default: best fit)")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument("--force", action="store_true", help="rebuild even when up to date")
+    parser.add_argument("--list", action="store_true", help="show the nodes and their inputs")
+    add_trace_argument(parser)
+    args = parser.parse_args()
+    configure(args.trace)
+
+    try:
+        fields = dict(item.split("=", 1) for item in args.field)
+        layout = tuple(int(n) for n in args.layout.lower().split("x")) if args.layout else None
+    except ValueError:
+        print("Error: use --field ID=TEXT and --layout COLSxROWS")
+        return 2
+
+    out_dir = Path(args.out)
+    nodes = default_graph(script_dir, out_dir, args.url, fields, args.backend, layout)
+    if args.list:
+        for node in nodes:
+            inputs = ", ".join(Path(path).name for path in node.inputs) or "-"
+            print(f"{node.name:<22} <- {inputs}")
+        return 0
+
+    started = time.perf_counter()
+    try:
+        results = build(nodes, out_dir / STATE_FILE, args.targets, args.workers, args.force)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 2
+
+    built = sum(status == "built" for status, _ in results.values())
+    fresh = sum(status == "up-to-date" for status, _ in results.values())
+    failed = unfinished_nodes(results)
+    print(f"✓ {built} built, {fresh} up to date, {len(failed)} failed or blocked "
+          f"in {time.perf_counter() - started:.2f}s → {out_dir}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -10,22 +10,45 @@ Customizable Square Business Card P        .card svg {
 Create PDFs with different numbers of square cards per page
 """
 
+import argparse
 import sys
+import time
 from pathlib import Path
 
-def create_custom_layout_html(svg_file_path, cards_horizontal=2, cards_vertical=3, output_html_path=None):
+from async_renderer import RenderJob, render_jobs, print_render_summary
+from browser_pool import BrowserPool
+from html_stream import PAGE_BREAK, card_cells, paginate, write_html
+from imposition import best_grid
+from render_cache import get_cache, render_key, store_render_results
+from svg_symbols import card_markup
+from tracing import add_trace_argument, configure, span, traced
+
+@traced("html.build")
+def create_custom_layout_html(svg_file_path, cards_horizontal=2, cards_vertical=3, output_html_path=None, dedup=None):
     """Create HTML with custom card layout"""
+    if output_html_path is None:
+        output_html_path = f"business_cards_{cards_horizontal}x{cards_vertical}_A4.html"
+    html_content = "".join(iter_custom_layout_html(svg_file_path, cards_horizontal, cards_vertical, dedup))
+    return html_content, output_html_path
+
+def iter_custom_layout_html(svg_file_path, cards_horizontal=2, cards_vertical=3, dedup=None, total_cards=None, cards=None):
+    """
+    Yield the custom layout HTML in chunks
+
+    Pages repeat the title, grid and notes for total_cards copies of the
+    card (default one page) or for each markup string in cards.
+    """
     
     # Read the SVG content
-    with open(svg_file_path, 'r', encoding='utf-8') as f:
+    with span("svg.read", file=Path(svg_file_path).name), open(svg_file_path, 'r', encoding='utf-8') as f:
         svg_content = f.read()
     
-    cards_per_page = cards_horizontal * cards_vertical
+    # With dedup the card is defined once and each cell is a <use> reference
+    svg_defs, card_svg = card_markup(svg_content, dedup)
     
-    if output_html_path is None:
-        output_html_path = f"business_cards_{cards_horizontal}x{cards_vertical}_A4.html"
+    cards_per_page = cards_horizontal * cards_vertical
     
-    html_content = f"""
+    yield f"""
 <!DOCTYPE html>
 <html>
 <head>
@@ -102,16 +125,20 @@ def create_custom_layout_html(svg_file_path, cards_horizontal=2, cards_vertical=
     </style>
 </head>
 <body>
-    <div class="page-title">Business Cards - {cards_horizontal}×{cards_vertical} Layout ({cards_per_page} cards per page)</div>
-    
-    <div class="cards-container">
+{svg_defs}
 """
     
-    # Add cards
-    for i in range(cards_per_page):
-        html_content += f'        <div class="card">\n{svg_content}\n        </div>\n'
+    cells = card_cells(card_svg, cards_per_page, total_cards, cards)
+    for page_number, page in enumerate(paginate(cells, cards_per_page)):
+        if page_number:
+            yield PAGE_BREAK
+        yield f"""    <div class="page-title">Business Cards - {cards_horizontal}×{cards_vertical} Layout ({cards_per_page} cards per page)</div>
     
-    html_content += f"""
+    <div class="cards-container">
+"""
+        for cell in page:
+            yield f'        <div class="card">\n{cell}\n        </div>\n'
+        yield f"""
     </div>
     
     <div class="instructions">
@@ -120,36 +147,55 @@ def create_custom_layout_html(svg_file_path, cards_horizontal=2, cards_vertical=
         <br><strong>Printing:</strong> Use 250-300gsm cardstock, high-quality settings, cut along dashed lines
         <br><strong>Note:</strong> Front and back are separate files - print each separately or combine as needed
     </div>
-</body>
-</html>
 """
     
-    return html_content, output_html_path
+    yield """</body>
+</html>
+"""
+
+def create_pdf_with_playwright_custom(html_content, output_pdf_path, pool=None, html_path=None):
+    """Convert HTML to PDF using Playwright
 
-def create_pdf_with_playwright_custom(html_content, output_pdf_path):
-    """Convert HTML to PDF using Playwright"""
+    Pass a started BrowserPool to reuse its warm Chromium instead of
+    launching a new browser for this one PDF. With html_path the browser
+    loads the already written file and html_content may be None.
+    """
     try:
+        if pool is not None:
+            if html_path is not None:
+                pool.render_pdf_file(html_path, output_pdf_path, margin_mm=8)
+            else:
+                pool.render_pdf(html_content, output_pdf_path, margin_mm=8)
+            return True
+        
         from playwright.sync_api import sync_playwright
         
         with sync_playwright() as p:
-            browser = p.chromium.launch()
+            with span("browser.launch"):
+                browser = p.chromium.launch()
             page = browser.new_page()
             
             # Set HTML content
-            page.set_content(html_content)
+            if html_path is not None:
+                with span("page.goto"):
+                    page.goto(Path(html_path).resolve().as_uri())
+            else:
+                with span("page.set_content", html_bytes=len(html_content)):
+                    page.set_content(html_content)
             
             # Generate PDF
-            page.pdf(
-                path=str(output_pdf_path),
-                format='A4',
-                margin={
-                    'top': '8mm',
-                    'bottom': '8mm', 
-                    'left': '8mm',
-                    'right': '8mm'
-                },
-                print_background=True
-            )
+            with span("page.pdf"):
+                page.pdf(
+                    path=str(output_pdf_path),
+                    format='A4',
+                    margin={
+                        'top': '8mm',
+                        'bottom': '8mm', 
+                        'left': '8mm',
+                        'right': '8mm'
+                    },
+                    print_background=True
+                )
             
             browser.close()
         
@@ -163,7 +209,19 @@ def create_pdf_with_playwright_custom(html_content, output_pdf_path):
         print(f"PDF conversion failed: {e}")
         return False
 
+def best_fit_layout():
+    """Densest upright grid of 85mm square cards that fits the A4 layout's margins and notes"""
+    return best_grid(85, 85, "A4", gutter=1.5, margin=8, reserve_top=8, reserve_bottom=12)
+
 def main():
+    parser = argparse.ArgumentParser(description="Custom business card layout generator")
+    parser.add_argument("--backend", choices=["playwright", "native"], default="playwright",
+                        help="native renders with ReportLab/svglib, no browser needed")
+    add_trace_argument(parser)
+    args = parser.parse_args()
+    backend = args.backend
+    configure(args.trace)
+    
     script_dir = Path(__file__).parent
     svg_file = script_dir / "business_card_print_ready.svg"
     
@@ -175,8 +233,10 @@ def main():
     print("=" * 40)
     
     # Predefined layouts optimized for square cards (85mm × 85mm)
+    # The first entry is whatever the imposition solver finds densest
+    best_h, best_v = best_fit_layout()
     layouts = [
-        (2, 3, "Standard (6 cards) - Best fit for A4"),
+        (best_h, best_v, f"Standard ({best_h * best_v} cards) - Best fit for A4"),
         (2, 2, "Medium (4 cards) - Good spacing"),
         (1, 3, "Single column (3 cards) - Easy cutting"),
         (3, 2, "Wide (6 cards) - Horizontal layout"),
@@ -192,48 +252,115 @@ def main():
     print("  8. Custom layout")
     print("  9. Create all standard layouts")
     
+    # One warm browser for every layout in this run (started lazily,
+    # so the native backend never launches it)
+    pool = BrowserPool()
+    
     try:
         choice = input("\nSelect layout (1-9): ").strip()
         
         if choice == "9":
             # Create all standard layouts
             print("\nCreating all standard layouts...")
-            for h, v, desc in layouts[:6]:  # Skip single card for this batch
-                create_layout(script_dir, svg_file, h, v, desc)
-            print("All layouts created!")
+            if create_all_layouts(script_dir, svg_file, layouts[:6], backend=backend):  # Skip single card for this batch
+                print("All layouts created!")
             
         elif choice == "8":
             # Custom layout
             h = int(input("Cards horizontally (1-4): "))
             v = int(input("Cards vertically (1-8): "))
             if h < 1 or h > 4 or v < 1 or v > 8:
-                print("Invalid layout. Using 2×5 instead.")
-                h, v = 2, 5
-            create_layout(script_dir, svg_file, h, v, "Custom")
+                print(f"Invalid layout. Using {best_h}×{best_v} instead.")
+                h, v = best_h, best_v
+            create_layout(script_dir, svg_file, h, v, "Custom", pool=pool, backend=backend)
             
         elif choice.isdigit() and 1 <= int(choice) <= 7:
             # Selected layout
             h, v, desc = layouts[int(choice) - 1]
-            create_layout(script_dir, svg_file, h, v, desc)
+            create_layout(script_dir, svg_file, h, v, desc, pool=pool, backend=backend)
             
         else:
-            print("Invalid choice. Using standard 2×5 layout.")
-            create_layout(script_dir, svg_file, 2, 5, "Standard")
+            print(f"Invalid choice. Using standard {best_h}×{best_v} layout.")
+            create_layout(script_dir, svg_file, best_h, best_v, "Standard", pool=pool, backend=backend)
             
     except (ValueError, KeyboardInterrupt):
-        print("\nUsing standard 2×5 layout.")
-        create_layout(script_dir, svg_file, 2, 5, "Standard")
+        print(f"\nUsing standard {best_h}×{best_v} layout.")
+        create_layout(script_dir, svg_file, best_h, best_v, "Standard", pool=pool, backend=backend)
+    finally:
+        if pool is not None:
+            pool.close()
 
-def create_layout(script_dir, svg_file, h, v, desc):
+def create_pdf_native_custom(svg_file, output_pdf_path, h, v):
+    """Render the layout with ReportLab/svglib instead of a browser"""
+    try:
+        from native_layout import create_native_layout_pdf
+        
+        title = f"Business Cards - {h}×{v} Layout ({h * v} cards per page)"
+        footer = [
+            f"Layout: {h} columns × {v} rows = {h * v} cards per A4 page",
+            "Card Size: 85mm × 85mm (square business card)",
+            "Printing: Use 250-300gsm cardstock, high-quality settings, cut along dashed lines",
+        ]
+        return create_native_layout_pdf(svg_file, output_pdf_path, h, v, title=title,
+                                        footer_lines=footer, margin_mm=8, gap_mm=1.5)
+    except ImportError:
+        print("svglib/reportlab not installed. Install with: pip install svglib reportlab")
+        return False
+    except Exception as e:
+        print(f"Native PDF rendering failed: {e}")
+        return False
+
+def create_all_layouts(script_dir, svg_file, layouts, backend="playwright"):
+    """Render every layout concurrently on one browser"""
+    if backend == "native":
+        # No browser to share; native renders are fast enough to run in turn
+        for h, v, desc in layouts:
+            create_layout(script_dir, svg_file, h, v, desc, backend=backend)
+        return True
+    
+    cache = get_cache()
+    jobs = []
+    for h, v, desc in layouts:
+        html_content, html_filename = create_custom_layout_html(str(svg_file), h, v)
+        with span("file.write"), open(script_dir / html_filename, 'w', encoding='utf-8') as f:
+            f.write(html_content)
+        
+        pdf_path = script_dir / html_filename.replace('.html', '.pdf')
+        key = render_key(svg_file, "playwright", "print_ready", h=h, v=v, margin_mm=8, page="A4")
+        if cache.fetch(key, pdf_path):
+            print(f"✓ {pdf_path.name} (cached)")
+            continue
+        jobs.append(RenderJob(html_content, str(pdf_path), margin_mm=8,
+                              label=f"{h}×{v}", cache_key=key))
+    
+    if not jobs:
+        return True
+    
+    print(f"Rendering {len(jobs)} PDFs concurrently...")
+    started = time.perf_counter()
+    try:
+        results = render_jobs(jobs)
+    except ImportError:
+        print("Playwright not installed. Install with: pip install playwright")
+        print("Then run: playwright install chromium")
+        print("HTML files are available for manual printing")
+        return False
+    except Exception as e:
+        print(f"PDF conversion failed: {e}")
+        return False
+    
+    store_render_results(cache, results)
+    print_render_summary(results, started)
+    return all(result.ok for result in results)
+
+def create_layout(script_dir, svg_file, h, v, desc, pool=None, backend="playwright"):
     """Create a specific layout"""
     print(f"\nCreating {h}×{v} layout ({desc})...")
     
-    # Create HTML
-    html_content, html_filename = create_custom_layout_html(str(svg_file), h, v)
+    # Stream the HTML to disk; the browser prints from the file
+    html_filename = f"business_cards_{h}x{v}_A4.html"
     html_path = script_dir / html_filename
-    
-    with open(html_path, 'w', encoding='utf-8') as f:
-        f.write(html_content)
+    write_html(iter_custom_layout_html(str(svg_file), h, v), html_path)
     
     print(f"✓ HTML created: {html_filename}")
     
@@ -241,7 +368,17 @@ def create_layout(script_dir, svg_file, h, v, desc):
     pdf_filename = html_filename.replace('.html', '.pdf')
     pdf_path = script_dir / pdf_filename
     
-    if create_pdf_with_playwright_custom(html_content, str(pdf_path)):
+    cache = get_cache()
+    key = render_key(svg_file, backend, "print_ready", h=h, v=v, margin_mm=8, page="A4")
+    if backend == "native":
+        render = lambda: create_pdf_native_custom(svg_file, str(pdf_path), h, v)
+    else:
+        render = lambda: create_pdf_with_playwright_custom(None, str(pdf_path), pool=pool, html_path=html_path)
+    
+    if cache.fetch(key, pdf_path):
+        print(f"✓ PDF up to date (cached): {pdf_filename}")
+    elif render():
+        cache.store(key, pdf_path)
         print(f"✓ PDF created: {pdf_filename}")
         print(f"  Cards per page: {h * v}")
         print(f"  File size optimized for A4 printing")
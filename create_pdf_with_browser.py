@@ -77,12 +77,16 @@ def install_playwright():
 def main():
     script_dir = Path(__file__).parent
     
-    # Check if HTML files exist
+    # The sheets to convert
     html_multiple = script_dir / "business_cards_multiple_A4.html"
     html_single = script_dir / "business_cards_single_A4.html"
     
-    if not html_multiple.exists() or not html_single.exists():
-        print("HTML files not found. Run svg_to_pdf_simple.py first.")
+    # Build the HTML sheets, or refresh them if an SVG changed since the last run
+    from build_graph import build_sheet_html
+
+    unfinished = build_sheet_html(script_dir)
+    if unfinished:
+        print(f"HTML files could not be built; failed or blocked: {', '.join(unfinished)}")
         return
     
     print("Attempting to create PDFs using browser automation...")
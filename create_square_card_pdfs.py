@@ -5,20 +5,44 @@ Create PDFs with multiple square cards per page (85mm × 85mm)
 Works with separate front and back SVG files
 """
 
+import argparse
 import sys
+import time
 from pathlib import Path
 
-def create_square_card_pdf(svg_file_path, cards_horizontal=2, cards_vertical=3, card_type="front"):
+from async_renderer import RenderJob, render_jobs, print_render_summary
+from browser_pool import BrowserPool
+from html_stream import PAGE_BREAK, card_cells, paginate, write_html
+from imposition import best_grid
+from render_cache import get_cache, render_key, store_render_results
+from svg_symbols import card_markup
+from tracing import add_trace_argument, configure, span, traced
+
+@traced("html.build")
+def create_square_card_pdf(svg_file_path, cards_horizontal=2, cards_vertical=3, card_type="front", dedup=None):
     """Create PDF layout optimized for square business cards"""
+    output_filename = f"square_cards_{card_type}_{cards_horizontal}x{cards_vertical}_A4"
+    html_content = "".join(iter_square_card_html(svg_file_path, cards_horizontal, cards_vertical, card_type, dedup))
+    return html_content, output_filename
+
+def iter_square_card_html(svg_file_path, cards_horizontal=2, cards_vertical=3, card_type="front", dedup=None, total_cards=None, cards=None):
+    """
+    Yield the square-card layout HTML in chunks
+
+    Pages repeat the title, grid and notes for total_cards copies of the
+    card (default one page) or for each markup string in cards.
+    """
     
     # Read the SVG content
-    with open(svg_file_path, 'r', encoding='utf-8') as f:
+    with span("svg.read", file=Path(svg_file_path).name), open(svg_file_path, 'r', encoding='utf-8') as f:
         svg_content = f.read()
     
+    # With dedup the card is defined once and each cell is a <use> reference
+    svg_defs, card_svg = card_markup(svg_content, dedup)
+    
     cards_per_page = cards_horizontal * cards_vertical
-    output_filename = f"square_cards_{card_type}_{cards_horizontal}x{cards_vertical}_A4"
     
-    html_content = f"""
+    yield f"""
 <!DOCTYPE html>
 <html>
 <head>
@@ -102,16 +126,20 @@ def create_square_card_pdf(svg_file_path, cards_horizontal=2, cards_vertical=3,
     </style>
 </head>
 <body>
-    <div class="page-title">Square Business Cards - {card_type.title()} Side ({cards_horizontal}×{cards_vertical} = {cards_per_page} cards)</div>
-    
-    <div class="cards-container">
+{svg_defs}
 """
     
-    # Add cards
-    for i in range(cards_per_page):
-        html_content += f'        <div class="card">\n{svg_content}\n        </div>\n'
+    cells = card_cells(card_svg, cards_per_page, total_cards, cards)
+    for page_number, page in enumerate(paginate(cells, cards_per_page)):
+        if page_number:
+            yield PAGE_BREAK
+        yield f"""    <div class="page-title">Square Business Cards - {card_type.title()} Side ({cards_horizontal}×{cards_vertical} = {cards_per_page} cards)</div>
     
-    html_content += f"""
+    <div class="cards-container">
+"""
+        for cell in page:
+            yield f'        <div class="card">\n{cell}\n        </div>\n'
+        yield f"""
     </div>
     
     <div class="instructions">
@@ -119,36 +147,55 @@ def create_square_card_pdf(svg_file_path, cards_horizontal=2, cards_vertical=3,
         Card Type: {card_type.title()} • Layout: {cards_horizontal} cols × {cards_vertical} rows<br>
         Print on 250-300gsm cardstock • Cut along dashed lines • High quality settings recommended
     </div>
-</body>
-</html>
 """
     
-    return html_content, output_filename
+    yield """</body>
+</html>
+"""
 
-def create_pdf_with_playwright(html_content, output_pdf_path):
-    """Convert HTML to PDF using Playwright"""
+def create_pdf_with_playwright(html_content, output_pdf_path, pool=None, html_path=None):
+    """Convert HTML to PDF using Playwright
+
+    Pass a started BrowserPool to reuse its warm Chromium instead of
+    launching a new browser for this one PDF. With html_path the browser
+    loads the already written file and html_content may be None.
+    """
     try:
+        if pool is not None:
+            if html_path is not None:
+                pool.render_pdf_file(html_path, output_pdf_path, margin_mm=6)
+            else:
+                pool.render_pdf(html_content, output_pdf_path, margin_mm=6)
+            return True
+        
         from playwright.sync_api import sync_playwright
         
         with sync_playwright() as p:
-            browser = p.chromium.launch()
+            with span("browser.launch"):
+                browser = p.chromium.launch()
             page = browser.new_page()
             
             # Set HTML content
-            page.set_content(html_content)
+            if html_path is not None:
+                with span("page.goto"):
+                    page.goto(Path(html_path).resolve().as_uri())
+            else:
+                with span("page.set_content", html_bytes=len(html_content)):
+                    page.set_content(html_content)
             
             # Generate PDF with optimized settings for square cards
-            page.pdf(
-                path=str(output_pdf_path),
-                format='A4',
-                margin={
-                    'top': '6mm',
-                    'bottom': '6mm', 
-                    'left': '6mm',
-                    'right': '6mm'
-                },
-                print_background=True
-            )
+            with span("page.pdf"):
+                page.pdf(
+                    path=str(output_pdf_path),
+                    format='A4',
+                    margin={
+                        'top': '6mm',
+                        'bottom': '6mm', 
+                        'left': '6mm',
+                        'right': '6mm'
+                    },
+                    print_background=True
+                )
             
             browser.close()
         
@@ -162,7 +209,19 @@ def create_pdf_with_playwright(html_content, output_pdf_path):
         print(f"PDF conversion failed: {e}")
         return False
 
+def best_fit_layout():
+    """Densest upright grid of 85mm square cards that fits the A4 layout's margins and notes"""
+    return best_grid(85, 85, "A4", gutter=2, margin=6, reserve_top=8, reserve_bottom=12)
+
 def main():
+    parser = argparse.ArgumentParser(description="Square business card PDF generator")
+    parser.add_argument("--backend", choices=["playwright", "native"], default="playwright",
+                        help="native renders with ReportLab/svglib, no browser needed")
+    add_trace_argument(parser)
+    args = parser.parse_args()
+    backend = args.backend
+    configure(args.trace)
+    
     script_dir = Path(__file__).parent
     front_svg = script_dir / "business_card_front.svg"
     back_svg = script_dir / "business_card_back.svg"
@@ -179,8 +238,10 @@ def main():
     print()
     
     # Optimal layouts for square cards on A4
+    # The first entry is whatever the imposition solver finds densest
+    best_h, best_v = best_fit_layout()
     layouts = [
-        (2, 3, "Standard (6 cards) - Best fit"),
+        (best_h, best_v, f"Standard ({best_h * best_v} cards) - Best fit"),
         (2, 2, "Medium (4 cards) - Good spacing"),
         (1, 3, "Column (3 cards) - Easy cutting"),
         (3, 2, "Wide (6 cards) - Horizontal"),
@@ -197,6 +258,11 @@ def main():
     print("  9. Create all layouts (both front and back)")
     print("  f. Front cards only")
     print("  b. Back cards only")
+    print("  d. Duplex - fronts and mirrored backs interleaved in one PDF")
+    
+    # One warm browser for every layout and side in this run (started lazily,
+    # so the native backend never launches it)
+    pool = BrowserPool()
     
     try:
         choice = input("\nSelect option: ").strip().lower()
@@ -204,23 +270,27 @@ def main():
         if choice == "9":
             # Create all layouts for both front and back
             print("\nCreating all layouts for both front and back...")
-            for h, v, desc in layouts[:6]:  # Skip single card for batch
-                create_card_layout(script_dir, front_svg, back_svg, h, v, desc, both=True)
-            print("All layouts created!")
+            if create_all_layouts(script_dir, front_svg, back_svg, layouts[:6], backend=backend):  # Skip single card for batch
+                print("All layouts created!")
             
         elif choice == "f":
             # Front cards only
             layout_choice = input("Select layout (1-7): ").strip()
             if layout_choice.isdigit() and 1 <= int(layout_choice) <= 7:
                 h, v, desc = layouts[int(layout_choice) - 1]
-                create_card_layout(script_dir, front_svg, back_svg, h, v, desc, front_only=True)
+                create_card_layout(script_dir, front_svg, back_svg, h, v, desc, front_only=True, pool=pool, backend=backend)
             
         elif choice == "b":
             # Back cards only
             layout_choice = input("Select layout (1-7): ").strip()
             if layout_choice.isdigit() and 1 <= int(layout_choice) <= 7:
                 h, v, desc = layouts[int(layout_choice) - 1]
-                create_card_layout(script_dir, front_svg, back_svg, h, v, desc, back_only=True)
+                create_card_layout(script_dir, front_svg, back_svg, h, v, desc, back_only=True, pool=pool, backend=backend)
+            
+        elif choice == "d":
+            # Both sides in one document, ready for double-sided printing
+            edge = input("Printer flips on long edge (l) or short edge (s)? [l]: ").strip().lower()
+            create_duplex_layout(script_dir, "short" if edge == "s" else "long", pool=pool, backend=backend)
             
         elif choice == "8":
             # Custom layout
@@ -229,60 +299,150 @@ def main():
             side = input("Front (f), Back (b), or Both (enter): ").strip().lower()
             
             if h < 1 or h > 3 or v < 1 or v > 4:
-                print("Invalid layout. Using 2×3 instead.")
-                h, v = 2, 3
+                print(f"Invalid layout. Using {best_h}×{best_v} instead.")
+                h, v = best_h, best_v
             
             if side == "f":
-                create_card_layout(script_dir, front_svg, back_svg, h, v, "Custom", front_only=True)
+                create_card_layout(script_dir, front_svg, back_svg, h, v, "Custom", front_only=True, pool=pool, backend=backend)
             elif side == "b":
-                create_card_layout(script_dir, front_svg, back_svg, h, v, "Custom", back_only=True)
+                create_card_layout(script_dir, front_svg, back_svg, h, v, "Custom", back_only=True, pool=pool, backend=backend)
             else:
-                create_card_layout(script_dir, front_svg, back_svg, h, v, "Custom", both=True)
+                create_card_layout(script_dir, front_svg, back_svg, h, v, "Custom", both=True, pool=pool, backend=backend)
             
         elif choice.isdigit() and 1 <= int(choice) <= 7:
             # Selected layout for both sides
             h, v, desc = layouts[int(choice) - 1]
-            create_card_layout(script_dir, front_svg, back_svg, h, v, desc, both=True)
+            create_card_layout(script_dir, front_svg, back_svg, h, v, desc, both=True, pool=pool, backend=backend)
             
         else:
-            print("Invalid choice. Using standard 2×3 layout for both sides.")
-            create_card_layout(script_dir, front_svg, back_svg, 2, 3, "Standard", both=True)
+            print(f"Invalid choice. Using standard {best_h}×{best_v} layout for both sides.")
+            create_card_layout(script_dir, front_svg, back_svg, best_h, best_v, "Standard", both=True, pool=pool, backend=backend)
             
     except (ValueError, KeyboardInterrupt):
-        print("\nUsing standard 2×3 layout for both sides.")
-        create_card_layout(script_dir, front_svg, back_svg, 2, 3, "Standard", both=True)
+        print(f"\nUsing standard {best_h}×{best_v} layout for both sides.")
+        create_card_layout(script_dir, front_svg, back_svg, best_h, best_v, "Standard", both=True, pool=pool, backend=backend)
+    finally:
+        if pool is not None:
+            pool.close()
+
+def create_pdf_native(svg_path, output_pdf_path, h, v, card_type):
+    """Render the layout with ReportLab/svglib instead of a browser"""
+    try:
+        from native_layout import create_native_layout_pdf, square_card_footer
+        
+        title = f"Square Business Cards - {card_type.title()} Side ({h}×{v} = {h * v} cards)"
+        return create_native_layout_pdf(svg_path, output_pdf_path, h, v, title=title,
+                                        footer_lines=square_card_footer(h, v, card_type),
+                                        margin_mm=6, gap_mm=2)
+    except ImportError:
+        print("svglib/reportlab not installed. Install with: pip install svglib reportlab")
+        return False
+    except Exception as e:
+        print(f"Native PDF rendering failed: {e}")
+        return False
+
+def create_all_layouts(script_dir, front_svg, back_svg, layouts, backend="playwright"):
+    """Render every layout for both sides concurrently on one browser"""
+    if backend == "native":
+        # No browser to share; native renders are fast enough to run in turn
+        results = [create_side_layout(script_dir, svg_path, h, v, card_type, backend=backend)
+                   for h, v, desc in layouts
+                   for card_type, svg_path in (("front", front_svg), ("back", back_svg))]
+        return all(results)
+    
+    cache = get_cache()
+    jobs = []
+    for h, v, desc in layouts:
+        for card_type, svg_path in (("front", front_svg), ("back", back_svg)):
+            html_content, filename = create_square_card_pdf(str(svg_path), h, v, card_type)
+            with span("file.write"), open(script_dir / f"{filename}.html", 'w', encoding='utf-8') as f:
+                f.write(html_content)
+            
+            pdf_path = script_dir / f"{filename}.pdf"
+            key = render_key(svg_path, "playwright", card_type, h=h, v=v, margin_mm=6, page="A4")
+            if cache.fetch(key, pdf_path):
+                print(f"✓ {filename}.pdf (cached)")
+                continue
+            jobs.append(RenderJob(html_content, str(pdf_path), margin_mm=6,
+                                  label=f"{h}×{v} {card_type}", cache_key=key))
+    
+    if not jobs:
+        return True
+    
+    print(f"Rendering {len(jobs)} PDFs concurrently...")
+    started = time.perf_counter()
+    try:
+        results = render_jobs(jobs)
+    except ImportError:
+        print("Playwright not installed. Install with: pip install playwright")
+        print("Then run: playwright install chromium")
+        print("HTML files are available for manual printing")
+        return False
+    except Exception as e:
+        print(f"PDF conversion failed: {e}")
+        return False
+    
+    store_render_results(cache, results)
+    print_render_summary(results, started)
+    return all(result.ok for result in results)
 
-def create_card_layout(script_dir, front_svg, back_svg, h, v, desc, both=False, front_only=False, back_only=False):
+def create_card_layout(script_dir, front_svg, back_svg, h, v, desc, both=False, front_only=False, back_only=False, pool=None, backend="playwright"):
     """Create layouts for square business cards"""
     print(f"\nCreating {h}×{v} layout ({desc})...")
     
     if both or front_only:
-        # Create front layout
-        html_content, filename = create_square_card_pdf(str(front_svg), h, v, "front")
-        html_path = script_dir / f"{filename}.html"
-        pdf_path = script_dir / f"{filename}.pdf"
-        
-        with open(html_path, 'w', encoding='utf-8') as f:
-            f.write(html_content)
-        
-        if create_pdf_with_playwright(html_content, str(pdf_path)):
-            print(f"✓ Front cards PDF: {filename}.pdf ({h * v} cards)")
-        else:
-            print(f"✗ Front PDF failed, HTML available: {filename}.html")
+        create_side_layout(script_dir, front_svg, h, v, "front", pool=pool, backend=backend)
     
     if both or back_only:
-        # Create back layout
-        html_content, filename = create_square_card_pdf(str(back_svg), h, v, "back")
-        html_path = script_dir / f"{filename}.html"
-        pdf_path = script_dir / f"{filename}.pdf"
-        
-        with open(html_path, 'w', encoding='utf-8') as f:
-            f.write(html_content)
-        
-        if create_pdf_with_playwright(html_content, str(pdf_path)):
-            print(f"✓ Back cards PDF: {filename}.pdf ({h * v} cards)")
-        else:
-            print(f"✗ Back PDF failed, HTML available: {filename}.html")
+        create_side_layout(script_dir, back_svg, h, v, "back", pool=pool, backend=backend)
+
+def create_duplex_layout(script_dir, flip, pool=None, backend="playwright"):
+    """Render fronts and mirrored backs as one interleaved PDF in a single pass"""
+    from duplex import create_duplex_pdf, load_sides
+    
+    front_content, back_content = load_sides("square", script_dir)
+    pdf_path = script_dir / f"square_cards_duplex_{flip}_edge_A4.pdf"
+    print(f"\nCreating duplex sheet ({flip}-edge flip)...")
+    try:
+        create_duplex_pdf(front_content, back_content, pdf_path, flip=flip, backend=backend, pool=pool)
+    except ImportError:
+        print("Playwright not installed. Install with: pip install playwright")
+        print("Then run: playwright install chromium")
+        return False
+    except Exception as e:
+        print(f"✗ Duplex PDF failed: {e}")
+        return False
+    print(f"✓ Duplex PDF: {pdf_path.name} (front and back pages interleaved)")
+    print(f"  Print double-sided, flip on {flip} edge")
+    return True
+
+def create_side_layout(script_dir, svg_path, h, v, card_type, pool=None, backend="playwright"):
+    """Create the HTML and PDF for one card side, reusing a cached PDF when possible"""
+    filename = f"square_cards_{card_type}_{h}x{v}_A4"
+    html_path = script_dir / f"{filename}.html"
+    pdf_path = script_dir / f"{filename}.pdf"
+    
+    # Stream the layout to disk; the browser prints from the file
+    write_html(iter_square_card_html(str(svg_path), h, v, card_type), html_path)
+    
+    cache = get_cache()
+    key = render_key(svg_path, backend, card_type, h=h, v=v, margin_mm=6, page="A4")
+    if cache.fetch(key, pdf_path):
+        print(f"✓ {card_type.title()} cards PDF: {filename}.pdf ({h * v} cards, cached)")
+        return True
+    
+    if backend == "native":
+        created = create_pdf_native(svg_path, str(pdf_path), h, v, card_type)
+    else:
+        created = create_pdf_with_playwright(None, str(pdf_path), pool=pool, html_path=html_path)
+    
+    if created:
+        cache.store(key, pdf_path)
+        print(f"✓ {card_type.title()} cards PDF: {filename}.pdf ({h * v} cards)")
+        return True
+    
+    print(f"✗ {card_type.title()} PDF failed, HTML available: {filename}.html")
+    return False
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Single-Pass Duplex Imposition
+Renders front and back sheets interleaved in one PDF (front, back,
+front, back...) with the back positions mirrored so every back lands
+behind its front after a long-edge or short-edge flip
+
+Usage:
+    python duplex.py                          # square front/back SVGs, long-edge flip
+    python duplex.py --source print-ready --flip short --sheets 10
+    python duplex.py --backend playwright --sheet A3
+"""
+
+import argparse
+import re
+import sys
+import time
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+from imposition import Placement, impose
+from render_cache import get_cache, render_key
+from svg_optimizer import optimize_for_print
+from svg_symbols import svg_symbol_defs, svg_symbol_use
+from tracing import add_trace_argument, configure, span, traced
+
+SVG_NS = "http://www.w3.org/2000/svg"
+FLIP_EDGES = ("long", "short")
+
+# Same spacing as the square card layouts; room is kept for the sheet label
+DUPLEX_GUTTER_MM = 2
+DUPLEX_MARGIN_MM = 6
+LABEL_MM = 6
+
+_TRANSLATE_RE = re.compile(r'translate\(\s*([-\d.]+)[\s,]+([-\d.]+)\s*\)')
+
+
+def extract_card_side(svg_content, group_id, card_size=(85, 85), drop_ids=("print-guidelines",)):
+    """
+    Cut one card out of a multi-card SVG as a standalone card SVG
+
+    The group's translate() becomes the viewBox origin; the other card
+    groups and any drop_ids (print guides) are removed so nothing else
+    can bleed into the card.
+    """
+    ET.register_namespace("", SVG_NS)
+    root = ET.fromstring(svg_content)
+    group = None
+    for child in list(root):
+        child_id = child.get("id")
+        if child_id == group_id:
+            group = child
+        elif child_id in drop_ids or (child.tag == f"{{{SVG_NS}}}g" and child_id and child_id.endswith("-card")):
+            root.remove(child)
+    if group is None:
+        raise ValueError(f"No <g id=\"{group_id}\"> found")
+
+    match = _TRANSLATE_RE.search(group.get("transform", ""))
+    x, y = (float(match.group(1)), float(match.group(2))) if match else (0.0, 0.0)
+    width, height = card_size
+    root.set("width", f"{width:g}mm")
+    root.set("height", f"{height:g}mm")
+    root.set("viewBox", f"{x:g} {y:g} {width:g} {height:g}")
+    return ET.tostring(root, encoding="unicode")
+
+
+def load_sides(source="square", script_dir=None):
+    """(front SVG text, back SVG text) from the square SVGs or the print-ready groups"""
+    script_dir = Path(script_dir or Path(__file__).parent)
+    if source == "print-ready":
+        svg_content = (script_dir / "business_card_print_ready.svg").read_text(encoding='utf-8')
+        return extract_card_side(svg_content, "front-card"), extract_card_side(svg_content, "back-card")
+    front = (script_dir / "business_card_front.svg").read_text(encoding='utf-8')
+    back = (script_dir / "business_card_back.svg").read_text(encoding='utf-8')
+    return front, back
+
+
+def duplex_slots(sheet="A4", card_width=85, card_height=85, flip="long", cards_per_sheet=None):
+    """
+    Pair every front slot with the back slot behind it after the flip
+
+    Returns (imposition, [(front Placement, back Placement)]). A long-edge
+    flip mirrors the sheet left-right, a short-edge flip top-bottom; the
+    mirroring is geometric, so uneven margins still line up. Cards stay
+    upright: a rotated card would need its back turned the other way.
+    """
+    if flip not in FLIP_EDGES:
+        raise ValueError(f"flip must be one of {FLIP_EDGES}, not {flip!r}")
+    imposition = impose(card_width, card_height, sheet, gutter=DUPLEX_GUTTER_MM,
+                        margin=DUPLEX_MARGIN_MM, allow_rotation=False, reserve_top=LABEL_MM)
+    fronts = imposition.placements[:cards_per_sheet] if cards_per_sheet else imposition.placements
+
+    pairs = []
+    for front in fronts:
+        if flip == "long":
+            back = Placement(imposition.sheet_width - front.x - front.width, front.y,
+                             front.width, front.height)
+        else:
+            back = Placement(front.x, imposition.sheet_height - front.y - front.height,
+                             front.width, front.height)
+        pairs.append((front, back))
+    return imposition, pairs
+
+
+@traced("pdf.duplex_native")
+def create_duplex_pdf_native(front_svg, back_svg, output_pdf_path, sheets=1, flip="long", sheet="A4",
+                             cards_per_sheet=None):
+    """
+    Write sheets front/back page pairs with ReportLab in one pass
+
+    Each side is parsed once and captured as a form XObject, and each
+    filled sheet is a form too, so extra sheets cost one doForm per page.
+    """
+    from reportlab.lib.units import mm
+    from reportlab.pdfgen import canvas
+
+    from svg_drawing_cache import parse_svg_text
+    from svg_to_pdf_converter_v2 import _fit_scale, draw_card_form
+
+    imposition, pairs = duplex_slots(sheet, flip=flip, cards_per_sheet=cards_per_sheet)
+    if not pairs:
+        raise ValueError("No card fits on the sheet")
+    page_size = (imposition.sheet_width * mm, imposition.sheet_height * mm)
+
+    c = canvas.Canvas(str(output_pdf_path), pagesize=page_size)
+    for side, svg_content, index in (("front", front_svg, 0), ("back", back_svg, 1)):
+        drawing = parse_svg_text(svg_content)
+        card_form = draw_card_form(c, drawing, f"card_{side}")
+        c.beginForm(f"sheet_{side}")
+        for pair in pairs:
+            slot = pair[index]
+            scale = _fit_scale(drawing, slot.width * mm, slot.height * mm)
+            c.saveState()
+            c.translate(slot.x * mm, slot.y * mm)
+            c.scale(scale, scale)
+            c.doForm(card_form)
+            c.restoreState()
+            c.setStrokeColorRGB(0.8, 0.8, 0.8)
+            c.setLineWidth(0.5)
+            c.setDash([2, 2])
+            c.rect(slot.x * mm, slot.y * mm, slot.width * mm, slot.height * mm)
+            c.setDash([])
+        c.endForm()
+
+    for number in range(1, sheets + 1):
+        for side in ("front", "back"):
+            c.setFont("Helvetica", 7)
+            c.setFillColorRGB(0.4, 0.4, 0.4)
+            c.drawCentredString(page_size[0] / 2, page_size[1] - DUPLEX_MARGIN_MM * mm - 3 * mm,
+                                f"Sheet {number} - {side.upper()} ({flip}-edge flip)")
+            c.doForm(f"sheet_{side}")
+            c.showPage()
+    with span("pdf.save"):
+        c.save()
+    return sheets * 2
+
+
+@traced("html.build_duplex")
+def create_duplex_html(front_svg, back_svg, sheets=1, flip="long", sheet="A4", cards_per_sheet=None):
+    """
+    One HTML document holding every front/back page pair
+
+    Each side is defined once as a <symbol>; cards are absolutely placed
+    in mm with the same mirrored slots as the native backend.
+    """
+    imposition, pairs = duplex_slots(sheet, flip=flip, cards_per_sheet=cards_per_sheet)
+    width, height = imposition.sheet_width, imposition.sheet_height
+    front_svg, back_svg = optimize_for_print(front_svg), optimize_for_print(back_svg)
+    uses = {"front": svg_symbol_use(front_svg, "front"), "back": svg_symbol_use(back_svg, "back")}
+
+    pages = {}
+    for side, index in (("front", 0), ("back", 1)):
+        cells = "".join(
+            f'<div class="slot" style="left:{slot.x:g}mm;bottom:{slot.y:g}mm;'
+            f'width:{slot.width:g}mm;height:{slot.height:g}mm">{uses[side]}</div>'
+            for slot in (pair[index] for pair in pairs)
+        )
+        pages[side] = cells
+
+    body = []
+    for number in range(1, sheets + 1):
+        for side in ("front", "back"):
+            body.append(f'<div class="sheet"><div class="label">Sheet {number} - {side.upper()} '
+                        f'({flip}-edge flip)</div>{pages[side]}</div>')
+
+    return f"""<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="UTF-8">
+    <title>Business Cards - Duplex ({flip}-edge flip)</title>
+    <style>
+        @page {{ size: {width:g}mm {height:g}mm; margin: 0; }}
+        body {{ margin: 0; font-family: Arial, sans-serif; }}
+        .sheet {{ position: relative; width: {width:g}mm; height: {height:g}mm; overflow: hidden; page-break-after: always; }}
+        .sheet:last-child {{ page-break-after: auto; }}
+        .label {{ position: absolute; top: {DUPLEX_MARGIN_MM}mm; width: 100%; text-align: center; font-size: 7pt; color: #666; }}
+        .slot {{ position: absolute; box-sizing: border-box; border: 0.5pt dashed #ccc; }}
+        .slot svg {{ display: block; width: 100%; height: 100%; }}
+    </style>
+</head>
+<body>
+{svg_symbol_defs(front_svg, "front")}
+{svg_symbol_defs(back_svg, "back")}
+{"".join(body)}
+</body>
+</html>
+"""
+
+
+def create_duplex_pdf(front_svg, back_svg, output_pdf_path, sheets=1, flip="long", sheet="A4",
+                      backend="native", pool=None):
+    """
+    Render the interleaved duplex PDF with either backend, using the render cache
+
+    Returns True on success. With the playwright backend the whole job is
+    one set_content() and one page.pdf() call.
+    """
+    cache = get_cache()
+    key = render_key((front_svg + back_svg).encode('utf-8'), backend, "duplex",
+                     sheets=sheets, flip=flip, page=sheet, margin_mm=DUPLEX_MARGIN_MM)
+    if cache.fetch(key, output_pdf_path):
+        print(f"✓ Duplex PDF up to date (cached): {output_pdf_path}")
+        return True
+
+    if backend == "native":
+        create_duplex_pdf_native(front_svg, back_svg, output_pdf_path, sheets, flip, sheet)
+    else:
+        from browser_pool import BrowserPool
+
+        html_content = create_duplex_html(front_svg, back_svg, sheets, flip, sheet)
+        owned = pool is None
+        pool = pool or BrowserPool(pool_size=1)
+        try:
+            pool.render_pdf(html_content, output_pdf_path, margin_mm=0, page_format=None)
+        finally:
+            if owned:
+                pool.close()
+
+    cache.store(key, output_pdf_path)
+    return True
+
+
+def main():
+    script_dir = Path(__file__).parent
+
+    parser = argparse.ArgumentParser(description="Interleaved front/back duplex PDF in one pass")
+    parser.add_argument("--source", choices=["square", "print-ready"], default="square",
+                        help="business_card_front/back.svg or the groups in business_card_print_ready.svg")
+    parser.add_argument("--flip", choices=FLIP_EDGES, default="long", help="how the printer turns the sheet")
+    parser.add_argument("--sheets", type=int, default=1, help="number of front/back sheet pairs")
+    parser.add_argument("--sheet", default="A4", help="paper size: A4, Letter, A3 or SRA3")
+    parser.add_argument("--backend", choices=["native", "playwright"], default="native")
+    parser.add_argument("--output", default=None, help="output PDF")
+    add_trace_argument(parser)
+    args = parser.parse_args()
+    configure(args.trace)
+
+    output = Path(args.output) if args.output else (
+        script_dir / f"business_cards_duplex_{args.flip}_edge_{args.sheet.upper()}.pdf")
+
+    try:
+        front_svg, back_svg = load_sides(args.source, script_dir)
+        started = time.perf_counter()
+        create_duplex_pdf(front_svg, back_svg, output, args.sheets, args.flip, args.sheet, args.backend)
+    except ImportError as e:
+        print(f"Missing required library: {e}")
+        print("pip install svglib reportlab   (native backend)")
+        print("pip install playwright && playwright install chromium   (playwright backend)")
+        return 1
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        return 1
+
+    print(f"✓ Duplex PDF: {output.name} ({args.sheets * 2} pages, {args.flip}-edge flip, "
+          f"{time.perf_counter() - started:.2f}s)")
+    print("  Print double-sided with the same flip setting; backs are mirrored to match.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
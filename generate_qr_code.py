@@ -4,36 +4,38 @@ QR Code Generator for Business Card
 Generates a QR code pointing to the website
 """
 
+from pathlib import Path
+
 def create_qr_code():
     try:
         import qrcode
-        from qrcode.image.svg import SvgPathImage
+        from qr_service import encode
         
         # Your website URL
         website_url = "https://soul059.github.io/Business-card/"  # Update this to your actual domain
+        script_dir = Path(__file__).parent
+        
+        # Smallest version/error correction that fits, cached per payload
+        result = encode(website_url)
         
-        # Create QR code instance
+        # Create SVG image straight from the cached path data
+        with open(script_dir / "qr_code_website.svg", 'w', encoding='utf-8') as f:
+            f.write(result.svg())
+        
+        # Create PNG image
         qr = qrcode.QRCode(
-            version=1,  # Controls the size of the QR Code
-            error_correction=qrcode.constants.ERROR_CORRECT_L,  # About 7% of codewords can be restored
+            version=result.version,
+            error_correction=getattr(qrcode.constants, f"ERROR_CORRECT_{result.error_correction}"),
             box_size=10,
-            border=4,
+            border=result.border,
         )
-        
-        # Add data to QR code
         qr.add_data(website_url)
-        qr.make(fit=True)
-        
-        # Create SVG image
-        img_svg = qr.make_image(image_factory=SvgPathImage)
-        img_svg.save("qr_code_website.svg")
-        
-        # Create PNG image
+        qr.make(fit=False)
         img_png = qr.make_image(fill_color="black", back_color="white")
-        img_png.save("qr_code_website.png")
+        img_png.save(script_dir / "qr_code_website.png")
         
         print(f"✅ QR Code generated successfully!")
-        print(f"📱 QR Code points to: {website_url}")
+        print(f"📱 QR Code points to: {website_url} (version {result.version}, EC {result.error_correction})")
         print(f"📁 Files created:")
         print(f"   - qr_code_website.svg (Vector format)")
         print(f"   - qr_code_website.png (Raster format)")
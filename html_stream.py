@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Streaming HTML Emission for the Layout Builders
+The iter_*_html() builders yield their documents in chunks (head, one
+chunk per card, tail) instead of growing one string with +=. The same
+chunk stream can be joined for page.set_content() or written to the
+output file that the browser then loads (BrowserPool.render_pdf_file),
+so Python-side memory stays bounded by one page of cards however long
+the job is
+
+Usage:
+    from create_square_card_pdfs import iter_square_card_html
+    write_html(iter_square_card_html("front.svg", 2, 3, total_cards=5000), "cards.html")
+
+    python html_stream.py --benchmark                 # memory at 10 / 1,000 / 10,000 cards
+    python html_stream.py --benchmark --cards 10 100000
+"""
+
+import argparse
+import subprocess
+import sys
+import tempfile
+import time
+from itertools import islice, repeat
+from pathlib import Path
+
+from tracing import span
+
+BENCHMARK_CARD_COUNTS = (10, 1_000, 10_000)
+
+# Pages after the first start on a new sheet; a one-page document is unchanged
+PAGE_BREAK = '    <div style="break-before: page; page-break-before: always"></div>\n'
+
+
+def card_cells(cell, cards_per_page, total_cards=None, cards=None):
+    """
+    Markup for every card slot, produced lazily
+
+    cards is an iterable of personalized card markup (e.g. filled
+    templates); otherwise the one cell is repeated total_cards times,
+    defaulting to a single full page.
+    """
+    if cards is not None:
+        return iter(cards)
+    return repeat(cell, cards_per_page if total_cards is None else total_cards)
+
+
+def paginate(cells, cards_per_page):
+    """Group the cells into pages of at most cards_per_page, one page in memory at a time"""
+    cells = iter(cells)
+    while True:
+        page = list(islice(cells, cards_per_page))
+        if not page:
+            return
+        yield page
+
+
+def write_html(chunks, target):
+    """
+    Write an HTML chunk stream to a path or an open text stream
+
+    Returns the number of characters written.
+    """
+    if hasattr(target, "write"):
+        written = 0
+        for chunk in chunks:
+            target.write(chunk)
+            written += len(chunk)
+        return written
+
+    target = Path(target)
+    with span("file.write", file=target.name), open(target, 'w', encoding='utf-8') as f:
+        return write_html(chunks, f)
+
+
+# --- Memory benchmark ---
+
+def _measure(total_cards, mode, svg_file_path, output_html_path):
+    """One run in this process: peak traced allocation while emitting the document"""
+    import tracemalloc
+
+    from create_square_card_pdfs import iter_square_card_html
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    chunks = iter_square_card_html(svg_file_path, 2, 3, "front", total_cards=total_cards)
+    if mode == "string":
+        # What the builders used to do: hold the whole document, then write it
+        html_content = "".join(chunks)
+        with open(output_html_path, 'w', encoding='utf-8') as f:
+            f.write(html_content)
+        del html_content
+    else:
+        write_html(chunks, output_html_path)
+    seconds = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"cards": total_cards, "mode": mode, "seconds": round(seconds, 4),
+            "peak_mb": round(peak / (1024 * 1024), 2),
+            "output_mb": round(Path(output_html_path).stat().st_size / (1024 * 1024), 2)}
+
+
+def run_benchmark(card_counts, svg_file_path):
+    """Compare join-then-write against streaming; each case in a fresh process"""
+    import json
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for total_cards in card_counts:
+            for mode in ("string", "stream"):
+                output_html_path = Path(tmp) / f"{mode}_{total_cards}.html"
+                proc = subprocess.run(
+                    [sys.executable, __file__, "--run-case", str(total_cards), mode,
+                     str(svg_file_path), str(output_html_path)],
+                    capture_output=True, text=True)
+                if proc.returncode != 0:
+                    print(f"✗ {total_cards} cards ({mode}): {proc.stderr.strip().splitlines()[-1:]}")
+                    continue
+                result = json.loads(proc.stdout.strip().splitlines()[-1])
+                results.append(result)
+                print(f"✓ {total_cards:>7,} cards  {mode:<6}  peak {result['peak_mb']:>8.2f} MB  "
+                      f"{result['seconds']:>7.3f}s  output {result['output_mb']:.2f} MB")
+    return results
+
+
+def main():
+    import json
+
+    script_dir = Path(__file__).parent
+
+    parser = argparse.ArgumentParser(description="Streaming HTML emission and its memory benchmark")
+    parser.add_argument("--benchmark", action="store_true", help="measure peak memory of string vs streamed output")
+    parser.add_argument("--cards", type=int, nargs="+", default=list(BENCHMARK_CARD_COUNTS),
+                        help="card counts to measure")
+    parser.add_argument("--svg", default=str(script_dir / "business_card_front.svg"), help="card SVG")
+    parser.add_argument("--run-case", nargs=4, metavar=("CARDS", "MODE", "SVG", "OUT"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_case:
+        total_cards, mode, svg_file_path, output_html_path = args.run_case
+        print(json.dumps(_measure(int(total_cards), mode, svg_file_path, output_html_path)))
+        return 0
+
+    if not args.benchmark:
+        parser.print_help()
+        return 0
+
+    print(f"Peak Python memory while emitting a 2×3 square-card document ({Path(args.svg).name})\n")
+    results = run_benchmark(args.cards, args.svg)
+    return 0 if len(results) == 2 * len(args.cards) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
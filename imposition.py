@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Imposition Solver for Business Card Sheets
+Finds the densest arrangement of one card size on a sheet, trying the
+card upright, rotated 90° and mixed (an upright block beside or above a
+rotated one), for A4, Letter, A3 and SRA3 paper
+
+Usage:
+    python imposition.py 85x55                    # every sheet, default margins
+    python imposition.py 85x85 --sheet A3 --bleed 3 --gutter 2
+"""
+
+import argparse
+import sys
+from dataclasses import dataclass
+from functools import lru_cache
+
+# Portrait sheet sizes in mm
+PAPER_SIZES = {
+    "A4": (210.0, 297.0),
+    "LETTER": (215.9, 279.4),
+    "A3": (297.0, 420.0),
+    "SRA3": (320.0, 450.0),
+}
+
+MM_TO_POINTS = 72 / 25.4
+
+
+@dataclass(frozen=True)
+class Placement:
+    """One card on the sheet: trim box in mm from the sheet's lower-left corner"""
+    x: float
+    y: float
+    width: float
+    height: float
+    rotated: bool = False
+
+
+@dataclass(frozen=True)
+class Imposition:
+    sheet: str
+    sheet_width: float
+    sheet_height: float
+    card_width: float
+    card_height: float
+    placements: tuple
+    # (columns, rows, rotated) for each grid block, left/top block first
+    blocks: tuple
+
+    @property
+    def count(self):
+        return len(self.placements)
+
+    @property
+    def columns(self):
+        return self.blocks[0][0] if self.blocks else 0
+
+    @property
+    def rows(self):
+        return self.blocks[0][1] if self.blocks else 0
+
+    @property
+    def rotated_count(self):
+        return sum(1 for p in self.placements if p.rotated)
+
+    @property
+    def utilization(self):
+        """Fraction of the sheet covered by trimmed cards"""
+        card_area = self.card_width * self.card_height * self.count
+        return card_area / (self.sheet_width * self.sheet_height)
+
+    def describe(self):
+        parts = [f"{c}×{r}{' rotated' if rot else ''}" for c, r, rot in self.blocks]
+        return " + ".join(parts) or "nothing fits"
+
+    def points(self):
+        """Placements as (x, y, width, height, rotated) in PDF points"""
+        return [(p.x * MM_TO_POINTS, p.y * MM_TO_POINTS,
+                 p.width * MM_TO_POINTS, p.height * MM_TO_POINTS, p.rotated)
+                for p in self.placements]
+
+
+def sheet_size(sheet):
+    """Portrait (width, height) in mm for a paper name such as "A4" or "letter" """
+    try:
+        return PAPER_SIZES[sheet.upper()]
+    except KeyError:
+        raise ValueError(f"Unknown sheet size '{sheet}', expected one of: {', '.join(PAPER_SIZES)}")
+
+
+def _fit(length, cell, gutter):
+    """How many cells of this size fit along length with gutters between them"""
+    if cell <= 0 or length < cell:
+        return 0
+    return int((length + gutter + 1e-9) // (cell + gutter))
+
+
+def _span(count, cell, gutter):
+    return count * cell + (count - 1) * gutter if count else 0.0
+
+
+def _candidates(width, height, cell_w, cell_h, gutter, allow_rotation):
+    """Yield block lists [(cols, rows, rotated, cell_w, cell_h, x, y)] in a top-left frame"""
+    upright = (cell_w, cell_h, False)
+    turned = (cell_h, cell_w, True)
+    orientations = [upright, turned] if allow_rotation else [upright]
+
+    for w, h, rot in orientations:
+        yield [(_fit(width, w, gutter), _fit(height, h, gutter), rot, w, h, 0.0, 0.0)]
+
+    if not allow_rotation:
+        return
+
+    for (w1, h1, rot1), (w2, h2, rot2) in ((upright, turned), (turned, upright)):
+        # Side by side: k columns of the first orientation, the rest of the width in the second
+        for k in range(1, _fit(width, w1, gutter) + 1):
+            used = _span(k, w1, gutter) + gutter
+            yield [(k, _fit(height, h1, gutter), rot1, w1, h1, 0.0, 0.0),
+                   (_fit(width - used, w2, gutter), _fit(height, h2, gutter), rot2, w2, h2, used, 0.0)]
+        # Stacked: k rows of the first orientation, the rest of the height in the second
+        for k in range(1, _fit(height, h1, gutter) + 1):
+            used = _span(k, h1, gutter) + gutter
+            yield [(_fit(width, w1, gutter), k, rot1, w1, h1, 0.0, 0.0),
+                   (_fit(width, w2, gutter), _fit(height - used, h2, gutter), rot2, w2, h2, 0.0, used)]
+
+
+@lru_cache(maxsize=256)
+def impose(card_width, card_height, sheet="A4", bleed=0.0, gutter=0.0, margin=10.0,
+           allow_rotation=True, reserve_top=0.0, reserve_bottom=0.0):
+    """
+    Densest imposition of one card size on a sheet (all sizes in mm)
+
+    Each card occupies its trim size plus bleed on every side; gutter is
+    the gap between neighbouring bleed boxes and margin the unprintable
+    edge. reserve_top/reserve_bottom keep room for titles and notes.
+    Ties prefer a single block, then fewer rotated cards. The arrangement
+    is centred in the printable area. Results are memoized per parameter
+    set, so callers can ask again for every page or layout for free.
+    """
+    sheet_width, sheet_height = sheet_size(sheet)
+    area_width = sheet_width - 2 * margin
+    area_height = sheet_height - 2 * margin - reserve_top - reserve_bottom
+    cell_w = card_width + 2 * bleed
+    cell_h = card_height + 2 * bleed
+
+    best, best_rank = [], None
+    for blocks in _candidates(area_width, area_height, cell_w, cell_h, gutter, allow_rotation):
+        blocks = [block for block in blocks if block[0] and block[1]]
+        count = sum(cols * rows for cols, rows, *_ in blocks)
+        rotated = sum(cols * rows for cols, rows, rot, *_ in blocks if rot)
+        rank = (count, -len(blocks), -rotated)
+        if best_rank is None or rank > best_rank:
+            best, best_rank = blocks, rank
+
+    # Centre the used area inside the printable area
+    used_width = max((x + _span(cols, w, gutter) for cols, rows, rot, w, h, x, y in best), default=0)
+    used_height = max((y + _span(rows, h, gutter) for cols, rows, rot, w, h, x, y in best), default=0)
+    left = margin + (area_width - used_width) / 2
+    top = sheet_height - margin - reserve_top - (area_height - used_height) / 2
+
+    placements = []
+    for cols, rows, rot, w, h, block_x, block_y in best:
+        for row in range(rows):
+            for col in range(cols):
+                cell_left = left + block_x + col * (w + gutter)
+                cell_top = top - block_y - row * (h + gutter)
+                placements.append(Placement(
+                    x=round(cell_left + bleed, 4),
+                    y=round(cell_top - h + bleed, 4),
+                    width=w - 2 * bleed,
+                    height=h - 2 * bleed,
+                    rotated=rot,
+                ))
+
+    return Imposition(sheet=sheet.upper(), sheet_width=sheet_width, sheet_height=sheet_height,
+                      card_width=card_width, card_height=card_height,
+                      placements=tuple(placements),
+                      blocks=tuple((cols, rows, rot) for cols, rows, rot, *_ in best))
+
+
+def best_grid(card_width, card_height, sheet="A4", **options):
+    """(columns, rows) of the densest upright grid, for CSS grid layouts that cannot rotate"""
+    result = impose(card_width, card_height, sheet, allow_rotation=False, **options)
+    return result.columns, result.rows
+
+
+def _parse_size(text):
+    width, height = (float(n) for n in text.lower().split("x"))
+    return width, height
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Find the densest card imposition per sheet")
+    parser.add_argument("card", help="trimmed card size in mm as WxH, e.g. 85x55")
+    parser.add_argument("--sheet", default=None, help=f"one of {', '.join(PAPER_SIZES)} (default: all)")
+    parser.add_argument("--bleed", type=float, default=0.0, help="bleed per side in mm")
+    parser.add_argument("--gutter", type=float, default=0.0, help="gap between cards in mm")
+    parser.add_argument("--margin", type=float, default=10.0, help="sheet margin in mm")
+    parser.add_argument("--no-rotate", action="store_true", help="keep every card upright")
+    args = parser.parse_args()
+
+    try:
+        card_width, card_height = _parse_size(args.card)
+        sheets = [args.sheet] if args.sheet else list(PAPER_SIZES)
+        results = [impose(card_width, card_height, sheet, args.bleed, args.gutter, args.margin,
+                          not args.no_rotate) for sheet in sheets]
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 2
+
+    print(f"Card {card_width:g}mm × {card_height:g}mm, bleed {args.bleed:g}mm, "
+          f"gutter {args.gutter:g}mm, margin {args.margin:g}mm")
+    for result in results:
+        print(f"  {result.sheet:<7} {result.count:>3} cards  {result.describe():<24} "
+              f"{result.utilization:.0%} of sheet")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
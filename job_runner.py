@@ -0,0 +1,467 @@
+#!/usr/bin/env python3
+"""
+Job-Spec Runner for Business Card PDFs
+Runs every job of a YAML or JSON spec in one process, without prompts.
+One warm Chromium, the parsed-template cache and the font index are
+shared by all jobs, and the render cache skips unchanged outputs
+
+Usage:
+    python job_runner.py jobs.yaml
+    python job_runner.py jobs.json --summary results.json --fail-fast
+    python job_runner.py jobs.yaml --json              # summary JSON on stdout
+    python job_runner.py jobs.yaml --watch             # rebuild affected outputs on every save
+
+Spec:
+    output_dir: out                   # relative to the spec file (default: its folder)
+    defaults: {backend: native}
+    jobs:
+      - type: square                  # 85mm square cards, like create_square_card_pdfs.py
+        source: business_card_front.svg
+        side: front
+        layout: 2x3                   # or "best"
+      - type: custom                  # print-ready sheet, like create_custom_card_layouts.py
+        layout: best
+        backend: playwright
+        output: custom_best.pdf
+      - type: duplex                  # interleaved fronts and mirrored backs
+        source: square                # or print-ready
+        flip: long
+        sheets: 5
+      - type: cards                   # any number of 85x55 cards over as many sheets as needed
+        source: business_card_print_ready.svg
+        cards: 500
+        sheet: A4
+        workers: 4
+
+Exit codes: 0 all jobs succeeded, 1 at least one job failed, 2 the spec
+could not be read or is invalid.
+"""
+
+import argparse
+import json
+import sys
+import time
+from contextlib import nullcontext, redirect_stdout
+from pathlib import Path
+
+from tracing import add_trace_argument, configure, span
+
+EXIT_OK = 0
+EXIT_JOB_FAILED = 1
+EXIT_BAD_SPEC = 2
+
+JOB_TYPES = ("square", "custom", "duplex", "cards")
+BACKENDS = ("native", "playwright")
+SCRIPT_DIR = Path(__file__).parent
+
+# Per-type keys and their defaults; anything else in a job is a spec error
+JOB_FIELDS = {
+    "square": {"source": "business_card_front.svg", "side": "front", "layout": "best"},
+    "custom": {"source": "business_card_print_ready.svg", "layout": "best"},
+    "duplex": {"source": "square", "flip": "long", "sheets": 1, "sheet": "A4"},
+    "cards": {"source": "business_card_print_ready.svg", "cards": None, "cards_per_page": None,
+              "sheet": "A4", "workers": 1},
+}
+COMMON_FIELDS = {"type": None, "name": None, "backend": "native", "output": None}
+
+
+class SpecError(ValueError):
+    """The job spec is unreadable or names something that does not exist"""
+
+
+def load_spec(spec_path):
+    """Parse a .json, .yaml or .yml job spec into a dict"""
+    spec_path = Path(spec_path)
+    try:
+        text = spec_path.read_text(encoding='utf-8')
+    except OSError as e:
+        raise SpecError(f"Cannot read {spec_path}: {e}")
+
+    if spec_path.suffix.lower() in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ImportError:
+            raise SpecError("YAML specs need PyYAML: pip install pyyaml (or write the spec as JSON)")
+        try:
+            spec = yaml.safe_load(text)
+        except yaml.YAMLError as e:
+            raise SpecError(f"Invalid YAML in {spec_path}: {e}")
+    else:
+        try:
+            spec = json.loads(text)
+        except ValueError as e:
+            raise SpecError(f"Invalid JSON in {spec_path}: {e}")
+
+    if not isinstance(spec, dict) or not isinstance(spec.get("jobs"), list):
+        raise SpecError("The spec must be a mapping with a 'jobs' list")
+    return spec
+
+
+def _parse_layout(value, job_type):
+    if value == "best":
+        if job_type == "square":
+            from create_square_card_pdfs import best_fit_layout
+        else:
+            from create_custom_card_layouts import best_fit_layout
+        return best_fit_layout()
+    try:
+        h, v = (int(n) for n in str(value).lower().split("x"))
+    except ValueError:
+        raise SpecError(f"layout must be COLSxROWS or 'best', not {value!r}")
+    if h < 1 or v < 1:
+        raise SpecError(f"layout must have at least one row and column, not {value!r}")
+    return h, v
+
+
+def _resolve_source(value, base_dir):
+    """A path relative to the spec, falling back to the bundled SVGs next to this script"""
+    path = Path(value)
+    if not path.is_absolute():
+        path = base_dir / path if (base_dir / path).exists() else SCRIPT_DIR / path
+    if not path.exists():
+        raise SpecError(f"source not found: {value}")
+    return path
+
+
+def _check_sheet(job, index):
+    from imposition import PAPER_SIZES
+
+    if not isinstance(job["sheet"], str) or job["sheet"].upper() not in PAPER_SIZES:
+        raise SpecError(f"job {index}: sheet must be one of {', '.join(PAPER_SIZES)}, not {job['sheet']!r}")
+
+
+def _check_positive_int(job, key, index, optional=False):
+    value = job[key]
+    if value is None and optional:
+        return
+    # bool is an int subclass; "sheets: yes" is a typo, not a count
+    if not isinstance(value, int) or isinstance(value, bool) or value < 1:
+        kind = "a positive whole number or null" if optional else "a positive whole number"
+        raise SpecError(f"job {index}: {key} must be {kind}, not {value!r}")
+
+
+def normalize_jobs(spec, base_dir):
+    """Fill defaults and validate every job up front, so a bad spec fails before any rendering"""
+    defaults = spec.get("defaults") or {}
+    if not isinstance(defaults, dict):
+        raise SpecError("defaults must be a mapping")
+    unknown = set(defaults) - set(COMMON_FIELDS) - {key for fields in JOB_FIELDS.values() for key in fields}
+    if unknown:
+        raise SpecError(f"defaults: unknown keys {', '.join(sorted(unknown))}")
+    jobs = []
+    for index, raw in enumerate(spec["jobs"], 1):
+        if not isinstance(raw, dict):
+            raise SpecError(f"job {index}: expected a mapping")
+        job = {**defaults, **raw}
+        job_type = job.get("type")
+        if job_type not in JOB_TYPES:
+            raise SpecError(f"job {index}: type must be one of {', '.join(JOB_TYPES)}")
+
+        fields = {**COMMON_FIELDS, **JOB_FIELDS[job_type]}
+        unknown = set(raw) - set(fields)
+        if unknown:
+            raise SpecError(f"job {index}: unknown keys {', '.join(sorted(unknown))}")
+        job = {key: job.get(key, default) for key, default in fields.items()}
+        job["name"] = job["name"] or f"{index}-{job_type}"
+
+        if job["backend"] not in BACKENDS:
+            raise SpecError(f"job {index}: backend must be one of {', '.join(BACKENDS)}")
+        if job_type in ("square", "custom"):
+            job["layout"] = _parse_layout(job["layout"], job_type)
+            job["source"] = _resolve_source(job["source"], base_dir)
+        elif job_type == "duplex":
+            if job["source"] not in ("square", "print-ready"):
+                raise SpecError(f"job {index}: duplex source must be 'square' or 'print-ready'")
+            if job["flip"] not in ("long", "short"):
+                raise SpecError(f"job {index}: flip must be 'long' or 'short'")
+            _check_positive_int(job, "sheets", index)
+            _check_sheet(job, index)
+        elif job_type == "cards":
+            _check_positive_int(job, "cards", index)
+            _check_positive_int(job, "cards_per_page", index, optional=True)
+            _check_positive_int(job, "workers", index, optional=True)
+            _check_sheet(job, index)
+            if job["backend"] != "native":
+                raise SpecError(f"job {index}: cards jobs are rendered natively only")
+            job["source"] = _resolve_source(job["source"], base_dir)
+        jobs.append(job)
+
+    names = [job["name"] for job in jobs]
+    duplicates = {name for name in names if names.count(name) > 1}
+    if duplicates:
+        raise SpecError(f"duplicate job names: {', '.join(sorted(duplicates))}")
+    return jobs
+
+
+class JobRunner:
+    """Runs normalized jobs in this process, sharing one lazily started browser"""
+
+    def __init__(self, output_dir):
+        self.output_dir = Path(output_dir)
+        self._pool = None
+        self._pool_failed = False
+
+    def pool(self):
+        """The shared browser, started on the first playwright job and tried only once"""
+        if self._pool is None and not self._pool_failed:
+            from browser_pool import open_browser_pool
+
+            self._pool = open_browser_pool()
+            self._pool_failed = self._pool is None
+        if self._pool is None:
+            raise RuntimeError("Chromium is not available for the playwright backend")
+        return self._pool
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.close()
+            self._pool = None
+
+    def _output(self, job, default_name):
+        return self.output_dir / (job["output"] or default_name)
+
+    def run(self, job):
+        """Run one job; returns its summary record (failures are reported, not raised)"""
+        record = {"name": job["name"], "type": job["type"], "backend": job["backend"]}
+        started = time.perf_counter()
+        try:
+            with span(f"job.{job['type']}", job=job["name"]):
+                output, cached = getattr(self, f"_run_{job['type']}")(job)
+            record.update(status="cached" if cached else "ok", output=str(output))
+        except ImportError as e:
+            record.update(status="failed", error=f"Missing required library: {e}")
+        except Exception as e:
+            record.update(status="failed", error=f"{type(e).__name__}: {e}")
+        record["seconds"] = round(time.perf_counter() - started, 3)
+        return record
+
+    def _render_layout(self, job, html_content, pdf_path, side, margin_mm, render_native):
+        from render_cache import get_cache, render_key
+
+        h, v = job["layout"]
+        cache = get_cache()
+        key = render_key(job["source"], job["backend"], side, h=h, v=v, margin_mm=margin_mm, page="A4")
+        if cache.fetch(key, pdf_path):
+            return True
+        if job["backend"] == "native":
+            if not render_native():
+                raise RuntimeError("native rendering failed")
+        else:
+            self.pool().render_pdf(html_content, pdf_path, margin_mm=margin_mm)
+        cache.store(key, pdf_path)
+        return False
+
+    def _run_square(self, job):
+        from create_square_card_pdfs import create_pdf_native, create_square_card_pdf
+
+        h, v = job["layout"]
+        html_content, filename = create_square_card_pdf(str(job["source"]), h, v, job["side"])
+        pdf_path = self._output(job, f"{filename}.pdf")
+        cached = self._render_layout(
+            job, html_content, pdf_path, job["side"], 6,
+            lambda: create_pdf_native(job["source"], str(pdf_path), h, v, job["side"]))
+        return pdf_path, cached
+
+    def _run_custom(self, job):
+        from create_custom_card_layouts import create_custom_layout_html, create_pdf_native_custom
+
+        h, v = job["layout"]
+        html_content, html_filename = create_custom_layout_html(str(job["source"]), h, v)
+        pdf_path = self._output(job, html_filename.replace('.html', '.pdf'))
+        cached = self._render_layout(
+            job, html_content, pdf_path, "print_ready", 8,
+            lambda: create_pdf_native_custom(job["source"], str(pdf_path), h, v))
+        return pdf_path, cached
+
+    def _run_duplex(self, job):
+        from duplex import create_duplex_pdf, load_sides
+
+        front_svg, back_svg = load_sides(job["source"], SCRIPT_DIR)
+        pdf_path = self._output(job, f"business_cards_duplex_{job['flip']}_edge_{job['sheet'].upper()}.pdf")
+        pool = self.pool() if job["backend"] == "playwright" else None
+        create_duplex_pdf(front_svg, back_svg, pdf_path, job["sheets"], job["flip"], job["sheet"],
+                          job["backend"], pool)
+        return pdf_path, False
+
+    def _run_cards(self, job):
+        from parallel_pdf import create_parallel_job_pdf
+
+        pdf_path = self._output(job, f"business_cards_job_{job['cards']}.pdf")
+        create_parallel_job_pdf(str(job["source"]), pdf_path, total_cards=job["cards"],
+                                cards_per_page=job["cards_per_page"], workers=job["workers"],
+                                sheet=job["sheet"])
+        return pdf_path, False
+
+
+def run_jobs(runner, jobs, fail_fast=False):
+    """Run jobs in order on one runner; returns their summary records"""
+    results = []
+    for job in jobs:
+        if fail_fast and any(r["status"] == "failed" for r in results):
+            results.append({"name": job["name"], "type": job["type"], "backend": job["backend"],
+                            "status": "skipped"})
+            continue
+        record = runner.run(job)
+        results.append(record)
+        mark = "✗" if record["status"] == "failed" else "✓"
+        detail = record.get("error") or f"{Path(record['output']).name} ({record['status']})"
+        print(f"{mark} {record['name']}: {detail} [{record['seconds']:.2f}s]", file=sys.stderr)
+    return results
+
+
+def summarize(spec_path, results, seconds):
+    """(exit code, summary dict) for a finished run"""
+    counts = {status: sum(r["status"] == status for r in results) for status in ("ok", "cached", "failed", "skipped")}
+    exit_code = EXIT_JOB_FAILED if counts["failed"] else EXIT_OK
+    summary = {
+        "spec": str(spec_path),
+        "exit_code": exit_code,
+        "seconds": round(seconds, 3),
+        "counts": counts,
+        "jobs": results,
+    }
+    return exit_code, summary
+
+
+def _load_jobs(spec_path):
+    """(normalized jobs, output folder) for a spec file"""
+    base_dir = Path(spec_path).resolve().parent
+    spec = load_spec(spec_path)
+    jobs = normalize_jobs(spec, base_dir)
+    output_dir = base_dir / spec.get("output_dir", ".")
+    output_dir.mkdir(parents=True, exist_ok=True)
+    return jobs, output_dir
+
+
+def run_spec(spec_path, fail_fast=False):
+    """Load, validate and run a spec; returns (exit code, summary dict)"""
+    jobs, output_dir = _load_jobs(spec_path)
+
+    started = time.perf_counter()
+    runner = JobRunner(output_dir)
+    try:
+        results = run_jobs(runner, jobs, fail_fast)
+    finally:
+        runner.close()
+    return summarize(spec_path, results, time.perf_counter() - started)
+
+
+def job_dependencies(job):
+    """Every file a job's output is built from: its SVGs and the assets they reference"""
+    from watcher import svg_assets
+
+    if job["type"] == "duplex":
+        names = (["business_card_front.svg", "business_card_back.svg"] if job["source"] == "square"
+                 else ["business_card_print_ready.svg"])
+        sources = [SCRIPT_DIR / name for name in names]
+    else:
+        sources = [job["source"]]
+    paths = set()
+    for source in sources:
+        paths.add(Path(source).resolve())
+        paths.update(svg_assets(source))
+    return paths
+
+
+def dependency_map(jobs):
+    """{source or asset path: [names of the jobs built from it]}"""
+    dependents = {}
+    for job in jobs:
+        for path in job_dependencies(job):
+            dependents.setdefault(path, []).append(job["name"])
+    return dependents
+
+
+def watch_spec(spec_path, fail_fast=False):
+    """
+    Run the spec, then re-run only the jobs whose sources change
+
+    The browser, parsed templates and fonts stay warm between rebuilds.
+    Editing the spec itself reloads it and re-runs every job (the render
+    cache still skips outputs whose inputs did not change). Runs until
+    Ctrl+C.
+    """
+    from watcher import FileWatcher
+
+    spec_path = Path(spec_path).resolve()
+    jobs, output_dir = _load_jobs(spec_path)
+    runner = JobRunner(output_dir)
+    watcher = FileWatcher()
+    try:
+        affected = jobs
+        while True:
+            if affected:
+                started = time.perf_counter()
+                _, summary = summarize(spec_path, run_jobs(runner, affected, fail_fast),
+                                       time.perf_counter() - started)
+                counts = summary["counts"]
+                print(f"Rebuilt {len(affected)} job(s) in {summary['seconds']:.2f}s "
+                      f"({counts['ok']} rendered, {counts['cached']} cached, {counts['failed']} failed)")
+
+            dependents = dependency_map(jobs)
+            watcher.set_paths(list(dependents) + [spec_path])
+            print(f"Watching {len(dependents)} source file(s) with {watcher.backend}; Ctrl+C to stop")
+            changed = watcher.wait()
+            print(f"Changed: {', '.join(sorted(path.name for path in changed))}")
+
+            if spec_path in changed:
+                try:
+                    jobs, runner.output_dir = _load_jobs(spec_path)
+                except SpecError as e:
+                    print(f"Error: {e} (keeping the previous spec)")
+                    affected = []
+                    continue
+                affected = jobs
+            else:
+                names = {name for path in changed for name in dependents.get(path, [])}
+                affected = [job for job in jobs if job["name"] in names]
+    except KeyboardInterrupt:
+        print("\nStopped watching")
+    finally:
+        watcher.close()
+        runner.close()
+    return EXIT_OK
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a YAML/JSON spec of business card render jobs")
+    parser.add_argument("spec", help="job spec (.yaml, .yml or .json)")
+    parser.add_argument("--summary", default=None, help="write the results summary as JSON here")
+    parser.add_argument("--json", action="store_true", help="print the summary JSON on stdout")
+    parser.add_argument("--fail-fast", action="store_true", help="skip the remaining jobs after a failure")
+    parser.add_argument("--watch", action="store_true", help="re-render affected jobs whenever a source changes")
+    add_trace_argument(parser)
+    args = parser.parse_args()
+    configure(args.trace)
+
+    if args.watch:
+        if args.json or args.summary:
+            parser.error("--watch cannot be combined with --json or --summary")
+        try:
+            return watch_spec(args.spec, args.fail_fast)
+        except SpecError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return EXIT_BAD_SPEC
+
+    try:
+        # Keep stdout for the summary JSON; builder progress goes to stderr
+        with redirect_stdout(sys.stderr) if args.json else nullcontext():
+            exit_code, summary = run_spec(args.spec, args.fail_fast)
+    except SpecError as e:
+        summary = {"spec": args.spec, "exit_code": EXIT_BAD_SPEC, "error": str(e), "jobs": []}
+        exit_code = EXIT_BAD_SPEC
+        print(f"Error: {e}", file=sys.stderr)
+
+    if args.summary:
+        Path(args.summary).write_text(json.dumps(summary, indent=2), encoding='utf-8')
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    elif "counts" in summary:
+        counts = summary["counts"]
+        print(f"{len(summary['jobs'])} jobs in {summary['seconds']:.2f}s: {counts['ok']} rendered, "
+              f"{counts['cached']} cached, {counts['failed']} failed, {counts['skipped']} skipped")
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
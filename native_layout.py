@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Native (Chromium-free) Layout Backend for Square Business Cards
+Places the 85mm square SVGs at exact millimetre positions with
+svglib/ReportLab, mirroring the HTML grid layouts printed by Playwright
+
+Usage:
+    python native_layout.py --compare    # time native vs Playwright on all layouts
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import mm
+from reportlab.pdfgen import canvas
+
+from svg_drawing_cache import load_drawing
+from svg_to_pdf_converter_v2 import draw_card_form
+from tracing import add_trace_argument, configure, span, traced
+
+# Same grid as the standard layouts table in both layout scripts
+STANDARD_LAYOUTS = [(2, 3), (2, 2), (1, 3), (3, 2), (1, 2), (2, 1), (1, 1)]
+
+
+def layout_cells(cards_horizontal, cards_vertical, page_size=A4, margin_mm=6, gap_mm=2,
+                 top_mm=8, bottom_mm=12, max_card_mm=85):
+    """
+    Square card boxes (x, y, size) in points, filled row by row from the top
+
+    Matches the HTML grid: equal cells separated by gap_mm inside the
+    margins, minus room for the title (top_mm) and instructions
+    (bottom_mm); each card is centred in its cell and capped at max_card_mm.
+    """
+    page_width, page_height = page_size
+    usable_width = page_width - 2 * margin_mm * mm
+    usable_height = page_height - (2 * margin_mm + top_mm + bottom_mm) * mm
+
+    cell_width = (usable_width - (cards_horizontal - 1) * gap_mm * mm) / cards_horizontal
+    cell_height = (usable_height - (cards_vertical - 1) * gap_mm * mm) / cards_vertical
+    size = min(cell_width, cell_height, max_card_mm * mm)
+
+    top = page_height - (margin_mm + top_mm) * mm
+    cells = []
+    for row in range(cards_vertical):
+        for col in range(cards_horizontal):
+            cell_x = margin_mm * mm + col * (cell_width + gap_mm * mm)
+            cell_top = top - row * (cell_height + gap_mm * mm)
+            x = cell_x + (cell_width - size) / 2
+            y = cell_top - cell_height + (cell_height - size) / 2
+            cells.append((x, y, size))
+    return cells
+
+
+@traced("pdf.native_layout")
+def create_native_layout_pdf(svg_file_path, output_pdf_path, cards_horizontal, cards_vertical,
+                             title="", footer_lines=(), margin_mm=6, gap_mm=2):
+    """
+    Render an h×v sheet of one SVG card straight to PDF without a browser
+
+    The card is drawn once as a form XObject and placed in every cell,
+    scaled to fit the cell while keeping its aspect ratio.
+    """
+    drawing = load_drawing(svg_file_path)
+    page_width, page_height = A4
+
+    c = canvas.Canvas(str(output_pdf_path), pagesize=A4)
+    card_form = draw_card_form(c, drawing)
+
+    if title:
+        c.setFont("Helvetica-Bold", 9)
+        c.drawCentredString(page_width / 2, page_height - margin_mm * mm - 4 * mm, title)
+
+    for x, y, size in layout_cells(cards_horizontal, cards_vertical, margin_mm=margin_mm, gap_mm=gap_mm):
+        scale = min(size / drawing.width, size / drawing.height)
+        offset_x = (size - drawing.width * scale) / 2
+        offset_y = (size - drawing.height * scale) / 2
+
+        c.saveState()
+        c.translate(x + offset_x, y + offset_y)
+        c.scale(scale, scale)
+        c.doForm(card_form)
+        c.restoreState()
+
+        # Dashed cut guide, as in the HTML layouts
+        c.setStrokeColorRGB(0.4, 0.4, 0.4)
+        c.setLineWidth(0.5)
+        c.setDash([2, 2])
+        c.rect(x, y, size, size)
+        c.setDash([])
+
+    c.setFont("Helvetica", 6)
+    c.setFillColorRGB(0.33, 0.33, 0.33)
+    y_pos = margin_mm * mm + 3 * len(footer_lines) * mm
+    for line in footer_lines:
+        c.drawCentredString(page_width / 2, y_pos, line)
+        y_pos -= 3 * mm
+
+    with span("pdf.save"):
+        c.save()
+    return True
+
+
+def square_card_footer(cards_horizontal, cards_vertical, card_type):
+    return [
+        "Square Business Cards (85mm × 85mm)",
+        f"Card Type: {card_type.title()} • Layout: {cards_horizontal} cols × {cards_vertical} rows",
+        "Print on 250-300gsm cardstock • Cut along dashed lines • High quality settings recommended",
+    ]
+
+
+def compare_backends(svg_files, layouts=STANDARD_LAYOUTS):
+    """Render every layout with both backends and print wall-clock times"""
+    from browser_pool import BrowserPool
+    from create_square_card_pdfs import create_square_card_pdf
+
+    with tempfile.TemporaryDirectory(prefix="layout_compare_") as tmp_dir:
+        tmp_dir = Path(tmp_dir)
+
+        started = time.perf_counter()
+        for svg_file, card_type in svg_files:
+            for h, v in layouts:
+                create_native_layout_pdf(svg_file, tmp_dir / f"native_{card_type}_{h}x{v}.pdf", h, v,
+                                         footer_lines=square_card_footer(h, v, card_type))
+        native_seconds = time.perf_counter() - started
+
+        count = len(svg_files) * len(layouts)
+        print(f"native:     {count} PDFs in {native_seconds:.2f}s ({native_seconds / count * 1000:.0f} ms/PDF)")
+
+        try:
+            started = time.perf_counter()
+            with BrowserPool() as pool:
+                for svg_file, card_type in svg_files:
+                    for h, v in layouts:
+                        html_content, _ = create_square_card_pdf(str(svg_file), h, v, card_type)
+                        pool.render_pdf(html_content, tmp_dir / f"chromium_{card_type}_{h}x{v}.pdf", margin_mm=6)
+            chromium_seconds = time.perf_counter() - started
+        except Exception as e:
+            print(f"playwright: unavailable ({e})")
+            return native_seconds, None
+
+        print(f"playwright: {count} PDFs in {chromium_seconds:.2f}s ({chromium_seconds / count * 1000:.0f} ms/PDF, incl. browser start)")
+        print(f"speedup:    {chromium_seconds / native_seconds:.1f}×")
+        return native_seconds, chromium_seconds
+
+
+def main():
+    script_dir = Path(__file__).parent
+
+    parser = argparse.ArgumentParser(description="Chromium-free square card layouts")
+    parser.add_argument("--compare", action="store_true", help="benchmark native vs Playwright")
+    add_trace_argument(parser)
+    args = parser.parse_args()
+    configure(args.trace)
+
+    svg_files = [
+        (script_dir / "business_card_front.svg", "front"),
+        (script_dir / "business_card_back.svg", "back"),
+    ]
+
+    if args.compare:
+        compare_backends(svg_files)
+        return 0
+
+    for svg_file, card_type in svg_files:
+        for h, v in STANDARD_LAYOUTS:
+            pdf_path = script_dir / f"square_cards_{card_type}_{h}x{v}_A4.pdf"
+            create_native_layout_pdf(svg_file, pdf_path, h, v,
+                                     footer_lines=square_card_footer(h, v, card_type))
+            print(f"✓ {pdf_path.name}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Parallel PDF Generation for Large Business Card Jobs
+Splits a job into page ranges, renders each range in its own worker
+process with svglib/ReportLab and merges the chunks in page order
+
+Usage:
+    python parallel_pdf.py --cards 50000 --output cards_50000.pdf
+    python parallel_pdf.py --cards 5000 --workers 8 --svg business_card_front.svg
+"""
+
+import argparse
+import math
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from svg_drawing_cache import load_drawing
+from svg_to_pdf_converter_v2 import card_grid, create_card_job_pdf
+from tracing import add_trace_argument, configure, span, traced
+
+# Smallest chunk worth a process round-trip; tiny jobs stay serial
+MIN_PAGES_PER_CHUNK = 20
+
+
+def _init_worker(svg_file_path):
+    # Parse the template once per worker; every chunk then hits the memory cache
+    if svg_file_path:
+        load_drawing(svg_file_path)
+
+
+def _render_chunk(task):
+    chunk_path, cards, total_cards, cards_per_page, first_page, sheet = task
+    with span("pdf.chunk", first_page=first_page):
+        pages = create_card_job_pdf(cards, chunk_path, total_cards=total_cards,
+                                    cards_per_page=cards_per_page, first_page=first_page, sheet=sheet)
+    return chunk_path, pages
+
+
+def plan_chunks(total_cards, cards_per_page, workers, min_pages=MIN_PAGES_PER_CHUNK):
+    """Split a job into (first_card, card_count, first_page) ranges on page boundaries"""
+    total_pages = math.ceil(total_cards / cards_per_page)
+    if total_pages < 1:
+        return []
+    chunk_count = max(1, min(workers, total_pages // min_pages or 1))
+    pages_per_chunk = math.ceil(total_pages / chunk_count)
+
+    chunks = []
+    for first_page in range(0, total_pages, pages_per_chunk):
+        first_card = first_page * cards_per_page
+        card_count = min(pages_per_chunk * cards_per_page, total_cards - first_card)
+        chunks.append((first_card, card_count, first_page + 1))
+    return chunks
+
+
+@traced("pdf.merge")
+def merge_pdfs(chunk_paths, output_pdf_path):
+    """Concatenate chunk PDFs in order; identical forms/fonts are stored once"""
+    from pypdf import PdfWriter
+
+    writer = PdfWriter()
+    for chunk_path in chunk_paths:
+        writer.append(str(chunk_path))
+    # Each chunk carries its own copy of the card form and Helvetica;
+    # collapse byte-identical objects so the merged file keeps one
+    if hasattr(writer, "compress_identical_objects"):
+        writer.compress_identical_objects()
+    with open(output_pdf_path, 'wb') as f:
+        writer.write(f)
+
+
+def create_parallel_job_pdf(cards, output_pdf_path, total_cards=None, cards_per_page=None,
+                            workers=None, sheet="A4"):
+    """
+    Render a large job across a process pool and merge it into one PDF
+
+    cards is one SVG path (with total_cards) or a list of SVG paths, as
+    for create_card_job_pdf. Returns the number of pages written.
+    """
+    workers = workers or os.cpu_count() or 1
+    per_page = len(card_grid(sheet))
+    if cards_per_page:
+        per_page = min(per_page, cards_per_page)
+
+    template = None
+    if isinstance(cards, (str, Path)):
+        template = str(cards)
+        if total_cards is None:
+            raise ValueError("total_cards is required when cards is a single SVG path")
+    else:
+        cards = [str(card) for card in cards]
+        total_cards = len(cards)
+    if total_cards < 1:
+        raise ValueError("a job needs at least one card")
+
+    chunks = plan_chunks(total_cards, per_page, workers)
+    if len(chunks) == 1:
+        return create_card_job_pdf(template or cards, output_pdf_path, total_cards=total_cards,
+                                   cards_per_page=cards_per_page, sheet=sheet)
+
+    with tempfile.TemporaryDirectory(prefix="card_chunks_") as tmp_dir:
+        tasks = []
+        for index, (first_card, card_count, first_page) in enumerate(chunks):
+            chunk_path = str(Path(tmp_dir) / f"chunk_{index:04d}.pdf")
+            if template:
+                tasks.append((chunk_path, template, card_count, cards_per_page, first_page, sheet))
+            else:
+                chunk_cards = cards[first_card:first_card + card_count]
+                tasks.append((chunk_path, chunk_cards, None, cards_per_page, first_page, sheet))
+
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks)), initializer=_init_worker,
+                                 initargs=(template,)) as executor:
+            results = list(executor.map(_render_chunk, tasks))
+
+        merge_pdfs([chunk_path for chunk_path, _ in results], output_pdf_path)
+    return sum(pages for _, pages in results)
+
+
+def main():
+    script_dir = Path(__file__).parent
+
+    parser = argparse.ArgumentParser(description="Render a large business card job on all cores")
+    parser.add_argument("--cards", type=int, required=True, help="total number of cards")
+    parser.add_argument("--svg", default=str(script_dir / "business_card_print_ready.svg"))
+    parser.add_argument("--output", default=None, help="output PDF")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument("--sheet", default="A4", help="paper size: A4, Letter, A3 or SRA3")
+    add_trace_argument(parser)
+    args = parser.parse_args()
+    configure(args.trace)
+    if args.cards < 1:
+        parser.error("--cards must be at least 1")
+
+    output = args.output or str(script_dir / f"business_cards_job_{args.cards}.pdf")
+    workers = args.workers or os.cpu_count() or 1
+
+    print(f"Rendering {args.cards} cards on {workers} workers...")
+    started = time.perf_counter()
+    try:
+        pages = create_parallel_job_pdf(args.svg, output, total_cards=args.cards, workers=workers,
+                                        sheet=args.sheet)
+    except ImportError as e:
+        print(f"Missing required library: {e}")
+        print("Please install required packages:")
+        print("pip install pypdf")
+        return 1
+
+    print(f"✓ PDF saved: {output} ({pages} pages in {time.perf_counter() - started:.2f}s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
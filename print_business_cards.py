@@ -66,22 +66,18 @@ def main():
         print("Make sure business_card_print_ready.svg is in the same folder")
         return
     
-    # Check if HTML files exist
-    html_multiple = script_dir / "business_cards_multiple_A4.html"
-    html_single = script_dir / "business_cards_single_A4.html"
-    
-    if not html_multiple.exists() or not html_single.exists():
-        print("HTML files not found. Creating them now...")
-        try:
-            # Import and run the HTML creator
-            import subprocess
-            subprocess.run([
-                "python", 
-                str(script_dir / "svg_to_pdf_simple.py")
-            ], check=True)
-        except:
-            print("Please run 'svg_to_pdf_simple.py' first to create the HTML files")
-            return
+    # Build the HTML sheets, or refresh them if an SVG changed since the last run
+    from build_graph import build_sheet_html
+
+    print("Checking HTML files...")
+    try:
+        unfinished = build_sheet_html(script_dir)
+    except ImportError as e:
+        print(f"Could not build the HTML files: {e}")
+        return
+    if unfinished:
+        print(f"Could not build the HTML files; failed or blocked: {', '.join(unfinished)}")
+        return
     
     open_files_for_printing()
 
@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+"""
+Batch QR Code Service
+Encodes many payloads (URLs, vCard/MECARD contacts) into SVG path data
+that drops straight into the back-card templates, with no image files.
+Each payload is encoded once: results are memoized in process and on
+disk, keyed by payload and options
+
+Usage:
+    python qr_service.py https://soul059.github.io/Business-card/
+    python qr_service.py --vcard "Keval Chauhan" --phone "+91 9429806587"
+    python qr_service.py --benchmark https://soul059.github.io/Business-card/
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import sys
+import time
+from dataclasses import asdict, dataclass
+
+from render_cache import DEFAULT_CACHE_DIR
+from tracing import span
+
+QR_CACHE_DIR = DEFAULT_CACHE_DIR / "qr"
+
+# Lowest to highest recovery (~7%, 15%, 25%, 30% of codewords)
+ERROR_LEVELS = ("L", "M", "Q", "H")
+DEFAULT_BORDER = 4
+# Bump when matrix_to_path() output changes so cached path data is redone
+PATH_FORMAT = 2
+
+# (payload, error_correction, border) -> QRResult
+_memory_cache = {}
+
+
+@dataclass(frozen=True)
+class QRResult:
+    payload: str
+    version: int
+    error_correction: str
+    border: int
+    size: int  # modules per side, border included
+    path_data: str  # one unit per module, origin at the top-left of the border
+
+    def svg(self, fill="#000000", background="#ffffff", size_mm=None):
+        """Standalone SVG document, like qrcode's SvgPathImage output"""
+        size_mm = size_mm or self.size
+        return (
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{size_mm:g}mm" height="{size_mm:g}mm" '
+            f'viewBox="0 0 {self.size} {self.size}">'
+            f'<rect width="{self.size}" height="{self.size}" fill="{background}"/>'
+            f'<path d="{self.path_data}" fill="{fill}"/></svg>'
+        )
+
+    def svg_group(self, x, y, size, fill="#000000", element_id="qr"):
+        """<g> that draws the code as a size×size square at (x, y) in the template's units"""
+        scale = size / self.size
+        return (
+            f'<g id="{element_id}" transform="translate({x:g}, {y:g}) scale({scale:.6g})" data-size="{size:g}">'
+            f'<path d="{self.path_data}" fill="{fill}"/></g>'
+        )
+
+
+def _error_constant(level):
+    import qrcode.constants
+
+    return getattr(qrcode.constants, f"ERROR_CORRECT_{level}")
+
+
+def _fit_version(payload, level, max_version):
+    """Smallest version that holds the payload at this level, or None"""
+    import qrcode
+    from qrcode.exceptions import DataOverflowError
+
+    qr = qrcode.QRCode(error_correction=_error_constant(level))
+    qr.add_data(payload)
+    try:
+        version = qr.best_fit()
+    except DataOverflowError:
+        return None
+    return version if version <= max_version else None
+
+
+def choose_symbol(payload, error_correction="auto", max_version=40):
+    """
+    Pick (version, level) for a payload
+
+    "auto" takes the smallest version that fits at all, then the highest
+    error-correction level that still fits in that version, so the extra
+    recovery costs no extra modules. A fixed level only minimizes version.
+    """
+    if error_correction != "auto":
+        level = error_correction.upper()
+        if level not in ERROR_LEVELS:
+            raise ValueError(f"error_correction must be 'auto' or one of {ERROR_LEVELS}")
+        version = _fit_version(payload, level, max_version)
+        if version is None:
+            raise ValueError(f"Payload too long for a version {max_version} QR code at level {level}")
+        return version, level
+
+    version = _fit_version(payload, "L", max_version)
+    if version is None:
+        raise ValueError(f"Payload too long for a version {max_version} QR code")
+    best = "L"
+    for level in ERROR_LEVELS[1:]:
+        if _fit_version(payload, level, version) != version:
+            break
+        best = level
+    return version, best
+
+
+def matrix_to_path(matrix, border=0):
+    """
+    Compact SVG path data for a module matrix, integer coordinates only
+
+    Dark modules are merged into horizontal runs, and runs with the same
+    span on consecutive rows into one rectangle, so a QR code needs a few
+    hundred subpaths instead of one per module. matrix rows are sequences
+    of booleans; border offsets the path when the matrix has no quiet zone.
+    """
+    try:
+        rects = _rectangles_numpy(matrix)
+    except ImportError:
+        rects = _rectangles_python(matrix)
+    return "".join(f"M{x + border},{y + border}h{w}v{h}h-{w}z" for x, y, w, h in rects)
+
+
+def _rectangles_numpy(matrix):
+    import numpy as np
+
+    modules = np.asarray(matrix, dtype=np.int8)
+    if modules.size == 0:
+        return []
+    # Run boundaries: +1 where a run starts, -1 just past where it ends
+    padded = np.pad(modules, ((0, 0), (1, 1)))
+    edges = np.diff(padded, axis=1)
+    rows, starts = np.nonzero(edges == 1)
+    _, ends = np.nonzero(edges == -1)  # row-major order pairs each end with its start
+
+    # Group runs that share a span on consecutive rows into rectangles
+    order = np.lexsort((rows, ends, starts))
+    rows, starts, ends = rows[order], starts[order], ends[order]
+    new_rect = np.ones(len(rows), dtype=bool)
+    new_rect[1:] = (starts[1:] != starts[:-1]) | (ends[1:] != ends[:-1]) | (rows[1:] != rows[:-1] + 1)
+    first = np.flatnonzero(new_rect)
+    heights = np.diff(np.append(first, len(rows)))
+
+    # Emit in reading order (top row first) for readable, diff-stable output
+    rects = np.stack([starts[first], rows[first], ends[first] - starts[first], heights], axis=1)
+    rects = rects[np.lexsort((rects[:, 0], rects[:, 1]))]
+    return rects.tolist()
+
+
+def _rectangles_python(matrix):
+    # Same result as _rectangles_numpy, for installs without NumPy
+    open_rects = {}  # (start, end) -> [x, y, w, h] still growing downwards
+    rects = []
+    for y, row in enumerate(matrix):
+        spans = []
+        x, width = 0, len(row)
+        while x < width:
+            if row[x]:
+                start = x
+                while x < width and row[x]:
+                    x += 1
+                spans.append((start, x))
+            x += 1
+        for span in spans:
+            rect = open_rects.get(span)
+            if rect is not None and rect[1] + rect[3] == y:
+                rect[3] += 1
+            else:
+                rect = [span[0], y, span[1] - span[0], 1]
+                open_rects[span] = rect
+                rects.append(rect)
+    rects.sort(key=lambda rect: (rect[1], rect[0]))
+    return rects
+
+
+def _cache_key(payload, level, border):
+    import qrcode
+
+    meta = json.dumps({"payload": payload, "ec": level, "border": border, "path": PATH_FORMAT,
+                       "qrcode": getattr(qrcode, "__version__", "?")}, sort_keys=True)
+    return hashlib.sha256(meta.encode('utf-8')).hexdigest()
+
+
+def _disk_enabled():
+    return os.environ.get("BUSINESS_CARD_CACHE", "1") != "0"
+
+
+def encode(payload, error_correction="auto", border=DEFAULT_BORDER, max_version=40, cache_dir=QR_CACHE_DIR):
+    """
+    Encode one payload, reusing any earlier result for the same options
+
+    Raises ValueError when the payload does not fit in max_version.
+    """
+    import qrcode
+
+    memory_key = (payload, error_correction, border)
+    result = _memory_cache.get(memory_key)
+    if result is not None and result.version <= max_version:
+        return result
+
+    cache_path = os.path.join(str(cache_dir), f"{_cache_key(payload, error_correction, border)}.json")
+    if _disk_enabled() and os.path.exists(cache_path):
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                result = QRResult(**json.load(f))
+        except (OSError, ValueError, TypeError):
+            result = None
+        if result is not None and result.version <= max_version:
+            _memory_cache[memory_key] = result
+            return result
+
+    with span("qr.encode", payload_bytes=len(payload)):
+        version, level = choose_symbol(payload, error_correction, max_version)
+        qr = qrcode.QRCode(version=version, error_correction=_error_constant(level), border=border)
+        qr.add_data(payload)
+        qr.make(fit=False)
+        matrix = qr.get_matrix()
+
+        result = QRResult(payload=payload, version=version, error_correction=level, border=border,
+                          size=len(matrix), path_data=matrix_to_path(matrix))
+    _memory_cache[memory_key] = result
+
+    if _disk_enabled():
+        os.makedirs(str(cache_dir), exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(asdict(result), f)
+        os.replace(tmp_path, cache_path)
+    return result
+
+
+def encode_many(payloads, **options):
+    """Encode a batch of payloads; repeated payloads are encoded only once"""
+    return [encode(payload, **options) for payload in payloads]
+
+
+def _vcard_escape(value):
+    return (str(value).replace("\\", "\\\\").replace("\n", "\\n")
+            .replace(",", "\\,").replace(";", "\\;"))
+
+
+def _mecard_escape(value):
+    return "".join(f"\\{ch}" if ch in '\\;,:"' else ch for ch in str(value))
+
+
+def vcard(name, phone="", email="", url="", org="", title=""):
+    """vCard 3.0 payload for a contact"""
+    lines = ["BEGIN:VCARD", "VERSION:3.0", f"FN:{_vcard_escape(name)}"]
+    parts = str(name).rsplit(" ", 1)
+    family, given = (parts[1], parts[0]) if len(parts) == 2 else (parts[0], "")
+    lines.append(f"N:{_vcard_escape(family)};{_vcard_escape(given)};;;")
+    if org:
+        lines.append(f"ORG:{_vcard_escape(org)}")
+    if title:
+        lines.append(f"TITLE:{_vcard_escape(title)}")
+    if phone:
+        lines.append(f"TEL;TYPE=CELL:{_vcard_escape(phone)}")
+    if email:
+        lines.append(f"EMAIL:{_vcard_escape(email)}")
+    if url:
+        lines.append(f"URL:{_vcard_escape(url)}")
+    lines.append("END:VCARD")
+    return "\r\n".join(lines)
+
+
+def mecard(name, phone="", email="", url=""):
+    """MECARD payload; denser than vCard, so it often fits a smaller version"""
+    fields = [f"N:{_mecard_escape(name)}"]
+    if phone:
+        fields.append(f"TEL:{_mecard_escape(phone)}")
+    if email:
+        fields.append(f"EMAIL:{_mecard_escape(email)}")
+    if url:
+        fields.append(f"URL:{_mecard_escape(url)}")
+    return "MECARD:" + ";".join(fields) + ";;"
+
+
+def contact_payload(record, kind="vcard"):
+    """vCard or MECARD payload from a roster record's name/phone/email/website fields"""
+    common = dict(name=record.get("name", ""), phone=record.get("phone", ""),
+                  email=record.get("email", ""), url=record.get("website", ""))
+    if kind == "mecard":
+        return mecard(**common)
+    return vcard(org=record.get("org", ""), title=record.get("role", ""), **common)
+
+
+def benchmark_paths(payload, copies=50, repeat=5):
+    """
+    Compare qrcode's SvgPathImage path with matrix_to_path()
+
+    Reports path bytes and subpath count, and the best-of-repeat time for
+    svglib to parse and ReportLab to draw a sheet of `copies` codes.
+    """
+    import qrcode
+    from qrcode.image.svg import SvgPathImage
+    from reportlab.graphics import renderPDF
+    from reportlab.pdfgen import canvas
+    from svglib.svglib import svg2rlg
+
+    result = encode(payload)
+    qr = qrcode.QRCode(version=result.version, error_correction=_error_constant(result.error_correction),
+                       border=result.border)
+    qr.add_data(payload)
+    qr.make(fit=False)
+    buffer = io.BytesIO()
+    qr.make_image(image_factory=SvgPathImage).save(buffer)
+    path_image_d = buffer.getvalue().decode('utf-8').split(' d="', 1)[1].split('"', 1)[0]
+
+    rows = []
+    for name, path_data in (("SvgPathImage", path_image_d), ("matrix_to_path", result.path_data)):
+        columns = 10
+        size = result.size
+        cells = "".join(
+            f'<path transform="translate({(i % columns) * size} {(i // columns) * size})" d="{path_data}"/>'
+            for i in range(copies)
+        )
+        sheet_svg = (f'<svg xmlns="http://www.w3.org/2000/svg" width="{columns * size}" '
+                     f'height="{-(-copies // columns) * size}">{cells}</svg>')
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            drawing = svg2rlg(io.BytesIO(sheet_svg.encode('utf-8')))
+            c = canvas.Canvas(io.BytesIO())
+            renderPDF.draw(drawing, c, 0, 0)
+            c.save()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        rows.append((name, len(path_data), path_data.count("M"), best))
+    return rows
+
+
+def clear_memory_cache():
+    """Drop every in-process result (the disk cache is left alone)"""
+    _memory_cache.clear()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Encode QR payloads as SVG path data")
+    parser.add_argument("payloads", nargs="*", help="URLs or other text to encode")
+    parser.add_argument("--vcard", metavar="NAME", help="encode a vCard contact instead")
+    parser.add_argument("--mecard", metavar="NAME", help="encode a MECARD contact instead")
+    parser.add_argument("--phone", default="")
+    parser.add_argument("--email", default="")
+    parser.add_argument("--url", default="")
+    parser.add_argument("--ec", default="auto", help="error correction: auto, L, M, Q or H")
+    parser.add_argument("--svg", action="store_true", help="print a full SVG instead of a summary")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="compare path size and svglib render time with qrcode's SvgPathImage")
+    args = parser.parse_args()
+
+    payloads = list(args.payloads)
+    if args.vcard:
+        payloads.append(vcard(args.vcard, args.phone, args.email, args.url))
+    if args.mecard:
+        payloads.append(mecard(args.mecard, args.phone, args.email, args.url))
+    if not payloads:
+        parser.error("give at least one payload, --vcard or --mecard")
+
+    if args.benchmark:
+        try:
+            rows = benchmark_paths(payloads[0])
+        except ImportError as e:
+            print(f"Missing required library: {e}")
+            print("pip install qrcode svglib reportlab")
+            return 1
+        print(f"{'path':<16}{'bytes':>8}{'subpaths':>10}{'50-up render':>14}")
+        for name, size, subpaths, seconds in rows:
+            print(f"{name:<16}{size:>8}{subpaths:>10}{seconds * 1000:>11.1f} ms")
+        return 0
+    
+    try:
+        results = encode_many(payloads, error_correction=args.ec)
+    except ImportError:
+        print("qrcode library not found. Install with: pip install qrcode")
+        return 1
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 1
+
+    for result in results:
+        if args.svg:
+            print(result.svg())
+            continue
+        preview = result.payload.replace("\r\n", " | ")
+        print(f"version {result.version:>2}  EC {result.error_correction}  {result.size}×{result.size} modules  "
+              f"{len(result.path_data)} bytes of path  {preview[:60]}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+DPI-Aware Raster Cache for Card Bitmaps
+Rasterizes a card SVG once per (source hash, DPI, colour mode) and
+keeps the optimized PNG on disk with LRU eviction, plus a small
+in-memory LRU, so print PDFs, raster layouts and previews share one
+bitmap per resolution
+
+Usage:
+    python raster_cache.py thumbnails              # 96 DPI previews of the card SVGs
+    python raster_cache.py show | clear
+"""
+
+import argparse
+import base64
+import hashlib
+import io
+import os
+import sys
+from collections import OrderedDict
+from pathlib import Path
+
+from render_cache import DEFAULT_CACHE_DIR
+from tracing import span
+
+RASTER_CACHE_DIR = DEFAULT_CACHE_DIR / "raster"
+DEFAULT_RASTER_MAX_BYTES = int(float(os.environ.get("BUSINESS_CARD_RASTER_CACHE_MB", "128")) * 1024 * 1024)
+RASTER_VERSION = 1
+
+PRINT_DPI = 300
+HIGH_PRINT_DPI = 600
+PREVIEW_DPI = 96
+# RGBA keeps transparency, RGB is flattened onto white paper, L is greyscale
+COLOR_MODES = ("RGBA", "RGB", "L")
+
+
+def _svg_bytes(svg_source):
+    """SVG bytes for a path, bytes or markup string, outlined if that profile is on"""
+    from text_outlines import outline_for_render
+
+    if isinstance(svg_source, bytes):
+        text = svg_source.decode('utf-8')
+    elif isinstance(svg_source, str) and svg_source.lstrip().startswith("<"):
+        text = svg_source
+    else:
+        text = Path(svg_source).read_text(encoding='utf-8')
+    return outline_for_render(text).encode('utf-8')
+
+
+def _rasterize(svg_bytes, dpi, color_mode):
+    import cairosvg
+
+    with span("cairosvg.rasterize", dpi=dpi):
+        png_data = cairosvg.svg2png(bytestring=svg_bytes, dpi=dpi)
+    from PIL import Image
+
+    image = Image.open(io.BytesIO(png_data))
+    if color_mode != "RGBA":
+        image = image.convert("RGBA")
+        paper = Image.new("RGBA", image.size, (255, 255, 255, 255))
+        image = Image.alpha_composite(paper, image).convert(color_mode)
+    out = io.BytesIO()
+    # Embed the resolution so viewers and PDF tools size the bitmap correctly
+    image.save(out, format="PNG", optimize=True, dpi=(dpi, dpi))
+    return out.getvalue()
+
+
+class RasterCache:
+    """PNG bitmaps keyed by SVG content, DPI and colour mode"""
+
+    def __init__(self, cache_dir=RASTER_CACHE_DIR, max_bytes=DEFAULT_RASTER_MAX_BYTES,
+                 memory_items=16, enabled=True):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.memory_items = memory_items
+        self.enabled = enabled
+        self._memory = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(svg_bytes, dpi, color_mode):
+        digest = hashlib.sha256(svg_bytes)
+        digest.update(f"\0v{RASTER_VERSION}:{dpi}:{color_mode}".encode('utf-8'))
+        return digest.hexdigest()
+
+    def png(self, svg_source, dpi=PRINT_DPI, color_mode="RGB"):
+        """PNG bytes of the card at this resolution, rasterizing only on a miss"""
+        if color_mode not in COLOR_MODES:
+            raise ValueError(f"color_mode must be one of {COLOR_MODES}")
+        svg_bytes = _svg_bytes(svg_source)
+        key = self.key(svg_bytes, dpi, color_mode)
+
+        data = self._memory.get(key)
+        if data is not None:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return data
+
+        entry = self.cache_dir / f"{key}.png"
+        if self.enabled and entry.exists():
+            data = entry.read_bytes()
+            os.utime(entry)
+            self.hits += 1
+        else:
+            data = _rasterize(svg_bytes, dpi, color_mode)
+            self.misses += 1
+            if self.enabled:
+                self.cache_dir.mkdir(parents=True, exist_ok=True)
+                tmp_path = entry.with_name(f".{entry.name}.{os.getpid()}.tmp")
+                tmp_path.write_bytes(data)
+                os.replace(tmp_path, entry)
+                self.evict()
+
+        self._memory[key] = data
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+        return data
+
+    def image_reader(self, svg_source, dpi=PRINT_DPI, color_mode="RGB"):
+        """ReportLab ImageReader over the cached PNG (embedded once per PDF)"""
+        from reportlab.lib.utils import ImageReader
+
+        return ImageReader(io.BytesIO(self.png(svg_source, dpi, color_mode)))
+
+    def data_uri(self, svg_source, dpi=PREVIEW_DPI, color_mode="RGB"):
+        """data: URI for HTML layouts and previews"""
+        encoded = base64.b64encode(self.png(svg_source, dpi, color_mode)).decode('ascii')
+        return f"data:image/png;base64,{encoded}"
+
+    def entries(self):
+        """(path, size, last_used) for every bitmap, oldest first"""
+        if not self.cache_dir.exists():
+            return []
+        found = []
+        for entry in self.cache_dir.glob("*.png"):
+            stat = entry.stat()
+            found.append((entry, stat.st_size, stat.st_mtime))
+        found.sort(key=lambda item: item[2])
+        return found
+
+    def evict(self, max_bytes=None):
+        """Drop least recently used bitmaps until the cache fits max_bytes"""
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for entry, size, _ in entries:
+            if total <= limit:
+                break
+            entry.unlink()
+            total -= size
+            removed += 1
+        return removed
+
+    def clear(self):
+        self._memory.clear()
+        count = 0
+        for entry, _, _ in self.entries():
+            entry.unlink()
+            count += 1
+        return count
+
+
+_default_cache = None
+
+
+def get_raster_cache():
+    """Process-wide raster cache; BUSINESS_CARD_CACHE=0 keeps bitmaps in memory only"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = RasterCache(enabled=os.environ.get("BUSINESS_CARD_CACHE", "1") != "0")
+    return _default_cache
+
+
+def raster_layout_dpi():
+    """DPI for raster HTML layouts from BUSINESS_CARD_RASTER_DPI, or None for vector cards"""
+    value = os.environ.get("BUSINESS_CARD_RASTER_DPI", "")
+    return int(value) if value.isdigit() else None
+
+
+def main():
+    script_dir = Path(__file__).parent
+
+    parser = argparse.ArgumentParser(description="Card bitmap cache")
+    parser.add_argument("command", choices=["thumbnails", "show", "clear"])
+    parser.add_argument("--dpi", type=int, default=PREVIEW_DPI, help="thumbnail resolution")
+    parser.add_argument("--mode", choices=COLOR_MODES, default="RGB", help="thumbnail colour mode")
+    args = parser.parse_args()
+
+    cache = get_raster_cache()
+    if args.command == "show":
+        entries = cache.entries()
+        total = sum(size for _, size, _ in entries)
+        print(f"Raster cache: {cache.cache_dir}")
+        print(f"  {len(entries)} bitmaps, {total / 1024:.1f} KB of {cache.max_bytes / (1024 * 1024):.0f} MB")
+        return 0
+    if args.command == "clear":
+        print(f"Removed {cache.clear()} bitmaps")
+        return 0
+
+    try:
+        for name in ("business_card_front", "business_card_back", "business_card_print_ready"):
+            svg_path = script_dir / f"{name}.svg"
+            png_path = script_dir / f"{name}_preview.png"
+            png_path.write_bytes(cache.png(svg_path, args.dpi, args.mode))
+            print(f"✓ {png_path.name} ({args.dpi} DPI, {args.mode})")
+    except (ImportError, OSError) as e:
+        print(f"Missing required library: {e}")
+        print("pip install cairosvg pillow")
+        return 1
+    print(f"  {cache.hits} from cache, {cache.misses} rasterized")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Render Cache for Business Card Artifacts
+Content-addressed store for rendered PDFs so unchanged SVG + layout
+combinations are never rendered twice
+
+Usage:
+    python render_cache.py show
+    python render_cache.py clear
+    python render_cache.py prune --max-mb 100
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import time
+from pathlib import Path
+
+# Bump when the HTML/PDF builders change output for the same inputs
+CACHE_VERSION = 1
+
+DEFAULT_CACHE_DIR = Path(os.environ.get(
+    "BUSINESS_CARD_CACHE_DIR", Path(__file__).parent / ".render_cache"))
+DEFAULT_MAX_BYTES = int(os.environ.get("BUSINESS_CARD_CACHE_MB", "256")) * 1024 * 1024
+
+
+def _read_bytes(source):
+    if isinstance(source, bytes):
+        return source
+    with open(source, 'rb') as f:
+        return f.read()
+
+
+def render_key(svg_source, backend, side, **layout):
+    """Hash of the SVG bytes, layout parameters, card side and backend
+
+    svg_source may be a path or the raw SVG bytes. Layout keywords are
+    things like h, v, margin_mm and page; they are hashed in sorted order.
+    """
+    digest = hashlib.sha256()
+    digest.update(_read_bytes(svg_source))
+    from raster_cache import raster_layout_dpi
+    from svg_optimizer import print_profile
+    from text_outlines import outlines_enabled
+
+    meta = {
+        "version": CACHE_VERSION,
+        "backend": backend,
+        "side": side,
+        "layout": layout,
+        # Builders embed the optimized SVG, so its settings shape the output
+        "optimizer": print_profile(),
+        "outline_text": outlines_enabled(),
+        "raster_dpi": raster_layout_dpi(),
+    }
+    digest.update(json.dumps(meta, sort_keys=True, default=str).encode('utf-8'))
+    return digest.hexdigest()
+
+
+class RenderCache:
+    """Size-bounded LRU store of rendered artifacts keyed by render_key()"""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES, enabled=True):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+
+    def _entry_path(self, key, suffix):
+        return self.cache_dir / key[:2] / f"{key}{suffix}"
+
+    def fetch(self, key, output_path):
+        """Materialize a cached artifact at output_path; False on a miss
+
+        Hits are hard-linked when possible and copied otherwise. On a miss
+        a stale hard link at output_path is removed so the renderer that
+        runs next cannot overwrite a cache entry through it.
+        """
+        output_path = Path(output_path)
+        entry = self._entry_path(key, output_path.suffix)
+
+        if not self.enabled or not entry.exists():
+            self.misses += 1
+            if output_path.exists() and output_path.stat().st_nlink > 1:
+                output_path.unlink()
+            return False
+
+        # Refresh the LRU clock
+        os.utime(entry)
+
+        tmp_path = output_path.with_name(f".{output_path.name}.{os.getpid()}.tmp")
+        if tmp_path.exists():
+            tmp_path.unlink()
+        try:
+            os.link(entry, tmp_path)
+        except OSError:
+            shutil.copyfile(entry, tmp_path)
+        os.replace(tmp_path, output_path)
+
+        self.hits += 1
+        return True
+
+    def store(self, key, output_path):
+        """Copy a freshly rendered artifact into the cache"""
+        if not self.enabled:
+            return
+        output_path = Path(output_path)
+        if not output_path.exists():
+            return
+
+        entry = self._entry_path(key, output_path.suffix)
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = entry.with_name(f".{entry.name}.{os.getpid()}.tmp")
+        shutil.copyfile(output_path, tmp_path)
+        os.replace(tmp_path, entry)
+        self.evict()
+
+    def _buckets(self):
+        """The two-hex-digit key folders; drawings/, svg/, qr/ etc. belong to other caches"""
+        if not self.cache_dir.exists():
+            return []
+        return [bucket for bucket in self.cache_dir.iterdir()
+                if bucket.is_dir() and len(bucket.name) == 2 and all(c in "0123456789abcdef" for c in bucket.name)]
+
+    def entries(self):
+        """List (path, size, last_used) for every entry, oldest first"""
+        found = []
+        for bucket in self._buckets():
+            for entry in bucket.iterdir():
+                if entry.name.startswith('.'):
+                    continue
+                stat = entry.stat()
+                found.append((entry, stat.st_size, stat.st_mtime))
+        found.sort(key=lambda item: item[2])
+        return found
+
+    def total_bytes(self):
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self, max_bytes=None):
+        """Drop least recently used entries until the cache fits max_bytes"""
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for entry, size, _ in entries:
+            if total <= limit:
+                break
+            entry.unlink()
+            total -= size
+            removed += 1
+        return removed
+
+    def clear(self):
+        """Remove every cached artifact, leaving the other caches under the same folder alone"""
+        count = len(self.entries())
+        for bucket in self._buckets():
+            shutil.rmtree(bucket)
+        return count
+
+
+def store_render_results(cache, results):
+    """Store the PDFs of successful async RenderResults that carry a cache_key"""
+    for result in results:
+        if result.ok and result.job.cache_key:
+            cache.store(result.job.cache_key, result.job.output_pdf_path)
+
+
+_default_cache = None
+
+
+def get_cache():
+    """Process-wide cache; set BUSINESS_CARD_CACHE=0 to disable it"""
+    global _default_cache
+    if _default_cache is None:
+        enabled = os.environ.get("BUSINESS_CARD_CACHE", "1") != "0"
+        _default_cache = RenderCache(enabled=enabled)
+    return _default_cache
+
+
+def _format_size(num_bytes):
+    for unit in ("B", "KB", "MB", "GB"):
+        if num_bytes < 1024 or unit == "GB":
+            return f"{num_bytes:.1f} {unit}"
+        num_bytes /= 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or clear the business card render cache")
+    parser.add_argument("command", choices=["show", "clear", "prune"])
+    parser.add_argument("--dir", default=str(DEFAULT_CACHE_DIR), help="cache directory")
+    parser.add_argument("--max-mb", type=float, default=DEFAULT_MAX_BYTES / (1024 * 1024),
+                        help="size limit used by prune")
+    args = parser.parse_args()
+
+    cache = RenderCache(args.dir, max_bytes=int(args.max_mb * 1024 * 1024))
+
+    if args.command == "show":
+        entries = cache.entries()
+        total = sum(size for _, size, _ in entries)
+        print(f"Render cache: {cache.cache_dir}")
+        print(f"Entries: {len(entries)}  Size: {_format_size(total)}  Limit: {_format_size(cache.max_bytes)}")
+        for entry, size, last_used in reversed(entries):
+            stamp = time.strftime("%Y-%m-%d %H:%M", time.localtime(last_used))
+            print(f"  {stamp}  {_format_size(size):>10}  {entry.name}")
+    elif args.command == "clear":
+        print(f"Removed {cache.clear()} cached artifacts from {cache.cache_dir}")
+    else:
+        print(f"Evicted {cache.evict()} entries; cache is now {_format_size(cache.total_bytes())}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Parsed SVG Drawing Cache
+Memoizes svglib's svg2rlg() so each template is parsed once: an
+in-process cache keyed by path + mtime, backed by an on-disk pickle
+cache keyed by the SVG content hash
+"""
+
+import hashlib
+import io
+import os
+import pickle
+from pathlib import Path
+
+from render_cache import DEFAULT_CACHE_DIR
+from text_outlines import outline_for_render, outlines_enabled
+from tracing import span
+
+DRAWING_CACHE_DIR = DEFAULT_CACHE_DIR / "drawings"
+
+# (resolved path, mtime_ns, size, outlined) -> Drawing
+_memory_cache = {}
+
+
+def _parser_version():
+    import reportlab
+    import svglib
+
+    return f"svglib-{getattr(svglib, '__version__', '?')}-reportlab-{reportlab.Version}"
+
+
+def _content_key(svg_bytes):
+    digest = hashlib.sha256(svg_bytes)
+    digest.update(_parser_version().encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _disk_enabled():
+    return os.environ.get("BUSINESS_CARD_CACHE", "1") != "0"
+
+
+def load_drawing(svg_file_path, cache_dir=DRAWING_CACHE_DIR):
+    """
+    Return the svglib Drawing for an SVG file, parsing it at most once
+
+    The returned Drawing is shared between callers; treat it as read-only.
+    Editing the file changes its mtime/hash and invalidates both caches.
+    With BUSINESS_CARD_OUTLINE_TEXT=1 the text is parsed as outlines.
+    """
+    from svglib.svglib import svg2rlg
+
+    path = Path(svg_file_path).resolve()
+    stat = path.stat()
+    outline = outlines_enabled()
+    memory_key = (str(path), stat.st_mtime_ns, stat.st_size, outline)
+
+    drawing = _memory_cache.get(memory_key)
+    if drawing is not None:
+        return drawing
+
+    # Forget older versions of this file before adding the new one
+    for key in [key for key in _memory_cache if key[0] == str(path)]:
+        del _memory_cache[key]
+
+    with span("svg.read", file=path.name):
+        svg_bytes = path.read_bytes()
+    if outline:
+        svg_bytes = outline_for_render(svg_bytes.decode('utf-8')).encode('utf-8')
+    pickle_path = Path(cache_dir) / f"{_content_key(svg_bytes)}.pickle"
+
+    if _disk_enabled() and pickle_path.exists():
+        try:
+            with span("drawing.unpickle", file=path.name), open(pickle_path, 'rb') as f:
+                drawing = pickle.load(f)
+            os.utime(pickle_path)
+        except Exception:
+            drawing = None
+
+    if drawing is None:
+        with span("svglib.parse", file=path.name):
+            drawing = svg2rlg(io.BytesIO(svg_bytes) if outline else str(path))
+        if drawing is None:
+            raise ValueError(f"svglib could not parse {path}")
+        if _disk_enabled():
+            pickle_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = pickle_path.with_name(f".{pickle_path.name}.{os.getpid()}.tmp")
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(drawing, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, pickle_path)
+
+    _memory_cache[memory_key] = drawing
+    return drawing
+
+
+def parse_svg_text(svg_text):
+    """Parse SVG markup without caching, for one-off personalized cards"""
+    from svglib.svglib import svg2rlg
+
+    with span("svglib.parse", bytes=len(svg_text)):
+        drawing = svg2rlg(io.BytesIO(outline_for_render(svg_text).encode('utf-8')))
+    if drawing is None:
+        raise ValueError("svglib could not parse the SVG text")
+    return drawing
+
+
+def clear_memory_cache():
+    """Drop every in-process Drawing (the disk cache is left alone)"""
+    _memory_cache.clear()
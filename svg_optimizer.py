@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+"""
+Print-Profile SVG Optimizer
+Shrinks a card SVG before it is embedded in layouts: strips comments,
+animations and editor metadata, resolves CSS classes to attributes,
+collapses no-op groups and rounds coordinates to print precision.
+Guide layers (cut/bleed/safe-area lines) can be dropped for final output.
+Results are cached by content hash
+
+Usage:
+    python svg_optimizer.py business_card_print_ready.svg
+    python svg_optimizer.py business_card_print_ready.svg --drop-guides --output final.svg
+"""
+
+import argparse
+import hashlib
+import os
+import re
+import sys
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass
+from pathlib import Path
+
+from render_cache import DEFAULT_CACHE_DIR
+from tracing import span
+
+SVG_CACHE_DIR = DEFAULT_CACHE_DIR / "svg"
+OPTIMIZER_VERSION = 2
+
+SVG_NS = "http://www.w3.org/2000/svg"
+_EDITOR_NAMESPACES = (
+    "http://www.inkscape.org/namespaces/inkscape",
+    "http://sodipodi.sourceforge.net/DTD/sodipodi-0.dtd",
+    "http://ns.adobe.com/AdobeIllustrator/10.0/",
+    "http://www.bohemiancoding.com/sketch/ns",
+)
+_DROP_TAGS = {"animate", "animateTransform", "animateMotion", "animateColor", "set", "metadata"}
+_TEXT_TAGS = {"text", "tspan", "textPath", "style", "title", "desc"}
+
+# 0.001 user units is a micrometre on the mm-based card templates
+DEFAULT_PRECISION = 3
+GUIDE_CLASSES = {"cut-line", "bleed-area", "safe-area", "print-label"}
+GUIDE_IDS = {"print-guidelines"}
+
+# Attributes whose numbers are geometry and safe to round
+_NUMERIC_ATTRS = {
+    "x", "y", "x1", "y1", "x2", "y2", "cx", "cy", "r", "rx", "ry", "width", "height",
+    "d", "points", "transform", "viewBox", "stroke-width", "font-size", "dx", "dy",
+}
+_NUMBER_RE = re.compile(r'-?(?:\d+\.\d*|\.\d+)(?:[eE][-+]?\d+)?')
+_CLASS_SELECTOR_RE = re.compile(r'\.([\w-]+)')
+_COMBINATOR_RE = re.compile(r'\s*[\s>+~]\s*')
+_COMMENT_RE = re.compile(r'/\*.*?\*/', re.DOTALL)
+# Group attributes that change rendering as a whole and cannot be pushed down
+_GROUP_ONLY_ATTRS = {"id", "opacity", "clip-path", "mask", "filter", "style", "class"}
+
+# (content hash, options) -> OptimizedSVG
+_memory_cache = {}
+
+
+@dataclass(frozen=True)
+class OptimizedSVG:
+    text: str
+    original_bytes: int
+    optimized_bytes: int
+
+    @property
+    def saved_bytes(self):
+        return self.original_bytes - self.optimized_bytes
+
+    @property
+    def saved_ratio(self):
+        return self.saved_bytes / self.original_bytes if self.original_bytes else 0.0
+
+
+def _local(tag):
+    return tag.rsplit("}", 1)[-1] if isinstance(tag, str) else ""
+
+
+def _namespace(name):
+    return name[1:].split("}", 1)[0] if name.startswith("{") else ""
+
+
+def _css_blocks(style_text):
+    """Top-level (selector, body, source) blocks plus any text after the last one"""
+    blocks = []
+    depth = start = brace = 0
+    for index, char in enumerate(style_text):
+        if char == "{":
+            if depth == 0:
+                brace = index
+            depth += 1
+        elif char == "}" and depth:
+            depth -= 1
+            if depth == 0:
+                blocks.append((style_text[start:brace].strip(), style_text[brace + 1:index],
+                               style_text[start:index + 1].strip()))
+                start = index + 1
+    return blocks, style_text[start:].strip()
+
+
+def _subject_classes(selector):
+    """Classes required on the matched element by each comma-separated selector, or None
+    if some selector can match an element without a class (type, id, *, attribute)"""
+    required = set()
+    for part in selector.split(","):
+        compounds = _COMBINATOR_RE.split(part.strip())
+        classes = _CLASS_SELECTOR_RE.findall(compounds[-1]) if compounds else []
+        if not classes:
+            return None
+        required.update(classes)
+    return required
+
+
+def _parse_class_rules(style_texts, class_lists):
+    """
+    Rules that can become presentation attributes -> ({class: {prop: value}}, leftovers)
+
+    Only a rule whose whole selector is one class is inlined, and only when
+    no other rule mentions that class and every element carrying it can
+    lose its class attribute. Everything else stays verbatim in its
+    <style> (leftovers line up with style_texts). When a remaining rule
+    could match an element by something other than a class, nothing is
+    inlined: presentation attributes would lose to it where the class did not.
+    """
+    parsed = [_css_blocks(_COMMENT_RE.sub("", text)) for text in style_texts]
+    candidates = {}
+    protected = set()
+    inline_all = True
+    for blocks, trailing in parsed:
+        if trailing:
+            inline_all = False  # e.g. a trailing @import
+        for selector, body, _ in blocks:
+            match = _CLASS_SELECTOR_RE.fullmatch(selector)
+            if match and "{" not in body and "!important" not in body:
+                candidates.setdefault(match.group(1), []).append(body)
+            elif selector.startswith("@font-face"):
+                continue
+            else:
+                subject = None if selector.startswith("@") else _subject_classes(selector)
+                if subject is None:
+                    inline_all = False
+                else:
+                    protected.update(subject)
+                protected.update(_CLASS_SELECTOR_RE.findall(selector))
+
+    inlinable = set(candidates) - protected if inline_all else set()
+    # An element whose class attribute has to stay keeps all of its classes' rules in CSS
+    changed = True
+    while changed:
+        changed = False
+        for classes in class_lists:
+            if classes and not classes <= inlinable and classes & inlinable:
+                inlinable -= classes
+                changed = True
+
+    rules = {}
+    for name in inlinable:
+        declarations = rules.setdefault(name, {})
+        for body in candidates[name]:
+            for declaration in body.split(";"):
+                if ":" in declaration:
+                    prop, value = declaration.split(":", 1)
+                    declarations[prop.strip()] = value.strip()
+
+    leftovers = []
+    for blocks, trailing in parsed:
+        kept = [source for selector, _, source in blocks
+                if not (_CLASS_SELECTOR_RE.fullmatch(selector) and selector[1:] in inlinable)]
+        leftovers.append("\n".join(kept + ([trailing] if trailing else [])))
+    return rules, leftovers
+
+
+def _round_numbers(value, precision):
+    def fix(match):
+        rounded = f"{float(match.group(0)):.{precision}f}".rstrip("0").rstrip(".")
+        return "0" if rounded in ("", "-0") else rounded
+    return _NUMBER_RE.sub(fix, value)
+
+
+def _inline_props(element):
+    style = element.get("style", "")
+    return {part.split(":", 1)[0].strip() for part in style.split(";") if ":" in part}
+
+
+def _walk(parent, visit):
+    """Depth-first, children before parent, tolerant of visit() editing the tree"""
+    for child in list(parent):
+        _walk(child, visit)
+        visit(parent, child)
+
+
+def optimize_svg_text(svg_content, drop_guides=False, precision=DEFAULT_PRECISION):
+    """
+    Run the print profile over SVG markup and return the optimized markup
+
+    Rendering is unchanged except that animations are frozen at their
+    base state and, with drop_guides, the cut/bleed/safe-area layer is
+    removed.
+    """
+    ET.register_namespace("", SVG_NS)
+    root = ET.fromstring(svg_content)  # comments and processing instructions are dropped here
+
+    # Single-class rules from every <style>; a <style> goes once nothing is left in it
+    styles = [(parent, child) for parent in root.iter() for child in parent if _local(child.tag) == "style"]
+    class_lists = [set(element.get("class", "").split()) for element in root.iter()]
+    rules, leftovers = _parse_class_rules([child.text or "" for _, child in styles], class_lists)
+    for (parent, child), leftover in zip(styles, leftovers):
+        if leftover:
+            child.text = leftover
+        else:
+            parent.remove(child)
+
+    def visit(parent, element):
+        tag = _local(element.tag)
+        classes = element.get("class", "").split()
+        if (tag in _DROP_TAGS or _namespace(element.tag) in _EDITOR_NAMESPACES
+                or (drop_guides and (element.get("id") in GUIDE_IDS or GUIDE_CLASSES & set(classes)))):
+            parent.remove(element)
+            return
+
+        for name in list(element.attrib):
+            if _namespace(name) in _EDITOR_NAMESPACES:
+                del element.attrib[name]
+
+        # Class declarations beat presentation attributes but lose to style=""
+        if classes and all(name in rules for name in classes):
+            inline = _inline_props(element)
+            for name in classes:
+                for prop, value in rules[name].items():
+                    if prop not in inline:
+                        element.set(prop, value)
+            del element.attrib["class"]
+
+        for name, value in element.attrib.items():
+            if name in _NUMERIC_ATTRS:
+                element.set(name, _round_numbers(value, precision))
+
+        if tag == "g":
+            _collapse_group(parent, element)
+        elif tag == "defs" and not len(element):
+            parent.remove(element)
+
+    _walk(root, visit)
+    for name, value in root.attrib.items():
+        if name in _NUMERIC_ATTRS:
+            root.set(name, _round_numbers(value, precision))
+
+    _strip_whitespace(root)
+    return ET.tostring(root, encoding="unicode")
+
+
+def _collapse_group(parent, group):
+    """Drop empty groups and unwrap groups that do not change rendering"""
+    children = list(group)
+    index = list(parent).index(group)
+    if not children:
+        parent.remove(group)
+        return
+
+    attrs = dict(group.attrib)
+    if not attrs:
+        parent.remove(group)
+        for offset, child in enumerate(children):
+            parent.insert(index + offset, child)
+        return
+
+    # A single child can take over the group's inherited attributes
+    if len(children) == 1 and not (_GROUP_ONLY_ATTRS & set(attrs)):
+        child = children[0]
+        if "transform" in attrs and "transform" in child.attrib:
+            return
+        for name, value in attrs.items():
+            if name == "transform" or name not in child.attrib:
+                child.set(name, value)
+        parent.remove(group)
+        parent.insert(index, child)
+
+
+def _strip_whitespace(element):
+    """Remove indentation text outside text elements"""
+    if _local(element.tag) in _TEXT_TAGS:
+        return
+    if element.text is not None and not element.text.strip():
+        element.text = None
+    for child in element:
+        if child.tail is not None and not child.tail.strip():
+            child.tail = None
+        _strip_whitespace(child)
+
+
+def _disk_enabled():
+    return os.environ.get("BUSINESS_CARD_CACHE", "1") != "0"
+
+
+def optimize_svg(svg_content, drop_guides=False, precision=DEFAULT_PRECISION, cache_dir=SVG_CACHE_DIR):
+    """
+    Cached optimize_svg_text(): returns an OptimizedSVG with byte counts
+
+    The cache key is the SHA-256 of the input plus the options, so any
+    edit to the source SVG produces a fresh result.
+    """
+    raw = svg_content.encode('utf-8')
+    meta = f"v{OPTIMIZER_VERSION}:guides={int(drop_guides)}:p={precision}".encode('utf-8')
+    key = hashlib.sha256(raw + b"\0" + meta).hexdigest()
+
+    result = _memory_cache.get(key)
+    if result is not None:
+        return result
+
+    cache_path = Path(cache_dir) / f"{key}.svg"
+    text = None
+    if _disk_enabled() and cache_path.exists():
+        try:
+            text = cache_path.read_text(encoding='utf-8')
+            os.utime(cache_path)
+        except OSError:
+            text = None
+
+    if text is None:
+        with span("svg.optimize", bytes=len(raw)):
+            text = optimize_svg_text(svg_content, drop_guides, precision)
+        if _disk_enabled():
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = cache_path.with_name(f".{cache_path.name}.{os.getpid()}.tmp")
+            tmp_path.write_text(text, encoding='utf-8')
+            os.replace(tmp_path, cache_path)
+
+    result = OptimizedSVG(text, len(raw), len(text.encode('utf-8')))
+    _memory_cache[key] = result
+    return result
+
+
+def print_profile():
+    """Optimizer settings the layout builders use, from the environment
+
+    BUSINESS_CARD_SVG_OPTIMIZE=0 turns the stage off and
+    BUSINESS_CARD_DROP_GUIDES=1 removes guide layers for final output.
+    Returns None when disabled, else the optimize_svg() keyword arguments.
+    """
+    if os.environ.get("BUSINESS_CARD_SVG_OPTIMIZE", "1") == "0":
+        return None
+    return {"drop_guides": os.environ.get("BUSINESS_CARD_DROP_GUIDES", "0") == "1"}
+
+
+def optimize_for_print(svg_content):
+    """The SVG the layout builders should embed under the current print profile
+
+    Text is converted to outlines afterwards when BUSINESS_CARD_OUTLINE_TEXT=1.
+    """
+    from text_outlines import outline_for_render
+
+    profile = print_profile()
+    if profile is not None:
+        svg_content = optimize_svg(svg_content, **profile).text
+    return outline_for_render(svg_content)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Optimize a card SVG for printing")
+    parser.add_argument("svg", help="input SVG file")
+    parser.add_argument("--output", default=None, help="write the optimized SVG here")
+    parser.add_argument("--drop-guides", action="store_true", help="remove cut/bleed/safe-area guides")
+    parser.add_argument("--precision", type=int, default=DEFAULT_PRECISION, help="decimal places to keep")
+    args = parser.parse_args()
+
+    try:
+        svg_content = Path(args.svg).read_text(encoding='utf-8')
+        result = optimize_svg(svg_content, args.drop_guides, args.precision)
+    except (OSError, ET.ParseError) as e:
+        print(f"Error: {e}")
+        return 1
+
+    if args.output:
+        Path(args.output).write_text(result.text, encoding='utf-8')
+        print(f"✓ Optimized SVG: {args.output}")
+    print(f"{args.svg}: {result.original_bytes} → {result.optimized_bytes} bytes "
+          f"({result.saved_bytes} saved, {result.saved_ratio:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
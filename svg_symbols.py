@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+SVG Symbol Helpers for Multi-Card HTML Layouts
+Define a card SVG once as a <symbol> and place every grid cell with a
+<use> reference, so the HTML stays the same size however many cards
+are on the sheet
+"""
+
+import os
+import re
+
+from raster_cache import get_raster_cache, raster_layout_dpi
+from svg_optimizer import optimize_for_print
+
+# Set BUSINESS_CARD_SVG_DEDUP=1 to make the layout builders dedup by default
+DEFAULT_DEDUP = os.environ.get("BUSINESS_CARD_SVG_DEDUP", "0") == "1"
+
+_XML_DECL_RE = re.compile(r'<\?xml[^>]*\?>\s*')
+_SVG_OPEN_RE = re.compile(r'<svg\b([^>]*)>', re.DOTALL)
+_ATTR_RE = re.compile(r'([\w:-]+)\s*=\s*"([^"]*)"')
+_ID_RE = re.compile(r'\bid="([^"]+)"')
+
+
+def _namespace_ids(body, prefix):
+    """Prefix every id and #reference so several symbols can share a page"""
+    ids = set(_ID_RE.findall(body))
+    if not ids:
+        return body
+
+    def rename(match):
+        return f'{match.group(1)}{prefix}-{match.group(2)}{match.group(3)}'
+
+    alternation = "|".join(re.escape(i) for i in sorted(ids, key=len, reverse=True))
+    body = re.sub(rf'(\bid=")({alternation})(")', rename, body)
+    body = re.sub(rf'(url\(#)({alternation})(\))', rename, body)
+    body = re.sub(rf'(href="#)({alternation})(")', rename, body)
+    return body
+
+
+def split_svg(svg_content):
+    """Return (attributes dict, inner markup) of the root <svg> element"""
+    svg_content = _XML_DECL_RE.sub('', svg_content)
+    match = _SVG_OPEN_RE.search(svg_content)
+    if match is None:
+        raise ValueError("No <svg> root element found")
+    attrs = dict(_ATTR_RE.findall(match.group(1)))
+    end = svg_content.rindex('</svg>')
+    return attrs, svg_content[match.end():end]
+
+
+def _view_box(attrs):
+    if 'viewBox' in attrs:
+        return attrs['viewBox']
+    width = re.sub(r'[a-z%]+$', '', attrs.get('width', '100'))
+    height = re.sub(r'[a-z%]+$', '', attrs.get('height', '100'))
+    return f"0 0 {width} {height}"
+
+
+def svg_symbol_defs(svg_content, symbol_id="card"):
+    """Hidden sprite that defines the card once as <symbol id=symbol_id>"""
+    attrs, body = split_svg(svg_content)
+    body = _namespace_ids(body, symbol_id)
+    return (
+        '<svg xmlns="http://www.w3.org/2000/svg" width="0" height="0" '
+        'style="position:absolute" aria-hidden="true">\n'
+        f'<symbol id="{symbol_id}" viewBox="{_view_box(attrs)}">{body}</symbol>\n'
+        '</svg>'
+    )
+
+
+def svg_symbol_use(svg_content, symbol_id="card"):
+    """Lightweight <svg><use></svg> that draws one copy of the symbol"""
+    attrs, _ = split_svg(svg_content)
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="{_view_box(attrs)}">'
+        f'<use href="#{symbol_id}"/></svg>'
+    )
+
+
+def raster_card_markup(svg_content, dpi, symbol_id="card"):
+    """(defs, cell) drawing the card as one cached bitmap shared by every cell"""
+    uri = get_raster_cache().data_uri(svg_content, dpi)
+    defs = (f'<style>.raster-{symbol_id} {{ width: 100%; height: 100%; '
+            f'background: url({uri}) center / contain no-repeat; }}</style>')
+    return defs, f'<div class="raster-{symbol_id}"></div>'
+
+
+def card_markup(svg_content, dedup=None, symbol_id="card"):
+    """Return (defs, cell) for the layout builders
+
+    The card first goes through the print-profile optimizer. With dedup
+    the defs hold the single <symbol> and every cell is a tiny <use>;
+    without it defs is empty and every cell is the full SVG. Setting
+    BUSINESS_CARD_RASTER_DPI swaps the vector card for a cached bitmap.
+    """
+    svg_content = optimize_for_print(svg_content)
+    dpi = raster_layout_dpi()
+    if dpi:
+        return raster_card_markup(svg_content, dpi, symbol_id)
+    if dedup is None:
+        dedup = DEFAULT_DEDUP
+    if not dedup:
+        return "", svg_content
+    return svg_symbol_defs(svg_content, symbol_id), svg_symbol_use(svg_content, symbol_id)
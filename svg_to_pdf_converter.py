@@ -4,25 +4,39 @@ SVG to PDF Converter for Business Cards
 Converts business_card_print_ready.svg to PDF with proper A4 layout
 """
 
-import os
 import sys
 from pathlib import Path
 
 try:
-    from svglib.svglib import renderSVG
     from reportlab.pdfgen import canvas
     from reportlab.lib.pagesizes import A4
     from reportlab.lib.units import mm
-    from reportlab.graphics import renderPDF
-    from reportlab.graphics.shapes import Drawing
-    import tempfile
+    from imposition import impose
+    from raster_cache import PRINT_DPI, get_raster_cache
+    from tracing import span, traced
 except ImportError as e:
     print(f"Missing required library: {e}")
     print("Please install required packages:")
-    print("pip install svglib reportlab")
+    print("pip install cairosvg reportlab")
     sys.exit(1)
 
-def svg_to_pdf_a4(svg_file_path, output_pdf_path, cards_per_page=10):
+# Print resolution for the rasterized card
+DEFAULT_DPI = PRINT_DPI
+
+def rasterize_card(svg_file_path, dpi=DEFAULT_DPI):
+    """
+    Rasterized card as an ImageReader, from the shared raster cache
+    
+    ReportLab embeds an ImageReader as a single image XObject and every
+    later drawImage of the same reader only references it, so one buffer
+    serves every card on every page without temp files. The PNG itself
+    is cached per (SVG content, DPI), so reruns skip cairosvg entirely.
+    """
+    return get_raster_cache().image_reader(svg_file_path, dpi)
+
+@traced("pdf.raster_sheet")
+def svg_to_pdf_a4(svg_file_path, output_pdf_path, cards_per_page=10, card_image=None, dpi=DEFAULT_DPI,
+                  pages=1):
     """
     Convert SVG business card to PDF with multiple cards per A4 page
     
@@ -30,6 +44,9 @@ def svg_to_pdf_a4(svg_file_path, output_pdf_path, cards_per_page=10):
         svg_file_path (str): Path to the SVG file
         output_pdf_path (str): Path for the output PDF
         cards_per_page (int): Number of business cards to fit per page
+        card_image (ImageReader): Pre-rasterized card from rasterize_card()
+        dpi (int): Raster resolution when card_image is not given
+        pages (int): Number of identical sheets to write
     """
     
     # A4 dimensions in points (72 points = 1 inch)
@@ -41,100 +58,81 @@ def svg_to_pdf_a4(svg_file_path, output_pdf_path, cards_per_page=10):
     card_width = card_width_mm * mm
     card_height = card_height_mm * mm
     
-    # Convert SVG to PNG first for better handling
+    # Rasterize once, in memory
     print(f"Converting {svg_file_path} to PDF...")
-    
-    # Read SVG content
-    with open(svg_file_path, 'r', encoding='utf-8') as f:
-        svg_content = f.read()
-    
-    # Convert SVG to PNG using cairosvg
-    png_data = cairosvg.svg2png(bytestring=svg_content.encode('utf-8'))
+    if card_image is None:
+        card_image = rasterize_card(svg_file_path, dpi)
     
     # Create PDF
     c = canvas.Canvas(output_pdf_path, pagesize=A4)
     
-    # Calculate layout for multiple cards per page
+    # Densest arrangement of the card on the sheet (cards may be rotated)
     margin = 10 * mm
-    usable_width = page_width - 2 * margin
-    usable_height = page_height - 2 * margin
-    
-    # Calculate how many cards fit horizontally and vertically
-    cards_horizontal = int(usable_width // card_width)
-    cards_vertical = int(usable_height // card_height)
-    cards_per_page_actual = cards_horizontal * cards_vertical
+    imposition = impose(card_width_mm, card_height_mm, "A4", margin=10)
+    positions = imposition.points()[:cards_per_page]
+    cards_per_page_actual = len(positions)
     
     print(f"A4 page size: {page_width/mm:.1f}mm x {page_height/mm:.1f}mm")
     print(f"Card size: {card_width_mm}mm x {card_height_mm}mm")
-    print(f"Cards per page: {cards_horizontal} x {cards_vertical} = {cards_per_page_actual}")
-    
-    # Load the PNG image
-    img = Image.open(io.BytesIO(png_data))
-    
-    # Calculate spacing
-    h_spacing = usable_width / cards_horizontal
-    v_spacing = usable_height / cards_vertical
-    
-    # Add title
-    c.setFont("Helvetica-Bold", 12)
-    c.drawString(margin, page_height - margin + 5*mm, f"Business Cards - {cards_per_page_actual} per page")
-    
-    # Place cards on the page
-    for row in range(cards_vertical):
-        for col in range(cards_horizontal):
-            x = margin + col * h_spacing + (h_spacing - card_width) / 2
-            y = page_height - margin - (row + 1) * v_spacing + (v_spacing - card_height) / 2
-            
-            # Save PNG to temporary file for reportlab
-            temp_png_path = "temp_card.png"
-            with open(temp_png_path, 'wb') as temp_file:
-                temp_file.write(png_data)
-            
-            # Draw the image
-            c.drawImage(temp_png_path, x, y, width=card_width, height=card_height)
-            
+    print(f"Cards per page: {imposition.describe()} = {cards_per_page_actual}")
+    
+    for page in range(pages):
+        # Add title
+        c.setFont("Helvetica-Bold", 12)
+        c.drawString(margin, page_height - margin + 5*mm, f"Business Cards - {cards_per_page_actual} per page")
+    
+        # Place cards on the page, stopping once cards_per_page are placed
+        for x, y, width, height, rotated in positions:
+            # Draw the shared image (embedded once, referenced per card)
+            c.saveState()
+            if rotated:
+                # Quarter turn counter-clockwise into the slot
+                c.translate(x + width, y)
+                c.rotate(90)
+                c.drawImage(card_image, 0, 0, width=card_width, height=card_height)
+            else:
+                c.drawImage(card_image, x, y, width=card_width, height=card_height)
+            c.restoreState()
+        
             # Add cut lines (optional)
             c.setStrokeColorRGB(0.8, 0.8, 0.8)
             c.setLineWidth(0.5)
             c.setDash([2, 2])
-            c.rect(x, y, card_width, card_height)
+            c.rect(x, y, width, height)
             c.setDash([])  # Reset dash
     
-    # Add instructions at the bottom
-    c.setFont("Helvetica", 8)
-    instructions = [
-        "Printing Instructions:",
-        "1. Print on 250-300gsm cardstock for best results",
-        "2. Use high-quality/photo printing settings",
-        "3. Cut along the dotted lines",
-        "4. Each card measures 85mm x 55mm (standard business card size)"
-    ]
+        # Add instructions at the bottom
+        c.setFont("Helvetica", 8)
+        instructions = [
+            "Printing Instructions:",
+            "1. Print on 250-300gsm cardstock for best results",
+            "2. Use high-quality/photo printing settings",
+            "3. Cut along the dotted lines",
+            "4. Each card measures 85mm x 55mm (standard business card size)"
+        ]
     
-    y_pos = margin - 5*mm
-    for instruction in instructions:
-        c.drawString(margin, y_pos, instruction)
-        y_pos -= 3*mm
+        y_pos = margin - 5*mm
+        for instruction in instructions:
+            c.drawString(margin, y_pos, instruction)
+            y_pos -= 3*mm
     
-    # Clean up temp file
-    if os.path.exists(temp_png_path):
-        os.remove(temp_png_path)
+        c.showPage()
     
     # Finalize PDF
-    c.save()
+    with span("pdf.save"):
+        c.save()
     print(f"PDF saved successfully: {output_pdf_path}")
 
-def create_single_card_pdf(svg_file_path, output_pdf_path):
+@traced("pdf.raster_single")
+def create_single_card_pdf(svg_file_path, output_pdf_path, card_image=None, dpi=DEFAULT_DPI):
     """
     Create a PDF with a single business card centered on A4 page
     """
     page_width, page_height = A4
     
-    # Read SVG content
-    with open(svg_file_path, 'r', encoding='utf-8') as f:
-        svg_content = f.read()
-    
-    # Convert SVG to PNG
-    png_data = cairosvg.svg2png(bytestring=svg_content.encode('utf-8'))
+    # Reuse the caller's raster buffer when given
+    if card_image is None:
+        card_image = rasterize_card(svg_file_path, dpi)
     
     # Create PDF
     c = canvas.Canvas(output_pdf_path, pagesize=A4)
@@ -153,13 +151,8 @@ def create_single_card_pdf(svg_file_path, output_pdf_path):
     title_width = c.stringWidth(title_text, "Helvetica-Bold", 14)
     c.drawString((page_width - title_width) / 2, y + card_height + 20*mm, title_text)
     
-    # Save PNG temporarily
-    temp_png_path = "temp_single_card.png"
-    with open(temp_png_path, 'wb') as temp_file:
-        temp_file.write(png_data)
-    
     # Draw the card
-    c.drawImage(temp_png_path, x, y, width=card_width, height=card_height)
+    c.drawImage(card_image, x, y, width=card_width, height=card_height)
     
     # Add cut lines
     c.setStrokeColorRGB(0.5, 0.5, 0.5)
@@ -176,7 +169,7 @@ def create_single_card_pdf(svg_file_path, output_pdf_path):
     c.line(x, y - 5*mm, x + card_width, y - 5*mm)
     c.line(x, y - 3*mm, x, y - 7*mm)
     c.line(x + card_width, y - 3*mm, x + card_width, y - 7*mm)
-    c.drawCentredText(x + card_width/2, y - 8*mm, "85mm")
+    c.drawCentredString(x + card_width/2, y - 8*mm, "85mm")
     
     # Vertical measurement
     c.line(x - 5*mm, y, x - 5*mm, y + card_height)
@@ -187,7 +180,7 @@ def create_single_card_pdf(svg_file_path, output_pdf_path):
     c.saveState()
     c.translate(x - 10*mm, y + card_height/2)
     c.rotate(90)
-    c.drawCentredText(0, 0, "55mm")
+    c.drawCentredString(0, 0, "55mm")
     c.restoreState()
     
     # Add instructions
@@ -210,11 +203,8 @@ def create_single_card_pdf(svg_file_path, output_pdf_path):
             c.drawString(x, y_pos, instruction)
         y_pos -= 4*mm
     
-    # Clean up
-    if os.path.exists(temp_png_path):
-        os.remove(temp_png_path)
-    
-    c.save()
+    with span("pdf.save"):
+        c.save()
     print(f"Single card PDF saved: {output_pdf_path}")
 
 def main():
@@ -229,15 +219,25 @@ def main():
     # Create both versions
     print("Creating business card PDFs...\n")
     
+    # Rasterize once and share the buffer between both PDFs; cairosvg is only needed on a cache miss
+    try:
+        card_image = rasterize_card(svg_file)
+    except (ImportError, OSError) as e:
+        # cairosvg raises OSError when the Cairo C library itself is missing
+        print(f"Missing required library: {str(e).splitlines()[0]}")
+        print("Please install required packages:")
+        print("pip install cairosvg reportlab")
+        return
+    
     # Multiple cards per page
     multiple_pdf = script_dir / "business_cards_multiple_A4.pdf"
-    svg_to_pdf_a4(str(svg_file), str(multiple_pdf))
+    svg_to_pdf_a4(str(svg_file), str(multiple_pdf), card_image=card_image)
     
     print()
     
     # Single card centered
     single_pdf = script_dir / "business_card_single_A4.pdf"
-    create_single_card_pdf(str(svg_file), str(single_pdf))
+    create_single_card_pdf(str(svg_file), str(single_pdf), card_image=card_image)
     
     print(f"\nConversion complete!")
     print(f"Files created:")
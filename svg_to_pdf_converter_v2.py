@@ -4,12 +4,15 @@ SVG to PDF Converter for Business Cards
 Converts business_card_print_ready.svg to PDF with proper A4 layout using svglib
 """
 
+import argparse
 import os
 import sys
 from pathlib import Path
 
 try:
-    from svglib.svglib import renderSVG
+    from imposition import impose, sheet_size
+    from svg_drawing_cache import load_drawing
+    from tracing import add_trace_argument, configure, span, traced
     from reportlab.pdfgen import canvas
     from reportlab.lib.pagesizes import A4
     from reportlab.lib.units import mm
@@ -23,6 +26,23 @@ except ImportError as e:
     print("pip install svglib reportlab")
     sys.exit(1)
 
+CARD_FORM_NAME = "business_card"
+
+def draw_card_form(c, drawing, form_name=CARD_FORM_NAME):
+    """
+    Capture the drawing once as a PDF form XObject on this canvas
+    
+    Every later doForm(form_name) reuses the same content stream instead
+    of writing the full vector card again for each placement.
+    """
+    if not c.hasForm(form_name):
+        with span("pdf.card_form", form=form_name):
+            c.beginForm(form_name, 0, 0, drawing.width, drawing.height)
+            renderPDF.draw(drawing, c, 0, 0)
+            c.endForm()
+    return form_name
+
+@traced("pdf.multiple_cards")
 def create_business_card_pdf(svg_file_path, output_pdf_path):
     """
     Convert SVG business card to PDF with multiple cards per A4 page
@@ -41,62 +61,29 @@ def create_business_card_pdf(svg_file_path, output_pdf_path):
     print(f"Card size: {card_width_mm}mm x {card_height_mm}mm")
     
     try:
-        # Load SVG and convert to ReportLab drawing
-        drawing = renderSVG.renderSVG(svg_file_path)
+        # Load SVG as a ReportLab drawing (parsed once, then cached)
+        drawing = load_drawing(svg_file_path)
         
         # Create PDF
         c = canvas.Canvas(output_pdf_path, pagesize=A4)
+        card_form = draw_card_form(c, drawing)
         
         # Calculate layout
         margin = 10 * mm
-        usable_width = page_width - 2 * margin
-        usable_height = page_height - 2 * margin
-        
-        # Calculate how many cards fit
-        cards_horizontal = int(usable_width // card_width)
-        cards_vertical = int(usable_height // card_height)
-        cards_per_page = cards_horizontal * cards_vertical
+        positions = card_grid("A4", card_width_mm, card_height_mm, margin_mm=10)
         
-        print(f"Cards per page: {cards_horizontal} x {cards_vertical} = {cards_per_page}")
-        
-        # Calculate spacing
-        h_spacing = usable_width / cards_horizontal if cards_horizontal > 0 else usable_width
-        v_spacing = usable_height / cards_vertical if cards_vertical > 0 else usable_height
+        print(f"Cards per page: {len(positions)}")
         
         # Add title
         c.setFont("Helvetica-Bold", 12)
         c.drawString(margin, page_height - margin/2, f"Business Cards - Print Template")
         
         # Scale factor for the drawing
-        if drawing.width > 0 and drawing.height > 0:
-            scale_x = card_width / drawing.width
-            scale_y = card_height / drawing.height
-            scale = min(scale_x, scale_y)
-        else:
-            scale = 1
+        scale = _fit_scale(drawing, card_width, card_height)
         
-        # Place cards on the page
-        for row in range(cards_vertical):
-            for col in range(cards_horizontal):
-                x = margin + col * h_spacing + (h_spacing - card_width) / 2
-                y = page_height - margin - (row + 1) * v_spacing + (v_spacing - card_height) / 2
-                
-                # Save state and apply transformations
-                c.saveState()
-                c.translate(x, y)
-                c.scale(scale, scale)
-                
-                # Render the SVG drawing
-                renderPDF.draw(drawing, c, 0, 0)
-                
-                c.restoreState()
-                
-                # Add cut lines
-                c.setStrokeColorRGB(0.8, 0.8, 0.8)
-                c.setLineWidth(0.5)
-                c.setDash([2, 2])
-                c.rect(x, y, card_width, card_height)
-                c.setDash([])
+        # Place the shared card form in every slot, with cut lines
+        for x, y, width, height, rotated in positions:
+            _place_card(c, card_form, scale, x, y, width, height, rotated)
         
         # Add printing instructions
         c.setFont("Helvetica", 8)
@@ -122,6 +109,138 @@ def create_business_card_pdf(svg_file_path, output_pdf_path):
         print(f"Error converting SVG to PDF: {e}")
         return False
 
+def card_grid(sheet="A4", card_width_mm=85, card_height_mm=55, margin_mm=10):
+    """
+    Card slots (x, y, width, height, rotated) in points for one sheet
+    
+    Uses the imposition solver, so cards are turned 90° wherever that
+    fits more of them on the sheet; width/height are the slot footprint.
+    """
+    return impose(card_width_mm, card_height_mm, sheet, margin=margin_mm).points()
+
+def _fit_scale(drawing, card_width, card_height):
+    if drawing.width > 0 and drawing.height > 0:
+        return min(card_width / drawing.width, card_height / drawing.height)
+    return 1
+
+def _place_card(c, form_name, scale, x, y, width, height, rotated=False):
+    c.saveState()
+    if rotated:
+        # Turn the card a quarter counter-clockwise into its slot
+        c.translate(x + width, y)
+        c.rotate(90)
+    else:
+        c.translate(x, y)
+    c.scale(scale, scale)
+    c.doForm(form_name)
+    c.restoreState()
+    
+    # Cut lines
+    c.setStrokeColorRGB(0.8, 0.8, 0.8)
+    c.setLineWidth(0.5)
+    c.setDash([2, 2])
+    c.rect(x, y, width, height)
+    c.setDash([])
+
+@traced("pdf.card_job")
+def create_card_job_pdf(cards, output_pdf_path, total_cards=None, cards_per_page=None, first_page=1,
+                        sheet="A4"):
+    """
+    Stream any number of cards onto as many sheets as needed
+    
+    cards is either one SVG path (repeated total_cards times) or an
+    iterable of SVG paths / svglib Drawings, e.g. a generator yielding
+    personalized cards. Each sheet is emitted with showPage() as soon as
+    it is full and the iterable is consumed lazily, so no Python-side
+    state grows with the job. Every distinct SVG path becomes one form
+    XObject; for a single repeated template the whole filled sheet is a
+    form too, so each extra page costs one doForm call in the PDF.
+    
+    first_page numbers the sheet titles when this PDF is one chunk of a
+    larger job; sheet is any paper size known to the imposition solver.
+    Returns the number of pages written.
+    """
+    card_width = 85 * mm
+    card_height = 55 * mm
+    positions = card_grid(sheet)
+    if cards_per_page:
+        positions = positions[:cards_per_page]
+    if not positions:
+        raise ValueError("No card fits on the page")
+    
+    page_width, page_height = (size * mm for size in sheet_size(sheet))
+    c = canvas.Canvas(str(output_pdf_path), pagesize=(page_width, page_height))
+    
+    def start_sheet(number):
+        c.setFont("Helvetica-Bold", 12)
+        c.drawString(10 * mm, page_height - 5 * mm, f"Business Cards - Sheet {first_page + number - 1}")
+    
+    if isinstance(cards, (str, Path)):
+        if total_cards is None:
+            raise ValueError("total_cards is required when cards is a single SVG path")
+        drawing = load_drawing(cards)
+        card_form = draw_card_form(c, drawing)
+        scale = _fit_scale(drawing, card_width, card_height)
+        
+        full_pages, remainder = divmod(total_cards, len(positions))
+        if full_pages:
+            c.beginForm("full_sheet")
+            for slot in positions:
+                _place_card(c, card_form, scale, *slot)
+            c.endForm()
+        for page in range(full_pages):
+            start_sheet(page + 1)
+            c.doForm("full_sheet")
+            c.showPage()
+        if remainder:
+            start_sheet(full_pages + 1)
+            for slot in positions[:remainder]:
+                _place_card(c, card_form, scale, *slot)
+            c.showPage()
+        with span("pdf.save"):
+            c.save()
+        return full_pages + (1 if remainder else 0)
+    
+    # SVG path -> (form name, scale); one-off Drawings get a fresh form
+    path_forms = {}
+    form_count = 0
+    pages = 0
+    slot = 0
+    
+    for card in cards:
+        if isinstance(card, (str, Path)):
+            key = str(card)
+            if key not in path_forms:
+                drawing = load_drawing(key)
+                form_count += 1
+                path_forms[key] = (draw_card_form(c, drawing, f"card_{form_count}"),
+                                   _fit_scale(drawing, card_width, card_height))
+            form_name, scale = path_forms[key]
+        else:
+            form_count += 1
+            form_name = draw_card_form(c, card, f"card_{form_count}")
+            scale = _fit_scale(card, card_width, card_height)
+        
+        if slot == 0:
+            start_sheet(pages + 1)
+        
+        _place_card(c, form_name, scale, *positions[slot])
+        
+        slot += 1
+        if slot == len(positions):
+            c.showPage()
+            pages += 1
+            slot = 0
+    
+    if slot:
+        c.showPage()
+        pages += 1
+    
+    with span("pdf.save"):
+        c.save()
+    return pages
+
+@traced("pdf.single_card")
 def create_single_card_pdf(svg_file_path, output_pdf_path):
     """
     Create a PDF with a single business card centered on A4 page
@@ -132,10 +251,11 @@ def create_single_card_pdf(svg_file_path, output_pdf_path):
     
     try:
         # Load SVG
-        drawing = renderSVG.renderSVG(svg_file_path)
+        drawing = load_drawing(svg_file_path)
         
         # Create PDF
         c = canvas.Canvas(output_pdf_path, pagesize=A4)
+        card_form = draw_card_form(c, drawing)
         
         # Business card dimensions
         card_width = 85 * mm
@@ -152,18 +272,13 @@ def create_single_card_pdf(svg_file_path, output_pdf_path):
         c.drawString((page_width - title_width) / 2, y + card_height + 20*mm, title_text)
         
         # Calculate scale
-        if drawing.width > 0 and drawing.height > 0:
-            scale_x = card_width / drawing.width
-            scale_y = card_height / drawing.height
-            scale = min(scale_x, scale_y)
-        else:
-            scale = 1
+        scale = _fit_scale(drawing, card_width, card_height)
         
         # Draw the card
         c.saveState()
         c.translate(x, y)
         c.scale(scale, scale)
-        renderPDF.draw(drawing, c, 0, 0)
+        c.doForm(card_form)
         c.restoreState()
         
         # Add cut lines
@@ -181,7 +296,7 @@ def create_single_card_pdf(svg_file_path, output_pdf_path):
         c.line(x, y - 5*mm, x + card_width, y - 5*mm)
         c.line(x, y - 3*mm, x, y - 7*mm)
         c.line(x + card_width, y - 3*mm, x + card_width, y - 7*mm)
-        c.drawCentredText(x + card_width/2, y - 8*mm, "85mm")
+        c.drawCentredString(x + card_width/2, y - 8*mm, "85mm")
         
         # Vertical measurement
         c.line(x - 5*mm, y, x - 5*mm, y + card_height)
@@ -192,7 +307,7 @@ def create_single_card_pdf(svg_file_path, output_pdf_path):
         c.saveState()
         c.translate(x - 10*mm, y + card_height/2)
         c.rotate(90)
-        c.drawCentredText(0, 0, "55mm")
+        c.drawCentredString(0, 0, "55mm")
         c.restoreState()
         
         # Add instructions
@@ -289,6 +404,15 @@ def create_simple_pdf_fallback(svg_file_path, output_pdf_path):
     print(f"Fallback PDF created: {output_pdf_path}")
 
 def main():
+    parser = argparse.ArgumentParser(description="Convert the business card SVG to print-ready PDFs")
+    parser.add_argument("--cards", type=int, default=None,
+                        help="job mode: lay out this many cards over as many sheets as needed")
+    parser.add_argument("--output", default=None, help="output PDF for job mode")
+    parser.add_argument("--sheet", default="A4", help="paper for job mode: A4, Letter, A3 or SRA3")
+    add_trace_argument(parser)
+    args = parser.parse_args()
+    configure(args.trace)
+    
     # File paths
     script_dir = Path(__file__).parent
     svg_file = script_dir / "business_card_print_ready.svg"
@@ -297,6 +421,13 @@ def main():
         print(f"Error: SVG file not found: {svg_file}")
         return
     
+    if args.cards:
+        job_pdf = Path(args.output) if args.output else script_dir / f"business_cards_job_{args.cards}.pdf"
+        print(f"Creating {args.cards} cards...")
+        pages = create_card_job_pdf(str(svg_file), job_pdf, total_cards=args.cards, sheet=args.sheet)
+        print(f"PDF saved: {job_pdf} ({pages} pages)")
+        return
+    
     print("Creating business card PDFs...\n")
     
     # Try to create the advanced PDFs
@@ -8,18 +8,39 @@ import os
 import sys
 from pathlib import Path
 
-def create_html_wrapper(svg_file_path, cards_per_page=10):
+from html_stream import PAGE_BREAK, card_cells, paginate
+from imposition import best_grid, sheet_size
+from render_cache import get_cache, render_key
+from svg_optimizer import optimize_for_print
+from svg_symbols import card_markup
+from tracing import span, traced
+
+@traced("html.build")
+def create_html_wrapper(svg_file_path, cards_per_page=10, dedup=None, sheet="A4"):
     """Create an HTML file that embeds the SVG for PDF conversion"""
+    return "".join(iter_html_wrapper(svg_file_path, dedup=dedup, sheet=sheet))
+
+def iter_html_wrapper(svg_file_path, dedup=None, sheet="A4", total_cards=None, cards=None):
+    """
+    Yield the print-ready sheet HTML in chunks
+
+    Pages repeat the title, grid and notes for total_cards copies of the
+    card (default one page) or for each markup string in cards.
+    """
     
     # Read the SVG content
     with open(svg_file_path, 'r', encoding='utf-8') as f:
         svg_content = f.read()
     
-    # Calculate layout
-    cards_horizontal = 2  # 2 cards horizontally on A4
-    cards_vertical = 5    # 5 cards vertically on A4
+    # With dedup the card is defined once and each cell is a <use> reference
+    svg_defs, card_svg = card_markup(svg_content, dedup)
     
-    html_content = f"""
+    # Densest upright grid of 85mm × 55mm cards inside the 10mm page margin
+    cards_horizontal, cards_vertical = best_grid(85, 55, sheet, margin=10)
+    cards_per_page = cards_horizontal * cards_vertical
+    page_width, page_height = sheet_size(sheet)
+    
+    yield f"""
 <!DOCTYPE html>
 <html>
 <head>
@@ -27,7 +48,7 @@ def create_html_wrapper(svg_file_path, cards_per_page=10):
     <title>Business Cards - Print Ready</title>
     <style>
         @page {{
-            size: A4;
+            size: {page_width:g}mm {page_height:g}mm;
             margin: 10mm;
         }}
         
@@ -100,16 +121,20 @@ def create_html_wrapper(svg_file_path, cards_per_page=10):
     </style>
 </head>
 <body>
-    <div class="page-title">Business Cards - Print Template ({cards_horizontal} × {cards_vertical} = {cards_horizontal * cards_vertical} cards per page)</div>
-    
-    <div class="cards-container">
+{svg_defs}
 """
     
-    # Add multiple cards
-    for i in range(cards_horizontal * cards_vertical):
-        html_content += f'        <div class="card">\n{svg_content}\n        </div>\n'
+    cells = card_cells(card_svg, cards_per_page, total_cards, cards)
+    for page_number, page in enumerate(paginate(cells, cards_per_page)):
+        if page_number:
+            yield PAGE_BREAK
+        yield f"""    <div class="page-title">Business Cards - Print Template ({cards_horizontal} × {cards_vertical} = {cards_horizontal * cards_vertical} cards per page)</div>
     
-    html_content += """
+    <div class="cards-container">
+"""
+        for cell in page:
+            yield f'        <div class="card">\n{cell}\n        </div>\n'
+        yield """
     </div>
     
     <div class="instructions">
@@ -122,17 +147,18 @@ def create_html_wrapper(svg_file_path, cards_per_page=10):
             <li>The design shows both front and back side by side - cut in the middle to separate</li>
         </ul>
     </div>
-</body>
-</html>
 """
     
-    return html_content
+    yield """</body>
+</html>
+"""
 
+@traced("html.build_single")
 def create_single_card_html(svg_file_path):
     """Create HTML for a single centered card"""
     
     with open(svg_file_path, 'r', encoding='utf-8') as f:
-        svg_content = f.read()
+        svg_content = optimize_for_print(f.read())
     
     html_content = f"""
 <!DOCTYPE html>
@@ -235,16 +261,75 @@ def create_single_card_html(svg_file_path):
     
     return html_content
 
-def convert_with_weasyprint(html_content, output_pdf_path):
-    """Convert HTML to PDF using WeasyPrint"""
-    try:
+class WeasyPrintRenderer:
+    """
+    One WeasyPrint session shared by every document of a run
+
+    The FontConfiguration and every fetched image are loaded once. Each
+    document keeps its own <style>, so the cascade is unchanged. Within
+    one write_pdf() call an HTML string is laid out once and repeated
+    sheets reuse its Document.pages; laid-out documents are not kept
+    between calls, so a long run does not accumulate them.
+    """
+
+    def __init__(self, base_url=None):
         import weasyprint
+        from weasyprint.text.fonts import FontConfiguration
+
+        self._weasyprint = weasyprint
+        self.base_url = str(base_url) if base_url else None
+        self.font_config = FontConfiguration()
+        self._image_cache = {}
+
+    def render(self, html_content):
+        """Lay out an HTML string and return its weasyprint Document"""
+        with span("weasyprint.parse", html_bytes=len(html_content)):
+            html_doc = self._weasyprint.HTML(string=html_content, base_url=self.base_url)
+        with span("weasyprint.layout"):
+            return html_doc.render(font_config=self.font_config, cache=self._image_cache)
+
+    def write_pdf(self, html_contents, output_pdf_path, copies=1):
+        """
+        Write one PDF from one or more HTML strings
+
+        Each document is laid out once; copies repeats the combined pages,
+        e.g. a full sheet of cards printed on many pages.
+        """
+        if isinstance(html_contents, str):
+            html_contents = [html_contents]
+        # Identical documents in this call share one layout
+        rendered = {}
+        documents = []
+        for html_content in html_contents:
+            if html_content not in rendered:
+                rendered[html_content] = self.render(html_content)
+            documents.append(rendered[html_content])
+        pages = [page for document in documents for page in document.pages] * copies
+        with span("weasyprint.write_pdf", output=Path(output_pdf_path).name, pages=len(pages)):
+            documents[0].copy(pages).write_pdf(output_pdf_path)
+        return len(pages)
+
+
+_renderer = None
+
+
+def get_weasyprint_renderer():
+    """The process-wide WeasyPrintRenderer (raises ImportError/OSError without WeasyPrint)"""
+    global _renderer
+    if _renderer is None:
+        _renderer = WeasyPrintRenderer(base_url=Path(__file__).parent)
+    return _renderer
+
+
+def convert_with_weasyprint(html_content, output_pdf_path, copies=1, renderer=None):
+    """Convert HTML to PDF using WeasyPrint, reusing the shared fonts, styles and layouts"""
+    try:
+        renderer = renderer or get_weasyprint_renderer()
         
         print(f"Converting to PDF: {output_pdf_path}")
         
         # Convert HTML to PDF
-        html_doc = weasyprint.HTML(string=html_content)
-        html_doc.write_pdf(output_pdf_path)
+        renderer.write_pdf(html_content, output_pdf_path, copies)
         
         print(f"PDF created successfully: {output_pdf_path}")
         return True
@@ -253,20 +338,26 @@ def convert_with_weasyprint(html_content, output_pdf_path):
         print(f"WeasyPrint conversion failed: {e}")
         return False
 
-def create_browser_printable_html(svg_file_path, output_html_path, card_type="multiple"):
-    """Create an HTML file that can be printed directly from a browser"""
+def create_browser_printable_html(svg_file_path, output_html_path, card_type="multiple", html_content=None):
+    """
+    Create an HTML file that can be printed directly from a browser
+
+    Pass html_content when it is already built (e.g. for WeasyPrint) so
+    the document is only generated once. Returns the HTML that was written.
+    """
     
-    if card_type == "single":
-        html_content = create_single_card_html(svg_file_path)
-    else:
-        html_content = create_html_wrapper(svg_file_path)
+    if html_content is None:
+        if card_type == "single":
+            html_content = create_single_card_html(svg_file_path)
+        else:
+            html_content = create_html_wrapper(svg_file_path)
     
-    with open(output_html_path, 'w', encoding='utf-8') as f:
+    with span("file.write", file=Path(output_html_path).name), open(output_html_path, 'w', encoding='utf-8') as f:
         f.write(html_content)
     
     print(f"HTML file created: {output_html_path}")
     print(f"You can open this file in a web browser and print it (Ctrl+P)")
-    return True
+    return html_content
 
 def main():
     # File paths
@@ -281,30 +372,44 @@ def main():
     
     success_count = 0
     
-    # Create HTML files (always works)
+    # Create HTML files (always works); the same strings feed WeasyPrint below
     html_multiple = script_dir / "business_cards_multiple_A4.html"
-    if create_browser_printable_html(str(svg_file), str(html_multiple), "multiple"):
+    html_content_multiple = create_browser_printable_html(str(svg_file), str(html_multiple), "multiple")
+    if html_content_multiple:
         success_count += 1
     
     html_single = script_dir / "business_cards_single_A4.html"
-    if create_browser_printable_html(str(svg_file), str(html_single), "single"):
+    html_content_single = create_browser_printable_html(str(svg_file), str(html_single), "single")
+    if html_content_single:
         success_count += 1
     
     print()
     
-    # Try WeasyPrint conversion
+    # Try WeasyPrint conversion (skipped when the cached PDF is still valid)
+    cache = get_cache()
     try:
         # Multiple cards PDF
         pdf_multiple = script_dir / "business_cards_multiple_A4.pdf"
-        html_content_multiple = create_html_wrapper(str(svg_file))
-        if convert_with_weasyprint(html_content_multiple, str(pdf_multiple)):
+        h, v = best_grid(85, 55, "A4", margin=10)
+        key_multiple = render_key(svg_file, "weasyprint", "multiple", h=h, v=v, margin_mm=10, page="A4")
+        if cache.fetch(key_multiple, pdf_multiple):
+            print(f"PDF up to date (cached): {pdf_multiple}")
             success_count += 1
+        else:
+            if convert_with_weasyprint(html_content_multiple, str(pdf_multiple)):
+                cache.store(key_multiple, pdf_multiple)
+                success_count += 1
         
         # Single card PDF
         pdf_single = script_dir / "business_cards_single_A4.pdf"
-        html_content_single = create_single_card_html(str(svg_file))
-        if convert_with_weasyprint(html_content_single, str(pdf_single)):
+        key_single = render_key(svg_file, "weasyprint", "single", h=1, v=1, margin_mm=15, page="A4")
+        if cache.fetch(key_single, pdf_single):
+            print(f"PDF up to date (cached): {pdf_single}")
             success_count += 1
+        else:
+            if convert_with_weasyprint(html_content_single, str(pdf_single)):
+                cache.store(key_single, pdf_single)
+                success_count += 1
             
     except ImportError:
         print("WeasyPrint not available - using HTML files only")
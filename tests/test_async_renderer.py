@@ -0,0 +1,45 @@
+import asyncio
+
+from async_renderer import RenderJob, render_jobs_async
+
+
+class FakePage:
+    def __init__(self, browser):
+        self.browser = browser
+        self.closed = False
+
+    async def set_content(self, html):
+        assert not self.closed
+        if html == "boom":
+            raise RuntimeError("navigation failed")
+
+    async def pdf(self, path, **options):
+        assert not self.closed
+        self.browser.printed_by.append(self)
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.opened = []
+        self.printed_by = []
+
+    async def new_page(self):
+        page = FakePage(self)
+        self.opened.append(page)
+        return page
+
+
+def test_failed_render_replaces_its_page():
+    browser = FakeBrowser()
+    jobs = [RenderJob("boom", "a.pdf"), RenderJob("<p>ok</p>", "b.pdf"), RenderJob("<p>ok</p>", "c.pdf")]
+    results = asyncio.run(render_jobs_async(jobs, concurrency=1, browser=browser))
+
+    assert [result.ok for result in results] == [False, True, True]
+    assert len(browser.opened) == 2
+    failed, replacement = browser.opened
+    assert browser.printed_by == [replacement, replacement]
+    # The replacement is closed with the rest of the pool
+    assert failed.closed and replacement.closed
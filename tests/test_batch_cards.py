@@ -0,0 +1,20 @@
+import xml.etree.ElementTree as ET
+
+from batch_cards import compile_template, fill_template
+
+SVG_NS = "{http://www.w3.org/2000/svg}"
+
+
+def test_placeholder_in_attribute_escapes_quotes():
+    compiled = compile_template(
+        '<svg xmlns="http://www.w3.org/2000/svg"><a href="mailto:{{email}}"><text>{{email}}</text></a></svg>')
+    root = ET.fromstring(fill_template(compiled, {"email": 'a"b@x.com'}))
+    link = root.find(f"{SVG_NS}a")
+    assert link.get("href") == 'mailto:a"b@x.com'
+    assert link.find(f"{SVG_NS}text").text == 'a"b@x.com'
+
+
+def test_text_field_escapes_markup():
+    compiled = compile_template('<svg xmlns="http://www.w3.org/2000/svg"><text id="name">"Jane"</text></svg>')
+    root = ET.fromstring(fill_template(compiled, {"name": "<A & B>"}))
+    assert root.find(f"{SVG_NS}text").text == '"<A & B>"'
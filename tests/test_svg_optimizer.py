@@ -0,0 +1,57 @@
+import xml.etree.ElementTree as ET
+
+from svg_optimizer import optimize_svg_text
+
+SVG_NS = "{http://www.w3.org/2000/svg}"
+
+
+def _optimize(body):
+    root = ET.fromstring(optimize_svg_text(f'<svg xmlns="http://www.w3.org/2000/svg">{body}</svg>'))
+    style = root.find(f"{SVG_NS}style")
+    return root, style.text if style is not None else ""
+
+
+def test_single_class_rule_is_inlined():
+    root, css = _optimize('<style>.a { fill: red }</style><rect class="a" width="1" height="1"/>')
+    rect = root.find(f"{SVG_NS}rect")
+    assert rect.get("fill") == "red"
+    assert rect.get("class") is None
+    assert css == ""
+
+
+def test_grouped_and_qualified_selectors_stay_in_style():
+    root, css = _optimize(
+        '<style>.a, .b { fill: red } text.c { fill: blue }</style>'
+        '<rect class="a" width="1" height="1"/><circle class="c" r="1"/>'
+    )
+    assert ".a, .b { fill: red }" in css
+    assert "text.c { fill: blue }" in css
+    rect, circle = root.find(f"{SVG_NS}rect"), root.find(f"{SVG_NS}circle")
+    assert rect.get("class") == "a" and rect.get("fill") is None
+    assert circle.get("class") == "c" and circle.get("fill") is None
+
+
+def test_class_used_by_another_rule_is_not_inlined():
+    root, css = _optimize(
+        '<style>.a { fill: red } g .a { stroke: blue } .a:hover { fill: green }</style>'
+        '<g id="keep"><rect class="a" width="1" height="1"/></g>'
+    )
+    assert ".a { fill: red }" in css and "g .a" in css and ".a:hover" in css
+    assert root.find(f".//{SVG_NS}rect").get("class") == "a"
+
+
+def test_type_selector_disables_inlining():
+    # A presentation attribute would lose to "rect { ... }" where the class rule won
+    root, css = _optimize('<style>.a { fill: red } rect { fill: blue }</style><rect class="a" width="1" height="1"/>')
+    assert ".a { fill: red }" in css
+    assert root.find(f"{SVG_NS}rect").get("class") == "a"
+
+
+def test_element_with_unknown_class_keeps_its_rules():
+    root, css = _optimize(
+        '<style>.a { fill: red } .b { stroke: blue }</style>'
+        '<rect class="a x" width="1" height="1"/><rect class="b" width="2" height="2"/>'
+    )
+    first, second = root.findall(f"{SVG_NS}rect")
+    assert first.get("class") == "a x" and ".a { fill: red }" in css
+    assert second.get("stroke") == "blue" and ".b" not in css
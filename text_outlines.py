@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+Text-to-Outline Conversion for Card SVGs
+Replaces <text> elements with glyph outline <path>s drawn from locally
+installed font files, so svglib, WeasyPrint and Chromium all render the
+same shapes without font lookup. Glyph runs are cached per
+(font file, size, string) in process and on disk
+
+Usage:
+    python text_outlines.py business_card_front.svg --output front_outlined.svg
+    python text_outlines.py --fonts                  # show which files the families map to
+
+Set BUSINESS_CARD_OUTLINE_TEXT=1 to have the layout builders and the
+svglib/cairosvg converters use outlined SVGs. Extra font folders can be
+listed in BUSINESS_CARD_FONT_DIRS (os.pathsep separated).
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import xml.etree.ElementTree as ET
+from functools import lru_cache
+from pathlib import Path
+
+from render_cache import DEFAULT_CACHE_DIR
+from tracing import traced
+
+OUTLINE_CACHE_DIR = DEFAULT_CACHE_DIR / "outlines"
+OUTLINE_VERSION = 1
+
+SVG_NS = "http://www.w3.org/2000/svg"
+FONT_SUFFIXES = (".ttf", ".otf")
+
+FONT_DIRS = [
+    Path(__file__).parent / "assets" / "fonts",
+    Path.home() / ".fonts",
+    Path.home() / ".local" / "share" / "fonts",
+    Path("/usr/share/fonts"),
+    Path("/usr/local/share/fonts"),
+    Path("/Library/Fonts"),
+    Path("/System/Library/Fonts"),
+    Path(os.environ.get("WINDIR", "C:\\Windows")) / "Fonts",
+]
+
+# Metric-compatible stand-ins tried in order for each generic family
+GENERIC_FAMILIES = {
+    "monospace": ["courier new", "liberation mono", "cousine", "dejavu sans mono", "source code pro"],
+    "sans-serif": ["arial", "liberation sans", "arimo", "helvetica", "dejavu sans", "lato"],
+    "serif": ["times new roman", "liberation serif", "tinos", "dejavu serif"],
+}
+# Families that imply a generic fallback when they are not installed
+FAMILY_FALLBACKS = {"courier new": "monospace", "courier": "monospace", "arial": "sans-serif",
+                    "helvetica": "sans-serif", "times new roman": "serif", "times": "serif"}
+
+# Properties SVG text inherits from ancestors
+_INHERITED = ("font-family", "font-size", "font-weight", "text-anchor")
+_FLOAT_RE = re.compile(r'-?\d*\.?\d+')
+
+
+def outlines_enabled():
+    return os.environ.get("BUSINESS_CARD_OUTLINE_TEXT", "0") == "1"
+
+
+def _font_dirs():
+    extra = os.environ.get("BUSINESS_CARD_FONT_DIRS", "")
+    return [Path(p) for p in extra.split(os.pathsep) if p] + FONT_DIRS
+
+
+@lru_cache(maxsize=1)
+def font_index():
+    """{(family lowercased, bold): font file} for every readable .ttf/.otf"""
+    from fontTools.ttLib import TTFont
+
+    index = {}
+    for font_dir in _font_dirs():
+        if not font_dir.is_dir():
+            continue
+        for path in sorted(font_dir.rglob("*")):
+            if path.suffix.lower() not in FONT_SUFFIXES:
+                continue
+            try:
+                font = TTFont(str(path), lazy=True)
+                names = font["name"]
+                family = names.getDebugName(16) or names.getDebugName(1)
+                style = names.getDebugName(17) or names.getDebugName(2) or ""
+                font.close()
+            except Exception:
+                continue
+            if not family or "italic" in style.lower() or "oblique" in style.lower():
+                continue
+            key = (family.lower(), "bold" in style.lower())
+            # The first directory wins, so BUSINESS_CARD_FONT_DIRS can override system fonts
+            index.setdefault(key, str(path))
+    return index
+
+
+def resolve_font(font_family, bold=False):
+    """Font file for a CSS font-family list, following generic fallbacks, or None"""
+    index = font_index()
+    candidates = []
+    for name in font_family.split(","):
+        name = name.strip().strip("'\"").lower()
+        candidates.extend(GENERIC_FAMILIES.get(name, [name]))
+        if name in FAMILY_FALLBACKS:
+            candidates.extend(GENERIC_FAMILIES[FAMILY_FALLBACKS[name]])
+    candidates.extend(GENERIC_FAMILIES["sans-serif"])
+
+    for weight in ((True, False) if bold else (False,)):
+        for name in candidates:
+            path = index.get((name, weight))
+            if path:
+                return path
+    return None
+
+
+@lru_cache(maxsize=16)
+def _load_font(font_path):
+    from fontTools.ttLib import TTFont
+
+    return TTFont(font_path)
+
+
+def _number(value):
+    return f"{value:.3f}".rstrip("0").rstrip(".") or "0"
+
+
+def _font_stamp(font_path):
+    stat = os.stat(font_path)
+    return f"{font_path}:{stat.st_mtime_ns}:{stat.st_size}"
+
+
+@lru_cache(maxsize=4096)
+def text_path(font_path, size, text):
+    """
+    (path data, advance) for a string set at the origin on its baseline
+
+    Glyphs are placed by advance width only (no kerning or shaping),
+    which matches monospace and Latin UI text. Coordinates are in the
+    SVG's user units with y pointing down.
+    """
+    key = hashlib.sha256(json.dumps([OUTLINE_VERSION, _font_stamp(font_path), size, text]).encode('utf-8'))
+    cache_path = OUTLINE_CACHE_DIR / f"{key.hexdigest()}.json"
+    disk = os.environ.get("BUSINESS_CARD_CACHE", "1") != "0"
+    if disk and cache_path.exists():
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+            return cached["d"], cached["advance"]
+        except (OSError, ValueError, KeyError):
+            pass
+
+    from fontTools.pens.svgPathPen import SVGPathPen
+    from fontTools.pens.transformPen import TransformPen
+
+    font = _load_font(font_path)
+    glyph_set = font.getGlyphSet()
+    cmap = font.getBestCmap() or {}
+    metrics = font["hmtx"].metrics
+    scale = size / font["head"].unitsPerEm
+
+    pen = SVGPathPen(glyph_set, ntos=_number)
+    x = 0.0
+    for char in text:
+        glyph_name = cmap.get(ord(char), ".notdef")
+        if glyph_name not in glyph_set:
+            glyph_name = ".notdef"
+        glyph_set[glyph_name].draw(TransformPen(pen, (scale, 0, 0, -scale, x, 0)))
+        x += metrics[glyph_name][0] * scale
+    result = (pen.getCommands(), round(x, 4))
+
+    if disk:
+        OUTLINE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_name(f".{cache_path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"d": result[0], "advance": result[1]}, f)
+        os.replace(tmp_path, cache_path)
+    return result
+
+
+def _style_props(element):
+    props = {}
+    for part in element.get("style", "").split(";"):
+        if ":" in part:
+            name, value = part.split(":", 1)
+            props[name.strip()] = value.strip()
+    return props
+
+
+def outline_svg_text(svg_content):
+    """
+    Replace every convertible <text> with an outline <path>
+
+    Returns (svg markup, converted count, skipped count). Text with
+    <tspan> children, or whose font cannot be found, is left as text.
+    """
+    ET.register_namespace("", SVG_NS)
+    root = ET.fromstring(svg_content)
+    counts = {"converted": 0, "skipped": 0}
+
+    def visit(element, inherited):
+        props = dict(inherited)
+        for name in _INHERITED:
+            if element.get(name):
+                props[name] = element.get(name)
+        props.update({k: v for k, v in _style_props(element).items() if k in _INHERITED})
+
+        for index, child in enumerate(list(element)):
+            if child.tag == f"{{{SVG_NS}}}text":
+                replacement = _outline_element(child, props)
+                if replacement is None:
+                    counts["skipped"] += 1
+                    continue
+                replacement.tail = child.tail
+                element.remove(child)
+                element.insert(index, replacement)
+                counts["converted"] += 1
+            else:
+                visit(child, props)
+
+    visit(root, {"font-family": "sans-serif", "font-size": "16", "text-anchor": "start"})
+    return ET.tostring(root, encoding="unicode"), counts["converted"], counts["skipped"]
+
+
+def _outline_element(text_element, inherited):
+    if len(text_element):
+        return None
+    props = dict(inherited)
+    for name in _INHERITED:
+        if text_element.get(name):
+            props[name] = text_element.get(name)
+    props.update({k: v for k, v in _style_props(text_element).items() if k in _INHERITED})
+
+    # Default xml:space handling: collapse runs of whitespace, trim the ends
+    content = " ".join((text_element.text or "").split())
+    if not content:
+        return None
+    size_match = _FLOAT_RE.search(props["font-size"])
+    if not size_match:
+        return None
+    size = float(size_match.group(0))
+    weight = props.get("font-weight", "normal")
+    bold = weight == "bold" or (weight.isdigit() and int(weight) >= 600)
+    font_path = resolve_font(props["font-family"], bold)
+    if font_path is None:
+        return None
+
+    d, advance = text_path(font_path, size, content)
+    x = float((_FLOAT_RE.search(text_element.get("x", "0")) or [0])[0])
+    y = float((_FLOAT_RE.search(text_element.get("y", "0")) or [0])[0])
+    anchor = props.get("text-anchor", "start")
+    if anchor == "middle":
+        x -= advance / 2
+    elif anchor == "end":
+        x -= advance
+
+    path = ET.Element(f"{{{SVG_NS}}}path")
+    for name, value in text_element.attrib.items():
+        if name in ("x", "y", "dx", "dy", "style", "text-anchor", "textLength", "lengthAdjust") \
+                or name.startswith("font"):
+            continue
+        path.set(name, value)
+    placement = f"translate({_number(x)} {_number(y)})"
+    path.set("transform", f"{text_element.get('transform')} {placement}" if text_element.get("transform") else placement)
+    path.set("d", d)
+    # Keep the string for accessibility and for tools that read card text
+    path.set("aria-label", content)
+    return path
+
+
+@lru_cache(maxsize=64)
+@traced("svg.outline_text")
+def _outlined_cached(content_hash, svg_content):
+    return outline_svg_text(svg_content)[0]
+
+
+def outline_for_render(svg_content):
+    """Outlined markup when BUSINESS_CARD_OUTLINE_TEXT=1, else the input unchanged"""
+    if not outlines_enabled():
+        return svg_content
+    try:
+        return _outlined_cached(hashlib.sha256(svg_content.encode('utf-8')).hexdigest(), svg_content)
+    except ImportError:
+        # fontTools missing: leave the text for the renderer's own font lookup
+        return svg_content
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert SVG text to glyph outlines")
+    parser.add_argument("svg", nargs="?", help="input SVG file")
+    parser.add_argument("--output", default=None, help="write the outlined SVG here")
+    parser.add_argument("--fonts", action="store_true", help="list the font files each family resolves to")
+    args = parser.parse_args()
+
+    try:
+        if args.fonts:
+            for family in ("'Courier New', monospace", "Arial, sans-serif", "serif"):
+                print(f"{family:<28} regular: {resolve_font(family)}")
+                print(f"{'':<28} bold:    {resolve_font(family, bold=True)}")
+            return 0
+        if not args.svg:
+            parser.error("an SVG file is required unless --fonts is given")
+
+        svg_content = Path(args.svg).read_text(encoding='utf-8')
+        outlined, converted, skipped = outline_svg_text(svg_content)
+    except ImportError:
+        print("fontTools not installed. Install with: pip install fonttools")
+        return 1
+    except (OSError, ET.ParseError) as e:
+        print(f"Error: {e}")
+        return 1
+
+    output = Path(args.output) if args.output else Path(args.svg).with_name(Path(args.svg).stem + "_outlined.svg")
+    output.write_text(outlined, encoding='utf-8')
+    print(f"✓ {output.name}: {converted} text elements outlined, {skipped} left as text")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Pipeline Tracing with Chrome Trace Export
+Times the stages of the card generators (SVG reads, HTML building,
+browser launch, set_content, page.pdf, svglib parsing, file writes) and
+writes a Chrome trace-event JSON file that opens in Perfetto
+(https://ui.perfetto.dev) or chrome://tracing
+
+Usage:
+    python create_square_card_pdfs.py --trace                # writes trace_<timestamp>.json
+    python parallel_pdf.py --cards 500 --trace job.json
+    BUSINESS_CARD_TRACE=run.json python svg_to_pdf_simple.py
+
+    with span("html.build", cards=10):
+        ...
+
+    @traced("svglib.parse")
+    def load(...):
+        ...
+
+When tracing is off, span() hands back one shared no-op context manager
+and traced() functions make a single global check before calling through.
+Worker processes inherit the setting and their spans are merged into the
+parent's file.
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from functools import wraps
+from pathlib import Path
+
+TRACE_ENV = "BUSINESS_CARD_TRACE"
+# pid of the process that writes the final file; workers leave partial files for it
+_OWNER_ENV = "BUSINESS_CARD_TRACE_OWNER"
+
+_NO_SPAN = nullcontext()
+_tracer = None
+
+
+class Tracer:
+    """Collects complete ("X") trace events for one process"""
+
+    def __init__(self, path, owner=True):
+        self.path = Path(path)
+        self.owner = owner
+        self.pid = os.getpid()
+        self.events = []
+        self._tracks = {}
+        self._lock = threading.Lock()
+        self._exit_hook = False
+
+    def track_id(self, track):
+        """Stable virtual thread id for concurrent work (e.g. one per async job)"""
+        with self._lock:
+            if track not in self._tracks:
+                self._tracks[track] = 1_000_000 + len(self._tracks)
+                self.events.append({"ph": "M", "name": "thread_name", "pid": self.pid,
+                                    "tid": self._tracks[track], "args": {"name": str(track)}})
+            return self._tracks[track]
+
+    @contextmanager
+    def span(self, name, cat="pipeline", track=None, **args):
+        tid = self.track_id(track) if track is not None else threading.get_ident()
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            event = {"ph": "X", "name": name, "cat": cat, "pid": self.pid, "tid": tid,
+                     "ts": start // 1000, "dur": (time.perf_counter_ns() - start) // 1000}
+            if args:
+                event["args"] = {key: value if isinstance(value, (int, float, bool)) else str(value)
+                                 for key, value in args.items()}
+            self.events.append(event)
+            if not self._exit_hook:
+                self._register_exit_hook()
+
+    def _register_exit_hook(self):
+        # Registered on first use: multiprocessing clears its finalizers when a worker starts,
+        # and workers leave through os._exit(), which skips atexit
+        self._exit_hook = True
+        if self.owner:
+            atexit.register(_save_at_exit)
+        else:
+            from multiprocessing import util
+
+            util.Finalize(None, _save_at_exit, exitpriority=100)
+
+    def _part_path(self, pid):
+        return self.path.with_name(f".{self.path.name}.{pid}.part")
+
+    def save(self):
+        """Owner: write the trace file with every worker's events; worker: leave a part file"""
+        events = list(self.events)
+        events.append({"ph": "M", "name": "process_name", "pid": self.pid,
+                       "args": {"name": "main" if self.owner else f"worker {self.pid}"}})
+        if not self.owner:
+            self._part_path(self.pid).write_text(json.dumps(events), encoding='utf-8')
+            return None
+
+        for part in self.path.parent.glob(f".{self.path.name}.*.part"):
+            try:
+                events.extend(json.loads(part.read_text(encoding='utf-8')))
+            except (OSError, ValueError):
+                pass
+            part.unlink(missing_ok=True)
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(json.dumps({"traceEvents": events, "displayTimeUnit": "ms"}), encoding='utf-8')
+        return self.path
+
+
+def default_trace_path():
+    return Path.cwd() / f"trace_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+
+
+def enable(path=None):
+    """
+    Start tracing in this process and in every process it starts
+
+    The file is written when the process exits, or earlier by save().
+    Returns the trace path.
+    """
+    global _tracer
+    if _tracer is not None:
+        return _tracer.path
+    path = Path(path or default_trace_path()).resolve()
+    owner_pid = os.environ.get(_OWNER_ENV)
+    owner = owner_pid is None or owner_pid == str(os.getpid())
+    if owner:
+        os.environ[TRACE_ENV] = str(path)
+        os.environ[_OWNER_ENV] = str(os.getpid())
+    _tracer = Tracer(path, owner)
+    return path
+
+
+def _become_worker():
+    """After fork the child still holds the parent's tracer; give it its own"""
+    global _tracer
+    if _tracer is not None and _tracer.owner:
+        path = _tracer.path
+        _tracer = None
+        enable(path)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_become_worker)
+
+
+def save():
+    """Write the trace now and keep recording; returns the path or None"""
+    if _tracer is None or not _tracer.events:
+        return None
+    path = _tracer.save()
+    if path is not None:
+        print(f"✓ Trace written: {path} (open in https://ui.perfetto.dev)")
+    return path
+
+
+def _save_at_exit():
+    save()
+
+
+def is_enabled():
+    return _tracer is not None
+
+
+def span(name, cat="pipeline", track=None, **args):
+    """Context manager timing one stage; a shared no-op when tracing is off"""
+    if _tracer is None:
+        return _NO_SPAN
+    return _tracer.span(name, cat, track, **args)
+
+
+def traced(name=None, cat="pipeline"):
+    """Decorator form of span(), named after the function by default"""
+    def decorate(func):
+        label = name or func.__qualname__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if _tracer is None:
+                return func(*args, **kwargs)
+            with _tracer.span(label, cat):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def add_trace_argument(parser):
+    """--trace [PATH] for the generator CLIs; pass the parsed value to configure()"""
+    parser.add_argument("--trace", nargs="?", const="", default=None, metavar="PATH",
+                        help=f"write a Chrome trace of the pipeline stages (or set {TRACE_ENV})")
+
+
+def configure(trace_arg=None):
+    """Enable tracing for a --trace value (None leaves the BUSINESS_CARD_TRACE setting alone)"""
+    if trace_arg is not None:
+        return enable(trace_arg or None)
+    return None
+
+
+# BUSINESS_CARD_TRACE=path (or 1) turns tracing on for any script, and for its workers
+_env_value = os.environ.get(TRACE_ENV, "")
+if _env_value and _env_value != "0":
+    enable(None if _env_value == "1" else _env_value)
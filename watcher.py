@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+File Watcher for Incremental Rebuilds
+Waits for edits to a set of source files and reports which ones changed
+once a burst of saves has settled. Uses watchdog (inotify/FSEvents/
+ReadDirectoryChangesW) when it is installed and mtime polling otherwise
+
+    watcher = FileWatcher([front_svg, back_svg])
+    while True:
+        changed = watcher.wait()
+        rebuild(changed)
+"""
+
+import os
+import re
+import threading
+import time
+from pathlib import Path
+
+DEFAULT_POLL_SECONDS = 0.5
+DEFAULT_DEBOUNCE_SECONDS = 0.3
+
+# Local files an SVG pulls in: <image href="...">, xlink:href and CSS url(...)
+_ASSET_RE = re.compile(r'(?:href\s*=\s*"|url\(\s*[\'"]?)([^"\'#)][^"\')]*)')
+
+
+def svg_assets(svg_path):
+    """Local files referenced by an SVG (images, fonts), resolved against its folder"""
+    svg_path = Path(svg_path)
+    try:
+        text = svg_path.read_text(encoding='utf-8')
+    except OSError:
+        return []
+    assets = []
+    for ref in _ASSET_RE.findall(text):
+        if ":" in ref.split("/", 1)[0]:
+            continue  # data:, http:, https: and other schemes
+        path = (svg_path.parent / ref).resolve()
+        if path.is_file():
+            assets.append(path)
+    return assets
+
+
+def _stamp(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class FileWatcher:
+    """Blocks until watched files change; set_paths() swaps the watched set"""
+
+    def __init__(self, paths=(), poll_seconds=DEFAULT_POLL_SECONDS, debounce_seconds=DEFAULT_DEBOUNCE_SECONDS):
+        self.poll_seconds = poll_seconds
+        self.debounce_seconds = debounce_seconds
+        self._stamps = {}
+        self._wakeup = threading.Event()
+        self._observer = None
+        self._watched_dirs = set()
+        self.backend = "polling"
+        if os.environ.get("BUSINESS_CARD_WATCH_POLL", "0") != "1":
+            self._start_observer()
+        self.set_paths(paths)
+
+    def _start_observer(self):
+        try:
+            from watchdog.events import FileSystemEventHandler
+            from watchdog.observers import Observer
+        except ImportError:
+            return
+
+        wakeup = self._wakeup
+
+        class Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                wakeup.set()
+
+        self._handler = Handler()
+        self._observer = Observer()
+        self._observer.daemon = True
+        self._observer.start()
+        self.backend = "watchdog"
+
+    def set_paths(self, paths):
+        """Watch exactly these files, keeping the known state of ones already watched"""
+        paths = {Path(p).resolve() for p in paths}
+        self._stamps = {path: self._stamps.get(path, _stamp(path)) for path in paths}
+        if self._observer is not None:
+            for folder in {path.parent for path in paths} - self._watched_dirs:
+                # Watch folders, not files: editors often save by writing a temp file and renaming it
+                self._observer.schedule(self._handler, str(folder), recursive=False)
+                self._watched_dirs.add(folder)
+
+    def _changed(self):
+        changed = set()
+        for path, old in self._stamps.items():
+            new = _stamp(path)
+            if new != old:
+                self._stamps[path] = new
+                changed.add(path)
+        return changed
+
+    def wait(self, timeout=None):
+        """
+        Block until at least one watched file changed and saves have settled
+
+        Returns the set of changed paths (empty on timeout). A file that
+        keeps changing within debounce_seconds is reported once, after the
+        last write.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        changed = set()
+        while not changed:
+            if deadline is not None and time.monotonic() >= deadline:
+                return set()
+            # With watchdog the event wakes us at once; the timeout is only a safety net
+            self._wakeup.wait(self.poll_seconds if self._observer is None else 5 * self.poll_seconds)
+            self._wakeup.clear()
+            changed = self._changed()
+
+        while True:
+            time.sleep(self.debounce_seconds)
+            self._wakeup.clear()
+            more = self._changed()
+            if not more:
+                return changed
+            changed |= more
+
+    def close(self):
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+            self._observer = None